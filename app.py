@@ -3,16 +3,24 @@ import os
 import sys
 import json # 引入记忆卡模块
 from tkinter import filedialog, Menu, messagebox
-import requests
 import webbrowser
-from bs4 import BeautifulSoup
-import html2text
 import datetime
 import threading
 import pathlib
-from PIL import Image, ImageDraw # 新增：用于加载和绘制启动图
-import time
-import xml.etree.ElementTree as ET # 新增：用于生成思维导图
+import atexit
+from purifier.batch import STATUS_SAVED, STATUS_SKIPPED, STATUS_FAILED, STATUS_UNCHANGED, STATUS_DUPLICATE, BatchFeed # 并发批处理引擎的状态 + 往进行中的批次追加链接
+from purifier.exporters import DOCX_AVAILABLE # 只检查 Word 库装没装，不在启动时导入
+from purifier.imageopt import PILLOW_AVAILABLE, DEFAULT_QUALITY, make_options # 图片优化 (Pillow 同样只检查装没装)
+from purifier.paths import get_app_data_dir
+from purifier.cache import PageCache # 原始网页缓存 (重新导出不联网)
+from purifier.history import HistoryStore # 抓取历史数据库
+from purifier.journal import JobJournal, find_unfinished # 批量任务断点续传日志
+from purifier.image_queue import ImageQueue # 文字优先模式：图片延后在后台补齐 (重启后继续)
+from purifier import net # 共享 HTTP 会话 (连接池/重试/代理)
+from purifier.atomic import atomic_write, DebouncedSaver # 配置文件原子写入 + 合并保存
+from purifier.events import UIEventBus # 后台线程 -> 界面的更新总线
+from purifier.clipboard import ClipboardWatcher # 剪贴板监控 (X11 事件通知 / 退避轮询)
+from purifier.warmup import warm_up # 重模块 (requests/bs4/解析器/导出库) 等界面出来后在后台导入
 try:
     import pyperclip
 except ImportError:
@@ -31,41 +39,30 @@ def resource_path(relative_path):
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-# 尝试引入 Word 导出库
-try:
-    from docx import Document
-    from htmldocx import HtmlToDocx
-except ImportError:
-    HtmlToDocx = None
-
 # ==========================================
 # 0. 记忆存储系统 (记忆卡 V2.0 扩容版)
 # ==========================================
 
-def get_app_data_dir():
-    """获取跨平台的应用数据目录，用于存放配置文件"""
-    app_name = "TextPurifier"
-    if sys.platform == "win32":
-        # Windows: %APPDATA%\TextPurifier
-        return os.path.join(os.environ["APPDATA"], app_name)
-    elif sys.platform == "darwin":
-        # macOS: ~/Library/Application Support/TextPurifier
-        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", app_name)
-    else:
-        # Linux: ~/.config/TextPurifier
-        return os.path.join(os.path.expanduser("~"), ".config", app_name)
-
 APP_DATA_DIR = get_app_data_dir()
 os.makedirs(APP_DATA_DIR, exist_ok=True) # 启动时确保目录存在
 CONFIG_FILE = os.path.join(APP_DATA_DIR, "config.json")
+JOBS_DIR = os.path.join(APP_DATA_DIR, "jobs") # 批量任务日志，用于中途关掉后继续
 
 # 用一个全局字典来管理软件所有的记忆
 app_config = {
     "save_path": os.path.join(os.path.expanduser("~"), "Desktop"),
-    "history": [], # 新增：用来存最近抓取过的文章记录
     "history_window_size": "500x500", # 默认历史窗口尺寸
     "proxy": "", # 新增：代理服务器地址
-    "font_size": 13 # 新增：全局基础字体大小
+    "font_size": 13, # 新增：全局基础字体大小
+    "max_workers": 4, # 新增：同时处理的文章数 (工人数量)
+    "per_host_limit": 2, # 新增：同一个网站最多同时发几个请求，防止被封
+    "image_workers": 8, # 新增：每篇文章同时下载的图片数
+    "cache_max_mb": 500, # 新增：网页缓存最多占用多少 MB
+    "max_page_mb": 10, # 新增：单个网页超过多少 MB 就放弃 (0 表示不限)
+    "image_format": "original", # 新增：图片保存格式 original / webp / avif (需要 Pillow)
+    "image_max_width": 0, # 新增：图片超过这个宽度就等比缩小 (0 表示不缩放)
+    "text_first": False, # 新增：文字优先，先保存文字版，图片在后台补齐
+    "near_duplicates": "link" # 新增：转载文章 link (记一条指向原文) / skip (跳过) / off (不检查)
 }
 
 def load_config():
@@ -77,6 +74,7 @@ def load_config():
                 if "save_path" in data and os.path.exists(data["save_path"]):
                     app_config["save_path"] = data["save_path"]
                 if "history" in data:
+                    # 老版本把历史记录存在 config.json 里，读出来稍后迁移进数据库
                     app_config["history"] = data["history"]
                 if "history_window_size" in data:
                     app_config["history_window_size"] = data["history_window_size"]
@@ -84,18 +82,43 @@ def load_config():
                     app_config["proxy"] = data["proxy"]
                 if "font_size" in data:
                     app_config["font_size"] = data["font_size"]
+                if "max_workers" in data:
+                    app_config["max_workers"] = data["max_workers"]
+                if "per_host_limit" in data:
+                    app_config["per_host_limit"] = data["per_host_limit"]
+                if "image_workers" in data:
+                    app_config["image_workers"] = data["image_workers"]
+                if "cache_max_mb" in data:
+                    app_config["cache_max_mb"] = data["cache_max_mb"]
+                if "max_page_mb" in data:
+                    app_config["max_page_mb"] = data["max_page_mb"]
+                if "image_format" in data:
+                    app_config["image_format"] = data["image_format"]
+                if "image_max_width" in data:
+                    app_config["image_max_width"] = data["image_max_width"]
+                if "text_first" in data:
+                    app_config["text_first"] = data["text_first"]
+                if "near_duplicates" in data:
+                    app_config["near_duplicates"] = data["near_duplicates"]
         except:
             pass
     return app_config["save_path"]
 
 def save_config():
-    # 每次保存时，把整个 app_config 字典写进 json
-    with open(CONFIG_FILE, "w", encoding="utf-8") as f:
+    # 每次保存时，把整个 app_config 字典写进 json (先写临时文件再替换，写到一半崩溃也不会把配置弄坏)
+    snapshot = dict(app_config) # 后台计时线程里写盘，先拍个快照
+    with atomic_write(CONFIG_FILE, "w", encoding="utf-8", fsync=True) as f:
         # indent=4 会让 json 文件排版很漂亮，你可以用记事本打开看看
-        json.dump(app_config, f, ensure_ascii=False, indent=4) 
+        json.dump(snapshot, f, ensure_ascii=False, indent=4) 
+
+# 界面上的改动 (调设置、拖窗口、开关监控) 不再每次都立刻重写整个文件：
+# 调用 config_saver.request()，0.5 秒内的多次修改合并成一次写盘；退出前把没写的补上
+config_saver = DebouncedSaver(save_config, delay=0.5)
+atexit.register(config_saver.flush)
 
 # 启动时读取记忆
 current_save_path = load_config()
+net.configure_proxy(app_config.get("proxy", "")) # 代理只设置一次，所有请求共用 (会话等第一次用到时再建)
 
 # ==========================================
 # 1.1 全局字体定义 (基于配置)
@@ -132,7 +155,7 @@ BTN_GRAY = ("#FFFFFF", "#1F2937")       # 次级按钮改为卡片式
 BTN_GRAY_HOVER = ("#F3F4F6", "#374151") 
 
 app = ctk.CTk()
-app.withdraw() # 1. 启动时先隐藏主窗口，等 Splash 播放完再显示
+app.withdraw() # 1. 启动时先隐藏主窗口，等界面搭好、Splash 关掉再显示
 app.configure(fg_color=BG_COLOR) # 应用大背景
 app.geometry("900x750")
 app.title("Text Purifier")
@@ -182,6 +205,7 @@ def show_splash():
     
     if os.path.exists(img_path):
         try:
+            from PIL import Image, ImageDraw # 只有启动图要用，用到时再导入
             pil_img = Image.open(img_path)
             # 自动给图片裁切圆角，防止直角图片挡住窗口圆角
             pil_img = pil_img.convert("RGBA")
@@ -217,32 +241,36 @@ def show_splash():
         progress.pack(pady=(0, 50))
         progress.configure(fg_color="#4F46E5", progress_color="#FFFFFF")
         
-    # --- 4. 动画逻辑 (带状态更新) ---
-    loading_steps = [
-        (0.0, "正在初始化..."),
-        (0.3, "加载用户配置..."),
-        (0.6, "渲染UI组件..."),
-        (0.9, "准备就绪..."),
-    ]
-
-    def animate_loading(val=0, step_index=0):
-        if val < 1.05: # 稍微多一点确保跑满
-            # 检查是否需要更新状态文本
-            if step_index < len(loading_steps) and val >= loading_steps[step_index][0]:
-                status_text_label.configure(text=loading_steps[step_index][1])
-                step_index += 1
-
-            val += 0.02 # 每次增加 2%
-            progress.set(min(val, 1.0))
-            splash.after(25, lambda: animate_loading(val, step_index)) # 25ms 刷新一次
-        else:
-            splash.destroy()
-            app.deiconify()
-            
-    # 延迟一点启动动画，确保窗口完全画好
-    splash.after(200, lambda: animate_loading())
+    # --- 4. 进度跟着真实的启动步骤走 (不再是固定时长的动画) ---
+    # 这时候 mainloop 还没开始，每走一步手动刷新一下窗口
+    def step(val, text):
+        status_text_label.configure(text=text)
+        progress.set(val)
+        splash.update()
+
+    def finish():
+        splash.destroy()
+        app.deiconify()
+
+    step(0.1, "加载用户配置...")
+    return step, finish
+
+splash_step, splash_finish = show_splash()
+
+splash_step(0.3, "打开历史记录...")
+# 抓过的网页原文存一份，重新提取/换格式导出时直接读本地 (图片由去重仓库负责)
+page_cache = PageCache(os.path.join(APP_DATA_DIR, "cache", "pages"), max_bytes=app_config.get("cache_max_mb", 500) * 1024 * 1024)
 
-show_splash()
+# 历史记录改存 SQLite：不限条数，查重走索引
+history_store = HistoryStore(os.path.join(APP_DATA_DIR, "history.db"))
+if "history" in app_config:
+    history_store.import_items(app_config.pop("history"))
+    save_config() # 迁移完成，config.json 里不再保存历史列表
+
+# 文字优先模式留下的图片任务 (上次没补完的也在里面)，界面出来后在后台接着处理
+image_queue = ImageQueue(os.path.join(APP_DATA_DIR, "image_queue"))
+
+splash_step(0.6, "渲染UI组件...")
 
 # ==========================================
 # 2. 主题切换器逻辑
@@ -409,9 +437,25 @@ def set_progress(val):
     progress_bar.set(val)
     progress_label.configure(text=f"{int(val * 100)}%")
 
-# 辅助函数：安全更新状态栏 (解决 NameError)
+# 后台线程不直接碰控件：更新先登记到总线上，主线程每一帧 (UI_FRAME_MS) 统一执行一次，
+# 同一个控件在一帧里变了很多次也只画最后一次
+UI_FRAME_MS = 33 # 约 30 帧/秒
+ui_bus = UIEventBus()
+
+def pump_ui_events():
+    for update in ui_bus.drain():
+        try:
+            update()
+        except Exception as e:
+            print(f"界面更新出错: {e}")
+    app.after(UI_FRAME_MS, pump_ui_events)
+
+# 辅助函数：安全更新状态栏 (任何线程都可以调用)
 def safe_update_status(text, color):
-    app.after(0, lambda: status_label.configure(text=text, text_color=color))
+    ui_bus.post(lambda: status_label.configure(text=text, text_color=color), key="status")
+
+def safe_set_progress(val):
+    ui_bus.post(lambda: set_progress(val), key="progress")
 
 # --- 新增：悬浮提示 (Tooltip) 逻辑 ---
 # 用一个全局变量来暂存显示悬浮提示前的状态栏信息
@@ -442,7 +486,7 @@ def add_tooltip(widget, text):
 # ==========================================
 def open_settings_panel():
     settings_win = ctk.CTkToplevel(app)
-    settings_win.geometry("400x320")
+    settings_win.geometry("400x680")
     settings_win.title("⚙️ 设置")
     settings_win.attributes("-topmost", True)
     settings_win.resizable(False, False)
@@ -474,6 +518,74 @@ def open_settings_panel():
     font_size_slider.set(app_config.get("font_size", 13))
     font_size_slider.pack(fill="x", expand=True, side="left")
 
+    # 并发设置 (同时处理几篇文章 / 同一网站最多几个请求)
+    concurrency_frame = ctk.CTkFrame(settings_win, fg_color="transparent")
+    concurrency_frame.pack(fill="x", padx=20, pady=10)
+    ctk.CTkLabel(concurrency_frame, text="并发设置:", font=FONT_NORMAL_BOLD).pack(anchor="w")
+
+    def make_slider_row(label_text, from_, to, value):
+        row = ctk.CTkFrame(concurrency_frame, fg_color="transparent")
+        row.pack(fill="x", pady=(5, 0))
+        ctk.CTkLabel(row, text=label_text, font=FONT_SMALL, width=90, anchor="w").pack(side="left")
+        value_label = ctk.CTkLabel(row, text=str(value), font=FONT_NORMAL, width=30)
+        value_label.pack(side="right")
+        slider = ctk.CTkSlider(row, from_=from_, to=to, number_of_steps=to - from_,
+                               command=lambda v: value_label.configure(text=str(int(v))))
+        slider.set(value)
+        slider.pack(fill="x", expand=True, side="left")
+        return slider
+
+    workers_slider = make_slider_row("同时处理篇数", 1, 16, app_config.get("max_workers", 4))
+    per_host_slider = make_slider_row("单站点并发", 1, 8, app_config.get("per_host_limit", 2))
+    image_slider = make_slider_row("图片并发", 1, 16, app_config.get("image_workers", 8))
+
+    # 图片优化 (转成 WebP/AVIF、限制最大宽度)，没装 Pillow 时灰掉
+    image_opt_frame = ctk.CTkFrame(settings_win, fg_color="transparent")
+    image_opt_frame.pack(fill="x", padx=20, pady=10)
+    image_opt_title = "图片优化 (WebP/AVIF 在 Word 里显示不了):" if PILLOW_AVAILABLE else "图片优化 (需要安装 Pillow):"
+    ctk.CTkLabel(image_opt_frame, text=image_opt_title, font=FONT_NORMAL_BOLD).pack(anchor="w")
+
+    image_format_labels = {"original": "原格式", "webp": "WebP", "avif": "AVIF"}
+    if PILLOW_AVAILABLE:
+        from purifier.imageopt import supported_targets
+        choices = ["original"] + supported_targets()
+    else:
+        choices = ["original"]
+    format_row = ctk.CTkFrame(image_opt_frame, fg_color="transparent")
+    format_row.pack(fill="x", pady=(5, 0))
+    ctk.CTkLabel(format_row, text="保存格式", font=FONT_SMALL, width=90, anchor="w").pack(side="left")
+    image_format_menu = ctk.CTkOptionMenu(format_row, values=[image_format_labels[c] for c in choices], font=FONT_SMALL,
+                                          state="normal" if PILLOW_AVAILABLE else "disabled")
+    current_format = app_config.get("image_format", "original")
+    image_format_menu.set(image_format_labels[current_format if current_format in choices else "original"])
+    image_format_menu.pack(fill="x", expand=True, side="left")
+
+    width_row = ctk.CTkFrame(image_opt_frame, fg_color="transparent")
+    width_row.pack(fill="x", pady=(5, 0))
+    ctk.CTkLabel(width_row, text="最大宽度", font=FONT_SMALL, width=90, anchor="w").pack(side="left")
+    image_width_entry = ctk.CTkEntry(width_row, placeholder_text="单位像素，0 = 不缩放", font=FONT_SMALL,
+                                     state="normal" if PILLOW_AVAILABLE else "disabled")
+    image_width_entry.pack(fill="x", expand=True, side="left")
+    if app_config.get("image_max_width"):
+        image_width_entry.insert(0, str(app_config["image_max_width"]))
+
+    # 文字优先不需要 Pillow
+    text_first_check = ctk.CTkCheckBox(image_opt_frame, text="文字优先 (先保存文字，图片在后台补齐)", font=FONT_SMALL)
+    text_first_check.pack(anchor="w", pady=(8, 0))
+    if app_config.get("text_first"):
+        text_first_check.select()
+
+    # 转载去重 (正文和存档里某篇几乎一样时)
+    dedup_frame = ctk.CTkFrame(settings_win, fg_color="transparent")
+    dedup_frame.pack(fill="x", padx=20, pady=10)
+    dedup_row = ctk.CTkFrame(dedup_frame, fg_color="transparent")
+    dedup_row.pack(fill="x")
+    ctk.CTkLabel(dedup_row, text="转载文章:", font=FONT_NORMAL_BOLD, width=90, anchor="w").pack(side="left")
+    near_dup_labels = {"link": "不重复保存，指向原文", "skip": "直接跳过", "off": "不检查，照常保存"}
+    near_dup_menu = ctk.CTkOptionMenu(dedup_row, values=list(near_dup_labels.values()), font=FONT_SMALL)
+    near_dup_menu.set(near_dup_labels.get(app_config.get("near_duplicates", "link"), near_dup_labels["link"]))
+    near_dup_menu.pack(fill="x", expand=True, side="left")
+
     # 按钮
     btn_frame = ctk.CTkFrame(settings_win, fg_color="transparent")
     btn_frame.pack(fill="x", padx=20, pady=10, side="bottom")
@@ -483,8 +595,22 @@ def open_settings_panel():
         new_font_size = int(font_size_slider.get())
 
         app_config["proxy"] = proxy_entry.get().strip()
+        net.configure_proxy(app_config["proxy"])
         app_config["font_size"] = new_font_size
-        save_config()
+        app_config["max_workers"] = int(workers_slider.get())
+        app_config["per_host_limit"] = int(per_host_slider.get())
+        app_config["image_workers"] = int(image_slider.get())
+        app_config["text_first"] = bool(text_first_check.get())
+        chosen_dup = near_dup_menu.get()
+        app_config["near_duplicates"] = next(k for k, v in near_dup_labels.items() if v == chosen_dup)
+        if PILLOW_AVAILABLE:
+            chosen = image_format_menu.get()
+            app_config["image_format"] = next(k for k, v in image_format_labels.items() if v == chosen)
+            try:
+                app_config["image_max_width"] = max(0, int(image_width_entry.get().strip() or 0))
+            except ValueError:
+                pass # 填的不是数字，保留原来的设置
+        config_saver.request()
         safe_update_status("⚙️ 设置已保存", TEXT_SUB)
         settings_win.destroy()
 
@@ -497,246 +623,79 @@ def open_settings_panel():
 # ==========================================
 # 3. 核心抓取逻辑 (多线程批量升级版)
 # ==========================================
-def process_downloads_thread(urls, export_md, export_html, export_docx, export_mm, user_tags):
+def image_options_from(settings):
+    """从设置 (app_config 或任务日志里记下的选项) 取出图片优化选项 (格式、最大宽度、质量)；不用优化时为 None"""
+    image_format = settings.get("image_format", "original")
+    return make_options(None if image_format == "original" else image_format, settings.get("image_max_width", 0),
+                        settings.get("image_quality", DEFAULT_QUALITY))
+
+def current_image_options():
+    """设置里的图片优化选项；不用优化时为 None"""
+    return image_options_from(app_config)
+
+def localize_deferred_job(job):
+    """图片队列的后台线程：补齐一篇文字优先文章的图片，再重新导出 (图片选项用任务里记下的，和保存目录一样)"""
+    from purifier.pipeline import ArticlePipeline
+    # 这里传的设置只给旧版本留下的、没记图片选项的任务兜底
+    pipeline = ArticlePipeline(job["save_root"], history_store, image_workers=app_config.get("image_workers", 8),
+                               image_options=current_image_options())
+    pipeline.localize_deferred(job)
+
+def on_image_queue_change(remaining):
+    # 有批量任务在跑时状态栏归它用，这里不去抢
+    if active_batch is not None:
+        return
+    if remaining:
+        safe_update_status(f"🖼️ 正在后台补齐图片，还剩 {remaining} 篇", TEXT_SUB)
+    else:
+        safe_update_status("✅ 图片已全部补齐", ("#10B981", "#9ECE6A"))
+
+def process_downloads_thread(urls, export_md, export_html, export_docx, export_mm, user_tags, journal=None, feed=None):
     """这是后台工人的车间，专门负责干苦力，不影响界面"""
-    total = len(urls)
-    success_count = 0
-    
-    # --- 新增：加载代理设置 ---
-    proxies = None
-    proxy_url = app_config.get("proxy", "").strip()
-    if proxy_url:
-        proxies = {
-            "http": proxy_url,
-            "https": proxy_url,
-        }
-
-    # 开始循环处理每一个链接
-    for i, url in enumerate(urls):
-        url = url.strip()
-        if not url: continue # 如果是空行，跳过
-        
-        # --- 新增：防重复检测 (如果历史记录里已经有了，就跳过) ---
-        if any(item.get("url") == url for item in app_config["history"]):
-            status_label.configure(text=f"⚠️ 此链接已添加过，跳过 ({i+1}/{total})", text_color="#E0AF68")
-            app.after(0, lambda v=((i + 1) / total): set_progress(v))
-            continue
-        
-        # 让后台工人通知界面更新进度
-        status_label.configure(text=f"⏳ 正在提取 ({i+1}/{total})，请稍候...", text_color="#E0AF68")
-        app.after(0, lambda v=(i / total): set_progress(v))
-        
-        try:
-            # --- 核心抓取代码（和之前一模一样）---
-            headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
-            response = requests.get(url, headers=headers, proxies=proxies, timeout=15)
-            response.encoding = 'utf-8'
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            title_tag = soup.find('h1', class_='rich_media_title')
-            title = title_tag.get_text().strip() if title_tag else "未命名文章"
-            author_tag = soup.find('a', id='js_name')
-            author_name = author_tag.get_text().strip() if author_tag else "未知公众号"
-            save_date = datetime.datetime.now().strftime("%Y-%m-%d")
-            safe_title = title.replace('/', '_').replace('\\', '_').replace('|', '_')
-            
-            content_div = soup.find('div', id='js_content')
-            
-            if not content_div:
-                print(f"[{url}] 未找到正文")
-                app.after(0, lambda v=((i + 1) / total): set_progress(v))
-                continue # 找不到正文就算了，直接抓下一篇！
-            
-            content_div = soup.find('div', id='js_content')
-            if not content_div:
-                print(f"[{url}] 未找到正文")
-                continue 
-            
-            # === 核心破解：扒掉微信正文的“隐身衣” ===
-            if content_div.has_attr('style'):
-                del content_div['style']  # 物理删除隐藏样式
-            # ========================================
-
-            # --- 新增：智能广告与冗余信息清洗 (DOM 树裁剪) ---
-            # 1. 物理消灭已知组件：干掉所有微信小程序卡片、视频号名片、语音等多媒体干扰
-            for bad_tag in content_div.find_all(['mp-miniprogram', 'mp-common-profile', 'mpvoice']):
-                bad_tag.decompose()
-                
-            # 2. 语义消灭推广文本：定义一个“垃圾词黑名单”
-            trash_keywords = ["阅读原文", "喜欢此内容的人还喜欢", "长按扫码", "关注公众号", "点击上方卡片", "扫码关注"]
-            
-            # 遍历文章里所有的段落 <p> 和区块 <section>
-            for tag in content_div.find_all(['p', 'section']):
-                # 把里面的文字提取出来，去掉空格
-                text = tag.get_text().replace(" ", "").replace("\n", "").strip()
-                
-                # 如果这句话里包含了黑名单里的词，并且这句话不是很长（防止误杀包含了这些词的正常长篇大论）
-                if len(text) < 30:
-                    for kw in trash_keywords:
-                        if kw in text:
-                            tag.decompose() # 毫不留情地从内存中销毁这个段落
-                            break # 这个段落已经没了，跳出当前循环，去检查下一个段落
-            # --------------------------------------------------
-
-            current_month = datetime.datetime.now().strftime("%Y-%m")
-            final_save_dir = os.path.join(current_save_path, current_month)
-            os.makedirs(final_save_dir, exist_ok=True) 
-            assets_dir = os.path.join(final_save_dir, "assets")
-            os.makedirs(assets_dir, exist_ok=True) 
-            full_file_path = os.path.join(final_save_dir, f"{safe_title}.md") 
-                
-            img_counter = 1
-            for img in content_div.find_all('img'):
-                real_url = img.get('data-src') or img.get('src')
-                if real_url:
-                    try:
-                        img_filename = f"{safe_title}_img{img_counter}.jpg"
-                        img_full_path = os.path.join(assets_dir, img_filename)
-                        img_response = requests.get(real_url, headers=headers, timeout=10, proxies=proxies)
-                        with open(img_full_path, 'wb') as img_file:
-                            img_file.write(img_response.content)
-                        img['src'] = f"./assets/{img_filename}"
-                        img_counter += 1
-                    except Exception:
-                        img['src'] = real_url
-                    
-            converter = html2text.HTML2Text()
-            converter.ignore_links = False
-            converter.body_width = 0
-            markdown_content = converter.handle(str(content_div))
-            
-            # --- 处理标签 ---
-            tags_list = ["微信摘录", "待阅读"]
-            if user_tags:
-                # 支持中文逗号和英文逗号，自动去空格
-                extras = [t.strip() for t in user_tags.replace("，", ",").split(",") if t.strip()]
-                tags_list.extend(extras)
-            tags_str = ", ".join(tags_list)
-            
-            yaml_frontmatter = f"---\ntitle: \"{title}\"\nauthor: \"{author_name}\"\nsource: \"{url}\"\ndate_saved: \"{save_date}\"\ntags: [{tags_str}]\n---\n\n"
-            
-            # 1. 保存 Markdown
-            if export_md:
-                with open(full_file_path, 'w', encoding='utf-8') as f:
-                    f.write(yaml_frontmatter)
-                    f.write(f"# {title}\n\n")
-                    f.write(markdown_content)
-            
-            # 准备 HTML 内容 (用于 HTML 导出和 PDF 生成)
-            html_style = "<style>body{max-width:800px;margin:40px auto;padding:0 20px;line-height:1.6;color:#333;font-family:sans-serif;}img{max-width:100%;height:auto;display:block;margin:20px auto;}</style>"
-            html_content = f"<html><head><meta charset='utf-8'><title>{title}</title>{html_style}</head><body><h1>{title}</h1>{str(content_div)}</body></html>"
+    # 流水线要用到的重模块一般已经在后台预热好了；还没好的话，这里会等它导完
+    from purifier.pipeline import ArticlePipeline, STAGE_FETCHING, STAGE_IMAGES, STAGE_EXPORTING
+
+    urls = [u for u in urls if u.strip()] # 空行直接丢掉
+    batch_view = {"done": 0, "total": len(urls)} # 已经有结果的篇数 / 总篇数 (剪贴板追加链接后会变大)
+
+    # 每篇文章走到哪一步了 (多个工人同时在跑，状态栏只显示最新的一条动态)
+    def on_event(url, stage, detail=None):
+        if stage == STAGE_FETCHING:
+            activity = "抓取网页"
+        elif stage == STAGE_IMAGES:
+            activity = f"下载图片 {detail[0]}/{detail[1]}"
+        elif stage == STAGE_EXPORTING:
+            activity = "导出文件"
+        else:
+            return # 完成 / 失败 / 跳过 由 on_progress 汇报
+        safe_update_status(f"⏳ 正在提取 ({batch_view['done']}/{batch_view['total']}) · {activity}", "#E0AF68")
 
-            # === 2. 保存极简 HTML (物理破解微信隐身衣版) ===
-            html_file_path = full_file_path.replace(".md", ".html")
-            
-            # 物理魔法：既然它是对象，我们直接强行修改它的 style 属性！
-            if content_div.has_attr('style'):
-                content_div['style'] = "visibility: visible; opacity: 1; display: block;"
-            else:
-                # 就算它没有 style，我们也硬塞一个可见属性进去以防万一
-                content_div['style'] = "visibility: visible; opacity: 1; display: block;"
-
-            with open(html_file_path, 'w', encoding='utf-8') as f:
-                f.write(f"<html><head><meta charset='utf-8'><title>{title}</title>")
-                # 加上排版 CSS
-                ultimate_css = """
-                <style>
-                    body { max-width:800px; margin:40px auto; padding:0 20px; line-height:1.6; color:#333; font-family:sans-serif; }
-                    img { max-width:100%; height:auto; display:block; margin:20px auto; border-radius:8px; }
-                </style>
-                """
-                f.write(f"{ultimate_css}</head>")
-                # 这时候的 str(content_div) 里的 style 已经被我们彻底改写成 visible 了！
-                f.write(f"<body><h1>{title}</h1>{str(content_div)}</body></html>")
-            # ==========================================
-
-
-            # 4. 保存 Word (docx)
-            if export_docx and HtmlToDocx:
-                docx_file_path = full_file_path.replace(".md", ".docx")
-                try:
-                    doc = Document()
-                    new_parser = HtmlToDocx()
-                    # 构造 Word 需要的 HTML (处理图片路径为绝对路径，确保 Word 能找到图片)
-                    abs_assets_dir = assets_dir.replace("\\", "/")
-                    if not abs_assets_dir.endswith("/"): abs_assets_dir += "/"
-                    word_html = str(content_div).replace('src="./assets/', f'src="{abs_assets_dir}')
-                    
-                    doc.add_heading(title, 0) # 添加大标题
-                    new_parser.add_html_to_document(word_html, doc)
-                    doc.save(docx_file_path)
-                except Exception as e:
-                    print(f"Word 导出失败: {e}")
-
-            # 5. 保存思维导图 (.mm)
-            if export_mm:
-                mm_file_path = full_file_path.replace(".md", ".mm")
-                try:
-                    # 创建根节点
-                    root = ET.Element("map", version="1.0.1")
-                    main_node = ET.SubElement(root, "node", TEXT=title)
-                    
-                    # 简单的层级堆栈算法
-                    # 初始堆栈包含根节点，假设它的层级是 0
-                    stack = [{"level": 0, "node": main_node}]
-                    
-                    # 查找正文中的所有标题 (h1-h6)
-                    headers = content_div.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                    
-                    if not headers:
-                        ET.SubElement(main_node, "node", TEXT="（此文章未检测到目录结构）")
-                    
-                    for h in headers:
-                        try:
-                            current_level = int(h.name[1]) # h1->1, h2->2
-                        except:
-                            current_level = 2
-                            
-                        text = h.get_text().strip()
-                        if not text: continue
-                        if len(text) > 50: text = text[:50] + "..." # 限制节点文字长度
-                        
-                        # 回溯堆栈：找到当前标题的“父级”
-                        while len(stack) > 1 and stack[-1]["level"] >= current_level:
-                            stack.pop()
-                        
-                        parent = stack[-1]["node"]
-                        new_node = ET.SubElement(parent, "node", TEXT=text)
-                        stack.append({"level": current_level, "node": new_node})
-                        
-                    tree = ET.ElementTree(root)
-                    tree.write(mm_file_path, encoding="utf-8", xml_declaration=True)
-                except Exception as e:
-                    print(f"MindMap error: {e}")
-
-            success_count += 1 
-            
-            # === 新增：往记忆卡里写历史记录 ===
-            # 把这篇成功抓取的文章信息（标题、链接、时间）插到列表的第 0 个位置（最前面）
-            app_config["history"].insert(0, {"title": title, "url": url, "date": save_date})
-            # 只保留最近的 20 条，防止日记本太厚拖慢程序
-            app_config["history"] = app_config["history"][:20]
-            save_config() # 立刻存入硬盘！
-            # ==================================
-            
-        except Exception as e:
-            print(f"[{url}] 出错: {e}")
-            # 出错了也没关系，后台工人会自动继续处理下一篇！
-            
-        # 本次循环结束，更新进度条
-        app.after(0, lambda v=((i + 1) / total): set_progress(v))
-            
-    # --- 循环结束：所有链接都处理完了 ---
-    # 安全锁 2：把更新界面和清空输入框的工作，交回给主线程（app.after）去执行，绝对不会卡死或静默失败！
+    # --- 循环结束 (或者出错了) 之后的收尾 ---
+    # 安全锁 2：把更新界面和清空输入框的工作，交回给主线程 (经由界面更新总线) 去执行，绝对不会卡死或静默失败！
     def update_ui_on_finish():
-        global is_processing
+        global is_processing, active_batch
         is_processing = False 
-        if success_count == 0 and total > 0:
+        active_batch = None
+        success_count, unchanged_count, duplicate_count, failed_count, total = (
+            outcome["saved"], outcome["unchanged"], outcome["duplicate"], outcome["failed"], outcome["total"])
+        if outcome["error"] is not None:
+            # 批次根本没跑起来 (配置写坏了、缓存 / 队列打不开之类)，任务日志留着，修好后还能继续
+            status_label.configure(text=f"❌ 批量任务出错: {outcome['error']}", text_color="#F7768E")
+        elif success_count == 0 and unchanged_count > 0:
+            status_label.configure(text=f"✔️ 重新提取的 {unchanged_count} 篇文章都没有更新", text_color=("#10B981", "#9ECE6A"))
+        elif success_count == 0 and total > 0:
             status_label.configure(text="⚠️ 没有新文章被保存 (可能已存在)", text_color="#E0AF68")
         else:
             status_label.configure(text=f"✅ 批量完成！共成功处理 {success_count}/{total} 篇", text_color=("#10B981", "#9ECE6A"))
+        if outcome["error"] is None and success_count and unchanged_count:
+            status_label.configure(text=status_label.cget("text") + f"，{unchanged_count} 篇没有更新")
+        if duplicate_count:
+            status_label.configure(text=status_label.cget("text") + f"，{duplicate_count} 篇是转载")
+        if failed_count:
+            # 失败的文章不再只是悄悄 print，直接在状态栏提醒
+            status_label.configure(text=status_label.cget("text") + f"，❌ {failed_count} 篇失败", text_color="#F7768E")
             
-        download_btn.configure(state="normal", text="已完成提取并保存")
+        download_btn.configure(state="normal", text="开始提取并保存" if outcome["error"] is not None else "已完成提取并保存")
         # progress_bar.pack_forget() # 任务完成后不再隐藏进度条
         
         # 只要有一篇抓取成功，就自动清空输入框，从根源上防止你二次误触重复保存！
@@ -744,10 +703,71 @@ def process_downloads_thread(urls, export_md, export_html, export_docx, export_m
             url_textbox.delete("0.0", "end")
             # 弹窗询问 (这是一个非常贴心的产品细节)
             if messagebox.askyesno("任务完成", f"成功提取 {success_count} 篇文章！\n是否立即打开文件夹查看？"):
-                os.startfile(os.path.join(current_save_path, datetime.datetime.now().strftime("%Y-%m")))
+                os.startfile(os.path.join(save_root, datetime.datetime.now().strftime("%Y-%m")))
 
-    # 0 毫秒后，立刻让主线程执行上面的 update_ui_on_finish 函数
-    app.after(0, update_ui_on_finish)
+        # 这批收尾的那一小会儿里复制的链接，没赶上这一批，现在另起一批
+        if clipboard_backlog:
+            start_clipboard_batch()
+
+    # 批次的结果；出错时 error 是错误信息，界面收尾照样要做 (按钮恢复、active_batch 清空)
+    outcome = {"saved": 0, "unchanged": 0, "duplicate": 0, "failed": 0, "total": 0, "error": None}
+    save_root = current_save_path
+    try:
+        # 继续上次的任务时，保存目录和图片选项用当时记在任务日志里的 (中途改了设置也不会存到别处)
+        job_options = journal.options if journal is not None else {}
+        save_root = job_options.get("save_root", current_save_path)
+        image_options = image_options_from(job_options) if "image_format" in job_options else current_image_options()
+
+        # journal 会实时记下每篇文章的进度，软件中途被关掉，下次启动可以从断点继续
+        pipeline = ArticlePipeline(save_root, history_store, page_cache,
+                                   image_workers=app_config.get("image_workers", 8), journal=journal, on_event=on_event,
+                                   max_page_bytes=int(app_config.get("max_page_mb", 10) * 1024 * 1024),
+                                   image_options=image_options,
+                                   image_queue=image_queue if app_config.get("text_first") else None,
+                                   near_duplicates=app_config.get("near_duplicates", "link"))
+
+        # 让后台工人通知界面更新进度 (每完成一篇回调一次)
+        def on_progress(done, total_count, url, status):
+            batch_view["done"] = done
+            batch_view["total"] = total_count
+            if status == STATUS_SKIPPED:
+                safe_update_status(f"⚠️ 此链接已添加过，跳过 ({done}/{total_count})", "#E0AF68")
+            elif status == STATUS_UNCHANGED:
+                safe_update_status(f"✔️ 文章没有更新，不用重写 ({done}/{total_count})", "#E0AF68")
+            elif status == STATUS_DUPLICATE:
+                safe_update_status(f"⚠️ 这篇是已保存文章的转载，不重复保存 ({done}/{total_count})", "#E0AF68")
+            elif status == STATUS_FAILED:
+                safe_update_status(f"❌ 有一篇处理失败 ({done}/{total_count})，继续处理其余文章...", "#F7768E")
+            else:
+                safe_update_status(f"⏳ 正在提取 ({done}/{total_count})，请稍候...", "#E0AF68")
+            safe_set_progress(done / total_count)
+
+        safe_update_status(f"⏳ 正在提取 (0/{batch_view['total']})，请稍候...", "#E0AF68")
+        # 开始并发处理每一个链接 (工人数量和单站点并发上限都可以在设置里调整)
+        # 勾选了的格式 (名字对应 purifier.exporters 里注册的导出器)
+        formats = [name for name, checked in (("md", export_md), ("html", export_html), ("docx", export_docx), ("mm", export_mm)) if checked]
+        results = pipeline.run(
+            urls, formats, user_tags,
+            max_workers=app_config.get("max_workers", 4),
+            per_host_limit=app_config.get("per_host_limit", 2),
+            on_progress=on_progress, feed=feed, refresh_urls=refresh_urls, fresh_urls=fresh_urls,
+        )
+    except Exception as e:
+        outcome["error"] = str(e) or type(e).__name__
+        print(f"批量任务出错: {outcome['error']}")
+        if journal is not None:
+            journal.close() # 不删日志，下次启动可以从断点继续
+    else:
+        outcome.update(total=len(results), # 含批次进行中从剪贴板追加的链接
+                       saved=results.count(STATUS_SAVED), unchanged=results.count(STATUS_UNCHANGED),
+                       duplicate=results.count(STATUS_DUPLICATE), failed=results.count(STATUS_FAILED))
+        if journal is not None:
+            journal.finish() # 整批跑完，任务日志就可以删掉了
+    finally:
+        refresh_urls.difference_update(urls)
+        fresh_urls.difference_update(urls)
+        # 下一帧让主线程执行上面的 update_ui_on_finish 函数 (排在之前所有进度更新的后面)，出错了也一定会执行
+        ui_bus.post(update_ui_on_finish)
 
 def start_download():
     """这是主线程老板，只负责接单，然后分配给工人"""
@@ -759,7 +779,7 @@ def start_download():
     raw_text = url_textbox.get("0.0", "end").replace("批量模式：在此处粘贴链接，每行一个...", "")
     
     # 2. 提取出所有包含 "http" 的真实链接，放进一个列表里
-    urls = [line.strip() for line in raw_text.split('\n') if "http" in line]
+    urls = split_links(raw_text)
     
     if not urls:
         status_label.configure(text="提示：请先粘贴有效的链接", text_color="#F7768E")
@@ -774,6 +794,26 @@ def start_download():
     # 获取用户输入的标签
     user_tags = tags_entry.get()
 
+    # 先把任务写进日志 (所有链接记为排队中)，万一中途关掉软件还能接着跑
+    journal = JobJournal.create(JOBS_DIR, urls, {
+        "md": save_md, "html": save_html, "docx": save_docx, "mm": save_mm, "tags": user_tags,
+        "refresh": [u for u in urls if u.strip() in refresh_urls],
+        "fresh": [u for u in urls if u.strip() in fresh_urls],
+        # 续传时沿用这次的保存目录和图片选项
+        "save_root": current_save_path, "image_format": app_config.get("image_format", "original"),
+        "image_max_width": app_config.get("image_max_width", 0), "image_quality": DEFAULT_QUALITY,
+    })
+    launch_batch(urls, save_md, save_html, save_docx, save_mm, user_tags, journal)
+
+# 正在跑的批次 (剪贴板里新复制的链接直接追加进去)；没有任务时为 None
+active_batch = None
+# 从历史面板点 “提取” 放进输入框的链接：不当重复跳过，而是从网页缓存重新导出 (缓存里没有才联网，没变就不重写)
+refresh_urls = set()
+# 从历史面板点 “更新” 放进输入框的链接：联网检查文章有没有更新
+fresh_urls = set()
+
+def launch_batch(urls, save_md, save_html, save_docx, save_mm, user_tags, journal):
+    global active_batch
     # 老板把按钮变灰，防止你连续狂点
     download_btn.configure(state="disabled", text="流水线运转中...")
     
@@ -781,11 +821,35 @@ def start_download():
     set_progress(0)
     
     # 3. 核心魔法：召唤一个后台线程，把 urls 列表扔给它去干活
-    thread = threading.Thread(target=process_downloads_thread, args=(urls, save_md, save_html, save_docx, save_mm, user_tags))
-    # 设为守护线程（意味着如果你关掉软件，后台下载也会立刻停止，不会在电脑后台变成幽灵）
+    feed = BatchFeed()
+    # accepted: 这一批已经收下的链接 (剪贴板再复制一次不会重复追加)
+    active_batch = {"feed": feed, "journal": journal, "accepted": {u.strip() for u in urls}}
+    thread = threading.Thread(target=process_downloads_thread, args=(urls, save_md, save_html, save_docx, save_mm, user_tags),
+                              kwargs={"journal": journal, "feed": feed})
+    # 设为守护线程（意味着如果你关掉软件，后台下载也会立刻停止，不会在电脑后台变成幽灵；进度已经记在任务日志里）
     thread.daemon = True 
     thread.start()
 
+def offer_resume_unfinished_job():
+    """启动时检查有没有上次没跑完的批量任务，有的话询问是否从断点继续"""
+    journals = find_unfinished(JOBS_DIR)
+    if not journals:
+        return
+    journal = journals[0] # 只续最近的一次，更早的任务日志先不管
+    for older in journals[1:]:
+        older.close()
+
+    pending = journal.pending_urls()
+    if messagebox.askyesno("继续上次的任务", f"上次的批量任务还有 {len(pending)} 篇文章没有完成 (含失败待重试的)。\n是否从断点继续？"):
+        opts = journal.options
+        refresh_urls.update(opts.get("refresh", []))
+        fresh_urls.update(opts.get("fresh", []))
+        safe_update_status(f"🔁 继续上次的任务，剩余 {len(pending)} 篇", ACCENT_COLOR)
+        launch_batch(pending, opts.get("md", 1), opts.get("html", 1), opts.get("docx", 0), opts.get("mm", 0),
+                     opts.get("tags", ""), journal)
+    else:
+        journal.discard()
+
 # ==========================================
 # 4. 历史记录独立面板 (悬浮窗口)
 # ==========================================
@@ -804,7 +868,7 @@ def open_history_panel():
     def save_win_size():
         # geometry() 返回 "WxH+X+Y"，我们只需要 "WxH" (尺寸)，不需要位置
         app_config["history_window_size"] = history_win.geometry().split("+")[0]
-        save_config()
+        config_saver.request()
 
     # 绑定关闭窗口事件 (点击右上角叉号时触发)
     history_win.protocol("WM_DELETE_WINDOW", lambda: (save_win_size(), history_win.destroy()))
@@ -814,133 +878,262 @@ def open_history_panel():
     search_frame.pack(fill="x", padx=20, pady=(20, 0))
 
     def clear_all_history():
-        if not app_config["history"]: return
+        if not history_store.count(): return
         if messagebox.askyesno("确认", "确定要清空所有历史记录吗？\n此操作不可恢复。"):
-            app_config["history"] = []
-            save_config()
-            render_history_list([])
+            history_store.clear()
+            render_history_list()
             safe_update_status("🗑️ 历史记录已清空", TEXT_SUB)
     
-    search_entry = ctk.CTkEntry(search_frame, placeholder_text="🔍 搜索历史文章...", font=FONT_NORMAL)
+    search_entry = ctk.CTkEntry(search_frame, placeholder_text="🔍 搜索标题或正文...", font=FONT_NORMAL)
     search_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
     
     clear_btn = ctk.CTkButton(search_frame, text="🗑️ 清空", width=60, height=28, fg_color=BTN_GRAY, hover_color="#F7768E", text_color=TEXT_MAIN, font=FONT_SMALL, command=clear_all_history)
     clear_btn.pack(side="right")
     add_tooltip(clear_btn, "清空所有历史记录 (此操作不可恢复)")
     
-    # 建一个可以滚动的框架
-    scroll_frame = ctk.CTkScrollableFrame(history_win, fg_color="transparent")
-    scroll_frame.pack(fill="both", expand=True, padx=20, pady=10)
-    
-    def render_history_list(items):
-        # 先清空列表
-        for widget in scroll_frame.winfo_children():
-            widget.destroy()
-            
-        if not items:
-            ctk.CTkLabel(scroll_frame, text="没有找到相关记录", text_color=TEXT_SUB).pack(pady=40)
-            return
-
-        # 遍历日记本，把每一条记录画在滚动框架里
-        for item in items:
-            # 每条记录是一个小卡片
-            item_card = ctk.CTkFrame(scroll_frame, fg_color=INPUT_BG, corner_radius=10)
-            item_card.pack(fill="x", pady=6)
-            
-            # 左侧显示标题和日期
-            text_frame = ctk.CTkFrame(item_card, fg_color="transparent")
-            text_frame.pack(side="left", padx=15, pady=10, fill="x", expand=True)
-            
-            # 限制标题长度，太长了会破坏排版
-            display_title = item["title"][:20] + "..." if len(item["title"]) > 20 else item["title"]
-            ctk.CTkLabel(text_frame, text=display_title, font=FONT_HISTORY_TITLE, text_color=TEXT_MAIN, anchor="w").pack(fill="x")
-            ctk.CTkLabel(text_frame, text=item["date"], font=FONT_SMALL, text_color=TEXT_SUB, anchor="w").pack(fill="x")
-            
-            # 魔法函数：点击按钮，把这篇历史文章的链接，重新填进主界面的输入框里
-            def reuse_url(u=item["url"]):
-                url_textbox.insert("end", u + "\n")
-                save_win_size() # 提取时也顺便记住当前尺寸
-                history_win.destroy() # 填完之后自动关闭历史窗口
-                status_label.configure(text="✨ 链接已提取，可重新抓取", text_color=("#10B981", "#9ECE6A"))
-                
-            # 右侧操作按钮组
-            btn_frame = ctk.CTkFrame(item_card, fg_color="transparent")
-            btn_frame.pack(side="right", padx=15)
-
-            # 1. 提取按钮
-            reuse_btn = ctk.CTkButton(btn_frame, text="提取", width=45, height=24, fg_color=BTN_GRAY, hover_color=BTN_GRAY_HOVER, text_color=TEXT_MAIN, font=FONT_SMALL, command=reuse_url)
-            reuse_btn.grid(row=0, column=0, padx=2, pady=2)
-            add_tooltip(reuse_btn, "将此链接重新添加到主界面的输入框")
-
-            # 2. 预览按钮 (新功能：直接用浏览器打开刚抓好的 HTML)
-            def preview_article(t=item["title"], d=item["date"]):
-                safe_t = t.replace('/', '_').replace('\\', '_').replace('|', '_')
-                target_path = os.path.join(app_config["save_path"], d[:7], f"{safe_t}.html")
-                if os.path.exists(target_path):
-                    # 使用 pathlib 转换路径为 URI，解决中文路径浏览器打不开的问题
-                    webbrowser.open(pathlib.Path(target_path).as_uri())
-                else:
-                    safe_update_status("⚠️ 找不到预览文件", "#F7768E")
-
-            preview_btn = ctk.CTkButton(btn_frame, text="预览", width=45, height=24, fg_color="#4ECDC4", hover_color="#3EBDB4", text_color="#1A1B26", font=FONT_SMALL, command=preview_article)
-            preview_btn.grid(row=0, column=1, padx=2, pady=2)
-            add_tooltip(preview_btn, "用默认浏览器打开已保存的 HTML 文件")
-
-            # 3. Markdown 源码预览 (新增)
-            def preview_markdown(t=item["title"], d=item["date"]):
-                safe_t = t.replace('/', '_').replace('\\', '_').replace('|', '_')
-                target_path = os.path.join(app_config["save_path"], d[:7], f"{safe_t}.md")
-                
-                if os.path.exists(target_path):
-                    try:
-                        with open(target_path, 'r', encoding='utf-8') as f:
-                            content = f.read()
-                        
-                        # 弹窗显示内容
-                        top = ctk.CTkToplevel(app)
-                        top.geometry("700x600")
-                        top.title(f"Markdown 源码: {t}")
-                        top.attributes("-topmost", True)
-                        
-                        # 使用等宽字体显示源码，方便阅读代码
-                        textbox = ctk.CTkTextbox(top, font=("Consolas", BASE_FONT_SIZE), wrap="word")
-                        textbox.pack(fill="both", expand=True, padx=10, pady=10)
-                        textbox.insert("0.0", content)
-                    except Exception as e:
-                        safe_update_status(f"❌ 读取错误: {e}", "#F7768E")
-                else:
-                    safe_update_status("⚠️ 找不到 Markdown 文件", "#F7768E")
-            md_btn = ctk.CTkButton(btn_frame, text="MD", width=45, height=24, fg_color="#7289DA", hover_color="#5B6EA5", text_color="#FFFFFF", font=FONT_SMALL, command=preview_markdown)
-            md_btn.grid(row=1, column=0, padx=2, pady=2)
-            add_tooltip(md_btn, "在新窗口中预览 Markdown 源码")
-
-            # 4. 删除按钮
-            def delete_item(i=item, card=item_card):
-                if i in app_config["history"]:
-                    app_config["history"].remove(i)
-                    save_config()
-                    card.destroy() # 视觉上移除这个卡片
-
-            del_btn = ctk.CTkButton(btn_frame, text="删除", width=45, height=24, 
-                                    fg_color="transparent", hover_color=BTN_GRAY_HOVER, 
-                                    text_color=("#EF4444", "#F87171"), font=FONT_SMALL, command=delete_item)
-            del_btn.grid(row=1, column=1, padx=2, pady=2)
-            add_tooltip(del_btn, "从历史记录中移除此条目")
+    # --- 虚拟列表：历史可能有上万条，只为窗口里看得见的几行建控件 ---
+    # 滚动时不新建/销毁卡片，只把下一批记录的文字换到这几张卡片上；记录按需从数据库分块读取
+    ROW_HEIGHT = BASE_FONT_SIZE * 4 + 28 # 每张卡片的高度 (按字号估算)
+    SNIPPET_EXTRA = BASE_FONT_SIZE * 2 + 8 # 全文检索结果多出一段正文摘要
+    FETCH_BLOCK = 100 # 每次从数据库读多少条
+    SEARCH_DELAY_MS = 250 # 停止输入这么久之后才真正搜索
+
+    list_frame = ctk.CTkFrame(history_win, fg_color="transparent")
+    list_frame.pack(fill="both", expand=True, padx=20, pady=10)
+    rows_frame = ctk.CTkFrame(list_frame, fg_color="transparent")
+    rows_frame.pack(side="left", fill="both", expand=True)
+    rows_frame.grid_propagate(False) # 卡片多出窗口的部分直接裁掉，不撑大窗口
+    rows_frame.grid_columnconfigure(0, weight=1)
+    empty_label = ctk.CTkLabel(rows_frame, text="没有找到相关记录", text_color=TEXT_SUB)
+
+    list_state = {
+        "query": "", "total": 0, "first": 0, # 当前结果总数、第一行显示的是第几条
+        "block_start": 0, "block": [], # 从数据库读来的一块记录
+        "snippets": False, "search_job": None,
+    }
+    rows = [] # 复用的卡片
+
+    ROW_GAP = 6 # 卡片之间的间距
+
+    def row_height():
+        return ROW_HEIGHT + (SNIPPET_EXTRA if list_state["snippets"] else 0)
+
+    def visible_count():
+        """窗口里能完整显示几行 (至少 1 行)；高分屏上控件尺寸会被放大，要按实际像素算"""
+        try:
+            scaling = ctk.ScalingTracker.get_widget_scaling(rows_frame)
+        except Exception:
+            scaling = 1.0
+        return max(1, int(rows_frame.winfo_height() // ((row_height() + ROW_GAP) * scaling)))
+
+    def fetch_items(first, count):
+        """取第 first 条开始的 count 条记录，不在手头这一块里就重新读一块"""
+        start, block = list_state["block_start"], list_state["block"]
+        if first < start or first + count > start + len(block):
+            start = max(0, first - FETCH_BLOCK // 4) # 往前多读一点，往回滚也不用马上再查
+            block = history_store.page(start, FETCH_BLOCK, list_state["query"])
+            list_state["block_start"], list_state["block"] = start, block
+        return block[first - start:first - start + count]
+
+    def invalidate():
+        list_state["block_start"], list_state["block"] = 0, []
+
+    # 卡片上按钮的动作都读 row["item"]，换了记录不用重新绑定
+    def reuse_url(item, fresh=False):
+        url_textbox.insert("end", item["url"] + "\n")
+        # 从历史里提取的链接不当重复跳过：默认从网页缓存重新导出 (换了格式也不用联网)，“更新” 才联网检查
+        (fresh_urls if fresh else refresh_urls).add(item["url"])
+        save_win_size() # 提取时也顺便记住当前尺寸
+        history_win.destroy() # 填完之后自动关闭历史窗口
+        status_label.configure(text="✨ 链接已提取，可重新抓取", text_color=("#10B981", "#9ECE6A"))
+
+    def saved_file(item, suffix):
+        safe_t = item["title"].replace('/', '_').replace('\\', '_').replace('|', '_')
+        return os.path.join(app_config["save_path"], item["date"][:7], f"{safe_t}{suffix}")
+
+    # 预览按钮 (直接用浏览器打开刚抓好的 HTML)
+    def preview_article(item):
+        target_path = saved_file(item, ".html")
+        if os.path.exists(target_path):
+            # 使用 pathlib 转换路径为 URI，解决中文路径浏览器打不开的问题
+            webbrowser.open(pathlib.Path(target_path).as_uri())
+        else:
+            safe_update_status("⚠️ 找不到预览文件", "#F7768E")
+
+    # Markdown 源码预览
+    def preview_markdown(item):
+        target_path = saved_file(item, ".md")
+        if os.path.exists(target_path):
+            try:
+                with open(target_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+
+                # 弹窗显示内容
+                top = ctk.CTkToplevel(app)
+                top.geometry("700x600")
+                top.title(f"Markdown 源码: {item['title']}")
+                top.attributes("-topmost", True)
+
+                # 使用等宽字体显示源码，方便阅读代码
+                textbox = ctk.CTkTextbox(top, font=("Consolas", BASE_FONT_SIZE), wrap="word")
+                textbox.pack(fill="both", expand=True, padx=10, pady=10)
+                textbox.insert("0.0", content)
+            except Exception as e:
+                safe_update_status(f"❌ 读取错误: {e}", "#F7768E")
+        else:
+            safe_update_status("⚠️ 找不到 Markdown 文件", "#F7768E")
+
+    def delete_item(item):
+        history_store.remove(item["url"])
+        list_state["total"] -= 1 # 后面的记录往前挪了一位，重新取一次就行
+        invalidate()
+        refresh()
+
+    def make_row():
+        """建一张空卡片 (只在窗口变大、需要更多行时才会调用)"""
+        row = {"item": None}
+        card = ctk.CTkFrame(rows_frame, fg_color=INPUT_BG, corner_radius=10, height=row_height())
+        card.pack_propagate(False) # 固定高度，行高一致才能按行号定位
+        row["card"] = card
+
+        # 左侧显示标题和日期
+        text_frame = ctk.CTkFrame(card, fg_color="transparent")
+        text_frame.pack(side="left", padx=15, pady=8, fill="both", expand=True)
+        row["title"] = ctk.CTkLabel(text_frame, text="", font=FONT_HISTORY_TITLE, text_color=TEXT_MAIN, anchor="w")
+        row["title"].pack(fill="x")
+        row["date"] = ctk.CTkLabel(text_frame, text="", font=FONT_SMALL, text_color=TEXT_SUB, anchor="w")
+        row["date"].pack(fill="x")
+        # 全文检索的结果，额外显示一小段命中位置的正文
+        row["snippet"] = ctk.CTkLabel(text_frame, text="", font=FONT_SMALL, text_color=TEXT_SUB,
+                                      anchor="w", justify="left", wraplength=260)
+
+        # 右侧操作按钮组
+        btn_frame = ctk.CTkFrame(card, fg_color="transparent")
+        btn_frame.pack(side="right", padx=15)
+
+        # 1. 提取按钮
+        reuse_btn = ctk.CTkButton(btn_frame, text="提取", width=45, height=24, fg_color=BTN_GRAY, hover_color=BTN_GRAY_HOVER, text_color=TEXT_MAIN, font=FONT_SMALL, command=lambda: reuse_url(row["item"]))
+        reuse_btn.grid(row=0, column=0, padx=2, pady=2)
+        add_tooltip(reuse_btn, "将此链接重新添加到主界面的输入框 (优先用本地缓存重新导出)")
+
+        update_btn = ctk.CTkButton(btn_frame, text="更新", width=45, height=24, fg_color=BTN_GRAY, hover_color=BTN_GRAY_HOVER, text_color=TEXT_MAIN, font=FONT_SMALL, command=lambda: reuse_url(row["item"], fresh=True))
+        update_btn.grid(row=0, column=2, padx=2, pady=2)
+        add_tooltip(update_btn, "将此链接添加到输入框，联网检查文章有没有更新")
+
+        # 2. 预览按钮
+        preview_btn = ctk.CTkButton(btn_frame, text="预览", width=45, height=24, fg_color="#4ECDC4", hover_color="#3EBDB4", text_color="#1A1B26", font=FONT_SMALL, command=lambda: preview_article(row["item"]))
+        preview_btn.grid(row=0, column=1, padx=2, pady=2)
+        add_tooltip(preview_btn, "用默认浏览器打开已保存的 HTML 文件")
+
+        # 3. Markdown 源码预览
+        md_btn = ctk.CTkButton(btn_frame, text="MD", width=45, height=24, fg_color="#7289DA", hover_color="#5B6EA5", text_color="#FFFFFF", font=FONT_SMALL, command=lambda: preview_markdown(row["item"]))
+        md_btn.grid(row=1, column=0, padx=2, pady=2)
+        add_tooltip(md_btn, "在新窗口中预览 Markdown 源码")
+
+        # 4. 删除按钮
+        del_btn = ctk.CTkButton(btn_frame, text="删除", width=45, height=24,
+                                fg_color="transparent", hover_color=BTN_GRAY_HOVER,
+                                text_color=("#EF4444", "#F87171"), font=FONT_SMALL, command=lambda: delete_item(row["item"]))
+        del_btn.grid(row=1, column=1, padx=2, pady=2)
+        add_tooltip(del_btn, "从历史记录中移除此条目")
+        return row
+
+    def bind_row(row, item):
+        """把一条记录的内容换到卡片上"""
+        row["item"] = item
+        # 限制标题长度，太长了会破坏排版
+        display_title = item["title"][:20] + "..." if len(item["title"]) > 20 else item["title"]
+        row["title"].configure(text=display_title)
+        row["date"].configure(text=item["date"])
+        if item.get("snippet"):
+            row["snippet"].configure(text=item["snippet"].replace("\n", " "))
+            row["snippet"].pack(fill="x")
+        else:
+            row["snippet"].pack_forget()
+
+    def refresh():
+        """按当前滚动位置重新填一遍卡片 (只改文字，不新建控件)"""
+        count = visible_count()
+        while len(rows) < count:
+            rows.append(make_row())
+        total = list_state["total"]
+        first = min(list_state["first"], max(0, total - count))
+        list_state["first"] = first
+
+        items = fetch_items(first, count) if total else []
+        height = row_height()
+        for i, row in enumerate(rows):
+            if i < len(items):
+                row["card"].configure(height=height)
+                bind_row(row, items[i])
+                row["card"].grid(row=i, column=0, sticky="ew", pady=(0, ROW_GAP))
+            else:
+                row["item"] = None
+                row["card"].grid_remove()
+
+        if total:
+            empty_label.place_forget()
+            scrollbar.set(first / total, min(1.0, (first + count) / total))
+        else:
+            empty_label.place(relx=0.5, rely=0.2, anchor="center")
+            scrollbar.set(0, 1)
+
+    def scroll_to(first):
+        first = max(0, min(int(first), list_state["total"] - visible_count()))
+        if first != list_state["first"]:
+            list_state["first"] = first
+            refresh()
+
+    def on_scrollbar(*args):
+        # 滚动条回调和 Tk 原生滚动条一样：("moveto", 比例) 或 ("scroll", 步数, "units"/"pages")
+        if args[0] == "moveto":
+            scroll_to(round(float(args[1]) * list_state["total"]))
+        elif args[0] == "scroll" and float(args[1]):
+            step = visible_count() if args[2] == "pages" else 1
+            scroll_to(list_state["first"] + (step if float(args[1]) > 0 else -step))
+
+    def on_mouse_wheel(event):
+        if getattr(event, "num", None) == 4: # Linux 的滚轮是 Button-4/5
+            delta = -1
+        elif getattr(event, "num", None) == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        scroll_to(list_state["first"] + delta * 3)
+
+    scrollbar = ctk.CTkScrollbar(list_frame, orientation="vertical", command=on_scrollbar)
+    scrollbar.pack(side="right", fill="y")
+    # 窗口里所有控件的事件都会经过这个窗口，在这里统一接滚轮
+    history_win.bind("<MouseWheel>", on_mouse_wheel)
+    history_win.bind("<Button-4>", on_mouse_wheel)
+    history_win.bind("<Button-5>", on_mouse_wheel)
+    rows_frame.bind("<Configure>", lambda event: refresh()) # 窗口大小变了，行数跟着变
+
+    def render_history_list():
+        """按当前搜索词重新查总数，回到第一行"""
+        list_state["total"] = history_store.count(list_state["query"])
+        # 全文检索的结果带正文摘要，卡片要高一点
+        list_state["snippets"] = bool(list_state["query"]) and history_store.uses_full_text(list_state["query"])
+        list_state["first"] = 0
+        invalidate()
+        refresh()
 
     # 初始渲染
-    render_history_list(app_config["history"])
+    render_history_list()
+
+    # 搜索过滤函数 (交给数据库：关键词够长就全文检索正文，按相关度排序；否则按标题/日期过滤)
+    # 连续打字时不是每个按键都查一次库，停下来 SEARCH_DELAY_MS 之后才查
+    def apply_search():
+        list_state["search_job"] = None
+        query = search_entry.get().strip()
+        if query != list_state["query"]:
+            list_state["query"] = query
+            render_history_list()
 
-    # 搜索过滤函数
     def on_search(event):
-        query = search_entry.get().strip().lower()
-        if not query:
-            render_history_list(app_config["history"])
-        else:
-            filtered_items = [
-                item for item in app_config["history"] 
-                if query in item["title"].lower() or query in item["date"]
-            ]
-            render_history_list(filtered_items)
+        if list_state["search_job"] is not None:
+            history_win.after_cancel(list_state["search_job"])
+        list_state["search_job"] = history_win.after(SEARCH_DELAY_MS, apply_search)
 
     search_entry.bind("<KeyRelease>", on_search)
 
@@ -1007,10 +1200,12 @@ def toggle_monitor():
         monitor_switch.deselect()
         return
     app_config["clipboard_monitor"] = bool(monitor_switch.get())
-    save_config()
+    config_saver.request()
     if app_config["clipboard_monitor"]:
+        clipboard_watcher.start()
         safe_update_status("👀 剪贴板监控已开启", ACCENT_COLOR)
     else:
+        clipboard_watcher.stop() # 监控线程直接退出，不再在后台定时醒来
         safe_update_status("zzz 监控已关闭", TEXT_SUB)
 
 monitor_switch = ctk.CTkSwitch(
@@ -1107,7 +1302,7 @@ def choose_folder():
         current_save_path = selected_dir
         # 当你选择新路径后，立刻呼叫记忆卡，把它存下来！
         app_config["save_path"] = current_save_path
-        save_config() 
+        config_saver.request() 
         
         display_text = os.path.basename(current_save_path)
         if not display_text: display_text = current_save_path
@@ -1172,7 +1367,7 @@ chk_html.pack(side="left", padx=10)
 add_tooltip(chk_html, "导出为 .html 文件，可在浏览器中离线阅读")
 
 chk_docx = ctk.CTkCheckBox(format_frame, text="Word", font=FONT_SMALL, text_color=TEXT_MAIN, fg_color=ACCENT_COLOR)
-if not HtmlToDocx:
+if not DOCX_AVAILABLE:
     chk_docx.configure(state="disabled", text="Word (缺库)")
 chk_docx.pack(side="left", padx=10)
 add_tooltip(chk_docx, "导出为 .docx 文件，方便在 Microsoft Word 中编辑")
@@ -1240,42 +1435,84 @@ def reset_button_state(event=None):
 
 url_textbox.bind("<KeyPress>", reset_button_state)
 
+splash_step(0.9, "启动剪贴板监控...")
+
 # ==========================================
-# 6. 剪贴板监控线程
+# 6. 剪贴板监控
 # ==========================================
-def clipboard_monitor_loop():
-    last_text = ""
-    while True:
-        # 只有开关开启且库存在时才工作
-        if app_config.get("clipboard_monitor", False) and pyperclip:
-            try:
-                # 获取剪贴板内容
-                curr_text = pyperclip.paste().strip()
-                
-                # 判断是否是新内容，且包含目标域名 (微信/知乎)
-                # 这里简单判断 http 和域名，防止误触
-                if curr_text != last_text and "http" in curr_text and ("mp.weixin.qq.com" in curr_text or "zhihu.com" in curr_text):
-                    last_text = curr_text
-                    
-                    # 只有当主按钮可用（空闲）时才触发
-                    if download_btn.cget("state") == "normal":
-                        def auto_trigger():
-                            # 1. 清空并填入链接
-                            url_textbox.delete("0.0", "end")
-                            url_textbox.insert("0.0", curr_text + "\n")
-                            # 2. 提示用户
-                            safe_update_status("⚡ 捕获剪贴板链接，自动下载中...", ACCENT_COLOR)
-                            # 3. 触发下载
-                            start_download()
-                        
-                        app.after(0, auto_trigger)
-            except Exception:
-                pass # 剪贴板访问偶尔会冲突，忽略即可
-        
-        time.sleep(0.5) # 每0.5秒检查一次
+# 正在跑的批次已经收尾、来不及追加的链接先存在这里，等这批结束后另起一批
+clipboard_backlog = []
+
+def is_target_link(text):
+    # 这里简单判断 http 和域名 (微信/知乎)，防止误触
+    return "http" in text and ("mp.weixin.qq.com" in text or "zhihu.com" in text)
+
+def split_links(text):
+    """和输入框一样按行拆开，只留包含 http 的行 (去掉首尾空白)"""
+    return [line.strip() for line in text.split('\n') if "http" in line]
+
+def start_clipboard_batch():
+    """把攒下的剪贴板链接填进输入框，按当前勾选的格式开一批 (主线程调用)"""
+    links = list(dict.fromkeys(clipboard_backlog))
+    clipboard_backlog.clear()
+    url_textbox.delete("0.0", "end")
+    url_textbox.insert("0.0", "\n".join(links) + "\n")
+    safe_update_status("⚡ 捕获剪贴板链接，自动下载中...", ACCENT_COLOR)
+    start_download()
+
+def queue_clipboard_link(text):
+    """剪贴板里出现新链接 (主线程调用)：有任务在跑就追加进这一批，没有就立刻开一批"""
+    if not app_config.get("clipboard_monitor", False):
+        return # 事件在路上时监控被关掉了
+    # 复制的可能是好几行、或者链接前后带着别的字，和输入框一样逐行拆开，只要目标链接
+    links = [link for link in split_links(text) if is_target_link(link)]
+    if not links:
+        return
+    if active_batch is not None:
+        added = 0
+        for link in links:
+            if link in active_batch["accepted"]:
+                continue # 这一批已经有了
+            if not active_batch["feed"].add(link):
+                clipboard_backlog.append(link) # 这批正在收尾，等它结束后另起一批
+                continue
+            active_batch["accepted"].add(link)
+            journal = active_batch["journal"]
+            if journal is not None:
+                journal.add_url(link) # 中途关掉软件，续传时这一篇也在 (日志里已有的状态不会被改回排队)
+            added += 1
+        if added:
+            safe_update_status(f"📋 已把 {added} 个剪贴板链接加入当前批次", ACCENT_COLOR)
+        return
+    clipboard_backlog.extend(links)
+    if download_btn.cget("state") == "normal":
+        start_clipboard_batch()
+
+def on_clipboard_change(text):
+    # 在监控线程里被调用：只挑出目标链接，真正的处理交给主线程
+    if is_target_link(text):
+        ui_bus.post(lambda: queue_clipboard_link(text))
+
+clipboard_watcher = ClipboardWatcher(pyperclip.paste if pyperclip else None, on_clipboard_change)
+# 只有开关开启且库存在时才启动；关掉开关时线程会直接退出
+if app_config.get("clipboard_monitor", False) and pyperclip:
+    clipboard_watcher.start()
+
+# 开始按固定帧率处理后台线程登记的界面更新
+pump_ui_events()
+
+# 界面搭好了：关掉启动画面，显示主窗口
+splash_step(1.0, "准备就绪")
+splash_finish()
+
+# 主窗口已经能用了，处理文章要用的重模块在后台慢慢导入，第一次点 “开始” 时就不用等
+threading.Thread(target=warm_up, daemon=True).start()
+
+# 文字优先模式的图片任务：没有任务时线程只是阻塞等着，不占资源
+image_queue.start(localize_deferred_job, on_change=on_image_queue_change)
 
-# 启动监控线程 (守护线程，随主程序关闭)
-threading.Thread(target=clipboard_monitor_loop, daemon=True).start()
+# 主窗口出来之后，再检查有没有没跑完的任务
+app.after(300, offer_resume_unfinished_job)
 
 # ==========================================
 # 启动程序 (这行原本就有，保持在最后)
@@ -0,0 +1,116 @@
+"""页面解析基准：整页 BeautifulSoup(html.parser) vs 各个解析后端的耗时和内存峰值
+
+    python benchmarks/bench_parse.py                 # 用生成的样本
+    python benchmarks/bench_parse.py page1.html ...  # 用保存下来的真实页面
+    python benchmarks/bench_parse.py --from-cache    # 用桌面版网页缓存里抓过的真实文章
+
+内存在独立子进程里测量：tracemalloc 统计 Python 对象的峰值，
+进程 RSS 峰值 (仅 Linux/macOS，含导入模块的开销) 还能看到 lxml / selectolax 在 C 层分配的内存。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from benchmarks.fixtures import load_samples  # noqa: E402
+from purifier.parser import available_backends, parse_article  # noqa: E402
+from purifier.paths import get_app_data_dir  # noqa: E402
+
+try:
+    import resource
+except ImportError: # Windows 没有 resource 模块，只报告 tracemalloc
+    resource = None
+
+LEGACY = "整页 html.parser"
+
+
+def legacy_parse(html):
+    """旧版写法：为整页建树，再查找标题、公众号名和正文"""
+    soup = BeautifulSoup(html, "html.parser")
+    title_tag = soup.find("h1", class_="rich_media_title")
+    author_tag = soup.find("a", id="js_name")
+    return title_tag, author_tag, soup.find("div", id="js_content")
+
+
+def run_parse(backend, html):
+    if backend == LEGACY:
+        return legacy_parse(html)
+    return parse_article(html, backend)
+
+
+def max_rss_kb():
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss # macOS 单位是字节，Linux 是 KB
+
+
+def measure_memory(backend, path):
+    """子进程入口：解析一次，输出内存峰值 (JSON)"""
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    tracemalloc.start()
+    result = run_parse(backend, html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(json.dumps({"py_peak_kb": peak // 1024, "rss_peak_kb": max_rss_kb()}))
+    return result
+
+
+def memory_in_subprocess(backend, path):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", backend, path],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="保存下来的微信文章 HTML")
+    parser.add_argument("--from-cache", action="store_true", help="使用桌面版网页缓存里的文章")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="每个样本跑几次取最快 (默认 3)")
+    parser.add_argument("--worker", nargs=2, metavar=("BACKEND", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        measure_memory(*args.worker)
+        return
+
+    cache_dir = os.path.join(get_app_data_dir(), "cache", "pages") if args.from_cache else None
+    samples = load_samples(args.files, cache_dir)
+    backends = [LEGACY] + available_backends()
+
+    print(f"{'样本':<20}{'后端':<18}{'耗时':>10}{'加速':>8}{'Python峰值':>12}{'RSS峰值':>10}")
+    for name, html in samples:
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", suffix=".html", delete=False) as f:
+            f.write(html)
+            sample_path = f.name
+        try:
+            legacy_time = None
+            for backend in backends:
+                best = float("inf")
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    run_parse(backend, html)
+                    best = min(best, time.perf_counter() - start)
+                if legacy_time is None:
+                    legacy_time = best
+                mem = memory_in_subprocess(backend, sample_path)
+                rss = f"{mem['rss_peak_kb'] / 1024:.1f}MB" if resource else "-"
+                print(f"{name:<20}{backend:<18}{best * 1000:>8.1f}ms{legacy_time / best:>7.1f}x"
+                      f"{mem['py_peak_kb'] / 1024:>10.1f}MB{rss:>10}")
+        finally:
+            os.remove(sample_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""整条流水线的吞吐基准：本地替身服务器 + 和桌面版 process_downloads_thread 一样的 ArticlePipeline
+
+    python benchmarks/bench_pipeline.py                          # 40 篇，并发 1/2/4/8
+    python benchmarks/bench_pipeline.py -n 100 -w 4,16 --latency 80 --jitter 40 --fail-rate 0.05
+    python benchmarks/bench_pipeline.py --cpu-workers 4         # 命令行模式 (CPU 阶段开进程池)
+    python benchmarks/bench_pipeline.py --json result.json       # 结果另存一份，方便升级前后对比
+
+每个并发档位都在独立子进程里跑 (输出目录、历史库、网页缓存都是新建的空目录)，RSS 峰值互不影响。
+各阶段耗时从流水线的 on_event 事件算出来：
+    抓取 = 抓网页 + 解析清洗；图片 = 下载全部图片；导出 = 建中间表示 + 导出各格式 + 写历史库；单篇 = 从开始到完成/失败。
+流量是替身服务器发出的响应体字节数 (含失败重试)。
+生成的样本文章都是从同一组段落里随机抽的，正文指纹几乎一样，默认关掉转载检测 (否则大半会被当成转载跳过)；
+要测转载检测本身的开销用 --near-dup link。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.standin import StandInServer  # noqa: E402
+
+try:
+    import resource
+except ImportError: # Windows 没有 resource 模块，不报告 RSS
+    resource = None
+
+STAGES = (("fetch", "抓取"), ("images", "图片"), ("export", "导出"), ("total", "单篇"))
+
+
+def max_rss_kb():
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss # macOS 单位是字节，Linux 是 KB
+
+
+def percentile(values, pct):
+    """最近秩百分位数 (样本少的时候比插值更直观)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100)) # 向上取整
+    return ordered[int(rank) - 1]
+
+
+def stage_durations(events):
+    """一篇文章的事件列表 [(阶段, 时间)] -> {fetch/images/export/total: 秒}"""
+    from purifier.pipeline import STAGE_FETCHING, STAGE_IMAGES, STAGE_EXPORTING, STAGE_DONE, STAGE_FAILED
+
+    first = {}
+    for stage, at in events:
+        first.setdefault(stage, at)
+    start = first.get(STAGE_FETCHING)
+    end = first.get(STAGE_DONE, first.get(STAGE_FAILED))
+    if start is None or end is None:
+        return {}
+    images = first.get(STAGE_IMAGES)
+    exporting = first.get(STAGE_EXPORTING)
+    durations = {"total": end - start}
+    if exporting is not None:
+        durations["fetch"] = (images if images is not None else exporting) - start
+        durations["export"] = end - exporting
+        if images is not None:
+            durations["images"] = exporting - images
+    return durations
+
+
+def run_worker(config):
+    """子进程入口：按桌面版的配置跑一批，输出 JSON"""
+    from purifier.cache import PageCache
+    from purifier.history import HistoryStore
+    from purifier.pipeline import ArticlePipeline
+
+    events = {}
+    events_lock = threading.Lock()
+
+    def on_event(url, stage, detail=None):
+        at = time.perf_counter()
+        with events_lock:
+            events.setdefault(url, []).append((stage, at))
+
+    with tempfile.TemporaryDirectory(prefix="purifier-bench-") as root:
+        data_dir = os.path.join(root, "data")
+        os.makedirs(data_dir)
+        history_store = HistoryStore(os.path.join(data_dir, "history.db"))
+        page_cache = PageCache(os.path.join(data_dir, "cache", "pages"))
+        pipeline = ArticlePipeline(os.path.join(root, "out"), history_store, page_cache,
+                                   image_workers=config["image_workers"], cpu_workers=config["cpu_workers"],
+                                   on_event=on_event, near_duplicates=config["near_dup"])
+        errors = {}
+        start = time.perf_counter()
+        results = pipeline.run(config["urls"], config["formats"], "",
+                               max_workers=config["workers"], per_host_limit=config["per_host"], errors=errors)
+        elapsed = time.perf_counter() - start
+
+    samples = {key: [] for key, _ in STAGES}
+    for url_events in events.values():
+        for key, seconds in stage_durations(url_events).items():
+            samples[key].append(seconds)
+    print(json.dumps({
+        "elapsed": elapsed,
+        "results": results,
+        "errors": sorted(set(errors.values())),
+        "samples": samples,
+        "rss_peak_kb": max_rss_kb(),
+    }, ensure_ascii=False))
+
+
+def run_level(server, config):
+    env = dict(os.environ, NO_PROXY="127.0.0.1,localhost", no_proxy="127.0.0.1,localhost") # 本机请求不走系统代理
+    before = server.stats()
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker"],
+        input=json.dumps(config), capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"子进程出错:\n{proc.stderr}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    after = server.stats()
+    result["requests"] = after["requests"] - before["requests"]
+    result["failed_requests"] = after["failures"] - before["failures"]
+    result["bytes"] = after["bytes"] - before["bytes"]
+    return result
+
+
+def parse_levels(value):
+    try:
+        levels = [int(v) for v in value.split(",") if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"并发档位要写成逗号分隔的整数: {value}")
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError(f"并发档位要写成逗号分隔的整数: {value}")
+    return levels
+
+
+def fmt_ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--articles", type=int, default=40, help="文章篇数 (默认 40)")
+    parser.add_argument("-w", "--workers", type=parse_levels, default=[1, 2, 4, 8], help="要测的并发档位 (默认 1,2,4,8)")
+    parser.add_argument("--per-host", type=int, default=0,
+                        help="同一网站最多同时几个请求 (默认 0 = 等于并发数；桌面版默认是 2)")
+    parser.add_argument("--image-workers", type=int, default=8, help="每篇文章同时下载的图片数 (默认 8)")
+    parser.add_argument("--cpu-workers", type=int, default=0, help="CPU 阶段的进程数 (默认 0 = 和桌面版一样不开进程)")
+    parser.add_argument("-f", "--formats", default="md,html", help="导出格式 (默认 md,html)")
+    parser.add_argument("--paragraphs", type=int, default=150, help="每篇文章的段落数 (默认 150，约 38 张图)")
+    parser.add_argument("--image-kb", type=int, default=60, help="每张图片的大小 KB (默认 60)")
+    parser.add_argument("--latency", type=float, default=30, help="每个请求的固定延迟 ms (默认 30)")
+    parser.add_argument("--jitter", type=float, default=20, help="每个请求额外的随机延迟上限 ms (默认 20)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="请求随机返回 503 的概率 (默认 0)")
+    parser.add_argument("--near-dup", choices=("link", "skip", "off"), default="off",
+                        help="转载检测 (默认 off；样本文章彼此都像转载)")
+    parser.add_argument("--json", metavar="PATH", help="把完整结果另存为 JSON")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(json.loads(sys.stdin.read()))
+        return
+
+    server = StandInServer.generated(
+        args.articles, paragraphs=args.paragraphs, image_kb=args.image_kb,
+        latency=args.latency / 1000, jitter=args.jitter / 1000, fail_rate=args.fail_rate,
+    ).start()
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    print(f"{args.articles} 篇，延迟 {args.latency:.0f}+{args.jitter:.0f}ms，失败率 {args.fail_rate:.0%}，"
+          f"格式 {','.join(formats)}，CPU 进程 {args.cpu_workers}")
+    header = f"{'并发':>4}{'篇/秒':>8}{'总耗时':>8}{'成功':>6}{'失败':>6}"
+    for _, label in STAGES:
+        header += f"{label + ' p50/p95':>16}"
+    print(header + f"{'流量':>9}{'RSS峰值':>9}")
+
+    report = []
+    try:
+        for workers in args.workers:
+            config = {
+                "urls": server.article_urls(), "formats": formats, "workers": workers,
+                "per_host": args.per_host or workers, "image_workers": args.image_workers,
+                "cpu_workers": args.cpu_workers, "near_dup": args.near_dup,
+            }
+            result = run_level(server, config)
+            saved = result["results"].count("saved")
+            failed = result["results"].count("failed")
+            line = (f"{workers:>4}{saved / result['elapsed']:>8.2f}{result['elapsed']:>7.1f}s"
+                    f"{saved:>6}{failed:>6}")
+            stages = {}
+            for key, _ in STAGES:
+                p50, p95 = percentile(result["samples"][key], 50), percentile(result["samples"][key], 95)
+                stages[key] = {"p50": p50, "p95": p95}
+                line += f"{fmt_ms(p50) + '/' + fmt_ms(p95) + 'ms':>16}"
+            rss = f"{result['rss_peak_kb'] / 1024:.0f}MB" if resource else "-"
+            print(line + f"{result['bytes'] / 1024 / 1024:>7.1f}MB{rss:>9}")
+            for error in result["errors"]:
+                print(f"      失败原因: {error}")
+            report.append({
+                "workers": workers, "articles_per_sec": saved / result["elapsed"], "elapsed": result["elapsed"],
+                "saved": saved, "failed": failed, "stages": stages, "bytes": result["bytes"],
+                "requests": result["requests"], "failed_requests": result["failed_requests"],
+                "rss_peak_kb": result["rss_peak_kb"],
+            })
+    finally:
+        server.stop()
+
+    if args.json:
+        settings = {k: v for k, v in vars(args).items() if k not in ("json", "worker")}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "levels": report}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""正文清洗基准：旧的逐个 get_text() 写法 vs 一次遍历的 purify_content
+
+    python benchmarks/bench_purify.py                 # 用生成的样本
+    python benchmarks/bench_purify.py page1.html ...  # 用保存下来的真实页面
+    python benchmarks/bench_purify.py --from-cache    # 用桌面版网页缓存里抓过的真实文章
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from benchmarks.fixtures import load_samples  # noqa: E402
+from purifier.paths import get_app_data_dir  # noqa: E402
+from purifier.purify import purify_content, TRASH_KEYWORDS  # noqa: E402
+
+
+def legacy_purify(content_div):
+    """旧版写法 (原样保留，用来对比速度和结果)"""
+    for bad_tag in content_div.find_all(['mp-miniprogram', 'mp-common-profile', 'mpvoice']):
+        bad_tag.decompose()
+    for tag in content_div.find_all(['p', 'section']):
+        text = tag.get_text().replace(" ", "").replace("\n", "").strip()
+        if len(text) < 30:
+            for kw in TRASH_KEYWORDS:
+                if kw in text:
+                    tag.decompose()
+                    break
+
+
+def time_once(func, html):
+    content_div = BeautifulSoup(html, "html.parser").find("div", id="js_content")
+    start = time.perf_counter()
+    func(content_div)
+    return time.perf_counter() - start, str(content_div)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("files", nargs="*", help="保存下来的微信文章 HTML")
+    parser.add_argument("--from-cache", action="store_true", help="使用桌面版网页缓存里的文章")
+    parser.add_argument("-n", "--repeat", type=int, default=3, help="每个样本跑几次取最快 (默认 3)")
+    args = parser.parse_args()
+
+    cache_dir = os.path.join(get_app_data_dir(), "cache", "pages") if args.from_cache else None
+    samples = load_samples(args.files, cache_dir)
+
+    print(f"{'样本':<20}{'大小':>10}{'旧写法':>12}{'新引擎':>12}{'加速':>8}  结果一致")
+    for name, html in samples:
+        legacy_best = new_best = float("inf")
+        same = True
+        for _ in range(args.repeat):
+            t_old, out_old = time_once(legacy_purify, html)
+            t_new, out_new = time_once(purify_content, html)
+            legacy_best = min(legacy_best, t_old)
+            new_best = min(new_best, t_new)
+            same = same and out_old == out_new
+        size_kb = len(html.encode("utf-8")) / 1024
+        print(f"{name:<20}{size_kb:>8.0f}KB{legacy_best * 1000:>10.1f}ms{new_best * 1000:>10.1f}ms"
+              f"{legacy_best / new_best:>7.1f}x  {'是' if same else '否 (!)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""启动耗时基准：界面出来之前要导入哪些模块、各花多少时间 (基于 python -X importtime)
+
+    python benchmarks/bench_startup.py                  # 报告 app.py 启动时的导入耗时和后台预热的耗时
+    python benchmarks/bench_startup.py --top 20         # 列出最慢的 20 个导入
+    python benchmarks/bench_startup.py --budget-ms 300  # 启动导入超过 300ms 就返回 1，方便放进检查脚本
+
+“启动时导入” 取的是 app.py 模块顶层的 import 语句 (函数里按需导入的不算)，
+每次都在全新的解释器里跑，没装的库会列出来并跳过。
+"""
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from purifier.warmup import HEAVY_MODULES  # noqa: E402
+
+# 子进程里逐条执行 import 语句，没装的库记下来，最后把它们以 JSON 打到 stdout
+RUNNER = """
+import json, sys
+missing = []
+for stmt in json.loads(sys.argv[1]):
+    try:
+        exec(stmt, {})
+    except ImportError:
+        missing.append(stmt)
+print(json.dumps(missing))
+"""
+
+
+def startup_imports(app_path):
+    """app.py 顶层 (包括顶层 try 里) 的 import 语句原文"""
+    with open(app_path, "r", encoding="utf-8") as f:
+        source = f.read()
+    statements = []
+    for node in ast.parse(source).body:
+        candidates = node.body if isinstance(node, ast.Try) else [node]
+        for child in candidates:
+            if isinstance(child, (ast.Import, ast.ImportFrom)):
+                statements.append(ast.get_source_segment(source, child))
+    return statements
+
+
+def measure(statements, baseline=()):
+    """
+    在全新的解释器里执行这些 import，返回 (总耗时 us, [(累计耗时 us, 模块名)], 没装的语句)。
+    baseline 里的模块 (解释器自己启动就会导入的) 不计入。
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", RUNNER, json.dumps(statements)],
+        capture_output=True, text=True, cwd=ROOT, check=True,
+    )
+    top_level = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  ") and name.strip() not in baseline: # 缩进表示被别的模块带进来的，只统计最外层
+            top_level.append((int(cumulative), name.strip()))
+    missing = json.loads(proc.stdout.strip().splitlines()[-1])
+    return sum(us for us, _ in top_level), top_level, missing
+
+
+def interpreter_baseline():
+    """一条 import 都不执行时也会出现的模块 (site、encodings 等)"""
+    return {name for _, name in measure([])[1]}
+
+
+def best_of(statements, repeat, baseline):
+    runs = [measure(statements, baseline) for _ in range(repeat)]
+    return min(runs, key=lambda r: r[0])
+
+
+def report(title, statements, repeat, top, baseline):
+    total, top_level, missing = best_of(statements, repeat, baseline)
+    print(f"== {title}: {total / 1000:.1f} ms ({len(statements)} 条 import，{repeat} 次取最快)")
+    for us, name in sorted(top_level, reverse=True)[:top]:
+        print(f"   {us / 1000:>8.1f} ms  {name}")
+    for stmt in missing:
+        print(f"   (未安装，跳过) {stmt}")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--repeat", type=int, default=5, help="每组跑几次取最快 (默认 5)")
+    parser.add_argument("--top", type=int, default=10, help="列出最慢的前几个导入 (默认 10)")
+    parser.add_argument("--budget-ms", type=float, default=None, help="启动导入的耗时上限，超过就返回 1")
+    args = parser.parse_args()
+
+    baseline = interpreter_baseline()
+    startup_ms = report("启动时导入 (界面出来之前)", startup_imports(os.path.join(ROOT, "app.py")),
+                        args.repeat, args.top, baseline) / 1000
+    report("后台预热 (界面出来之后)", [f"import {name}" for name in HEAVY_MODULES], args.repeat, args.top, baseline)
+
+    if args.budget_ms is not None and startup_ms > args.budget_ms:
+        print(f"启动导入耗时 {startup_ms:.1f} ms，超过上限 {args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""基准测试用的微信文章样本：按真实页面的结构生成 (层层嵌套的 section、行内样式、大段脚本)"""
+import glob
+import gzip
+import os
+import random
+
+PARAGRAPH_TEXTS = [
+    "在过去的十年里，移动互联网彻底改变了我们获取信息的方式，公众号文章成为很多人每天阅读的主要来源。",
+    "这篇文章会从实际案例出发，聊聊如何把零散的阅读内容整理成可以长期保存、随时检索的个人知识库。",
+    "第一步是把文章完整地保存下来，包括图片和排版；第二步是去掉广告和推广内容，只留下正文。",
+    "很多人收藏了大量文章，但真正回头去看的很少，原因之一就是收藏夹里的内容很难搜索。",
+    "当文章数量达到几千篇的时候，检索速度和存储空间都会成为需要认真考虑的问题。",
+]
+PROMO_TEXTS = ["长按扫码关注我们", "点击上方卡片关注公众号", "阅读原文", "喜欢此内容的人还喜欢", "扫码关注，获取更多干货"]
+
+SECTION_STYLE = "margin: 0px 8px; padding: 0px; outline: 0px; max-width: 100%; box-sizing: border-box !important; overflow-wrap: break-word !important; visibility: visible;"
+SPAN_STYLE = "font-size: 15px; letter-spacing: 1px; color: rgb(62, 62, 62); font-family: mp-quote, -apple-system-font, BlinkMacSystemFont, Arial, sans-serif;"
+
+
+def _nested(inner, depth):
+    for _ in range(depth):
+        inner = f'<section style="{SECTION_STYLE}">{inner}</section>'
+    return inner
+
+
+DEFAULT_IMAGE_URL = "https://mmbiz.qpic.cn/mmbiz_jpg/sample{n}/640?wx_fmt=jpeg"
+DEFAULT_TITLE = "如何整理你的阅读收藏：一份完整指南"
+
+
+def make_article_html(paragraphs=200, depth=8, images_every=4, promo_every=15, script_kb=300, seed=0,
+                      title=DEFAULT_TITLE, image_url=DEFAULT_IMAGE_URL):
+    """
+    生成一整页微信文章 HTML。
+    paragraphs: 正文段落数；depth: 每段外面包几层 section；script_kb: 页面里内联脚本的大小 (真实页面通常有几百 KB)。
+    image_url: 图片地址模板，{n} 是图片编号 (0~39，文章之间会有重复，和真实的 logo、二维码一样)。
+    """
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(paragraphs):
+        if i % 25 == 0:
+            blocks.append(_nested(f"<h2><strong>第 {i // 25 + 1} 部分</strong></h2>", 2))
+        text = rng.choice(PARAGRAPH_TEXTS)
+        para = f'<p style="margin: 0px 0px 16px;"><span style="{SPAN_STYLE}">{text}</span>&nbsp;</p>'
+        blocks.append(_nested(para, rng.randint(max(1, depth - 3), depth)))
+        if images_every and i % images_every == 0:
+            img = (f'<img class="rich_pages wxw-img" data-ratio="0.5625" data-type="jpeg" data-w="1080" '
+                   f'data-src="{image_url.format(n=i % 40)}" style="width: 100%;">')
+            blocks.append(_nested(f'<p style="text-align: center;">{img}</p>', depth))
+        if promo_every and i % promo_every == 0:
+            promo = f'<p><span style="{SPAN_STYLE}">{rng.choice(PROMO_TEXTS)}</span></p>'
+            blocks.append(_nested(promo, rng.randint(1, depth)))
+        if i % 60 == 30:
+            blocks.append('<mp-miniprogram data-miniprogram-appid="wx123" data-miniprogram-title="小程序"></mp-miniprogram>')
+
+    script_line = "var msg_data = {\"appmsgid\":\"2247483647\",\"itemidx\":\"1\",\"comment_id\":\"1234567890\"};\n"
+    script = script_line * max(1, script_kb * 1024 // len(script_line))
+    return (
+        "<!DOCTYPE html><html><head><meta charset=\"utf-8\"><title>样本文章</title>"
+        f"<script>{script}</script></head><body id=\"activity-detail\">"
+        "<div class=\"rich_media_area_primary\">"
+        f"<h1 class=\"rich_media_title\" id=\"activity-name\">\n  {title}\n</h1>"
+        "<div id=\"meta_content\"><a class=\"wx_tap_link js_wx_tap_highlight weui-wa-hotarea\" id=\"js_name\">\n  知识整理研究所\n</a></div>"
+        "<div class=\"rich_media_content js_underline_content autoTypeSetting24psection\" id=\"js_content\" style=\"visibility: hidden;\">"
+        + "".join(blocks) +
+        "</div></div>"
+        f"<script>{script}</script></body></html>"
+    )
+
+
+def load_samples(paths=None, from_cache_dir=None, limit=20):
+    """
+    返回 [(名称, html 字符串)]。
+    优先用传进来的真实页面文件，或者桌面版网页缓存里的真实文章；都没有就用生成的样本。
+    """
+    samples = []
+    for path in paths or []:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            samples.append((os.path.basename(path), f.read()))
+    if from_cache_dir:
+        for path in sorted(glob.glob(os.path.join(from_cache_dir, "*.html.gz")))[:limit]:
+            with open(path, "rb") as f:
+                samples.append((os.path.basename(path)[:12], gzip.decompress(f.read()).decode("utf-8", errors="replace")))
+    if not samples:
+        samples = [
+            ("生成-小 (50 段)", make_article_html(paragraphs=50, depth=6, script_kb=100)),
+            ("生成-中 (300 段)", make_article_html(paragraphs=300, depth=10, script_kb=500)),
+            ("生成-大 (1000 段)", make_article_html(paragraphs=1000, depth=14, script_kb=1500)),
+        ]
+    return samples
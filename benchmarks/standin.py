@@ -0,0 +1,140 @@
+"""本地替身服务器：在 127.0.0.1 上模拟微信文章页和图片 CDN，可以加延迟、随机失败，统计发出的字节数
+
+    /s/<编号>         文章页 (fixtures.make_article_html 生成，也可以换成录下来的真实页面)，
+                      带 ETag，条件请求 (If-None-Match) 命中时回 304
+    /img/<编号>.jpg   图片 (固定大小的伪 JPEG 数据)
+"""
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.fixtures import make_article_html
+
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+# 文章里的图片地址；端口要等 start() 才知道，{base} 先占着位，启动时再换成真实地址
+IMAGE_URL = "{{base}}/img/{n}.jpg"
+
+
+class StandInServer:
+    """
+    latency / jitter: 每个请求先等 latency + [0, jitter) 秒再回复 (模拟网络往返和服务器处理)。
+    fail_rate: 按这个概率回 503 (连接池会自动退避重试，和线上偶发的 5xx 一样)。
+    start() 之后用 article_urls() 拿到所有文章链接；stats() 是截至目前的请求数 / 失败数 / 发出字节数。
+    运行中可以直接改 pages[i] 模拟文章被修改 (ETag 跟着内容变)。
+    """
+
+    def __init__(self, pages, image_kb=60, latency=0.0, jitter=0.0, fail_rate=0.0, seed=0):
+        self._templates = [html.encode("utf-8") if isinstance(html, str) else html for html in pages]
+        self.pages = []
+        self.image_kb = image_kb
+        self.latency = latency
+        self.jitter = jitter
+        self.fail_rate = fail_rate
+        self._rng = random.Random(seed)
+        self._images = {}
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "failures": 0, "bytes": 0}
+        self._httpd = None
+
+    @classmethod
+    def generated(cls, articles, paragraphs=150, script_kb=300, **kwargs):
+        """用生成的样本文章建一个服务器 (每篇标题不同，导出的文件不会互相覆盖)"""
+        pages = [
+            make_article_html(paragraphs=paragraphs, script_kb=script_kb, seed=i,
+                              title=f"基准测试文章 {i}", image_url=IMAGE_URL)
+            for i in range(articles)
+        ]
+        return cls(pages, **kwargs)
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def article_urls(self):
+        return [f"{self.base_url}/s/{i}" for i in range(len(self.pages))]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def _image(self, name):
+        with self._lock:
+            data = self._images.get(name)
+            if data is None:
+                rng = random.Random(name)
+                size = max(0, self.image_kb * 1024 - len(JPEG_HEADER))
+                data = JPEG_HEADER + rng.getrandbits(size * 8).to_bytes(size, "little") if size else JPEG_HEADER
+                self._images[name] = data
+            return data
+
+    def _should_fail(self):
+        with self._lock:
+            return self._rng.random() < self.fail_rate
+
+    def _delay(self):
+        with self._lock:
+            extra = self._rng.random() * self.jitter
+        return self.latency + extra
+
+    def _count(self, sent, failed=False):
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["bytes"] += sent
+            if failed:
+                self._stats["failures"] += 1
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1" # 支持 keep-alive，和真实站点一样复用连接
+
+            def do_GET(self):
+                time.sleep(server._delay())
+                if server._should_fail():
+                    self._reply(503, b"busy", "text/plain", failed=True)
+                    return
+                parts = self.path.split("?")[0].strip("/").split("/")
+                if len(parts) == 2 and parts[0] == "s" and parts[1].isdigit() and int(parts[1]) < len(server.pages):
+                    page = server.pages[int(parts[1])]
+                    etag = f'"{hashlib.sha1(page).hexdigest()[:16]}"'
+                    if self.headers.get("If-None-Match") == etag:
+                        self._reply(304, b"", "text/html; charset=utf-8", etag=etag)
+                    else:
+                        self._reply(200, page, "text/html; charset=utf-8", etag=etag)
+                elif len(parts) == 2 and parts[0] == "img":
+                    self._reply(200, server._image(parts[1]), "image/jpeg")
+                else:
+                    self._reply(404, b"not found", "text/plain", failed=True)
+
+            def _reply(self, code, body, content_type, failed=False, etag=None):
+                self.send_response(code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                if etag:
+                    self.send_header("ETag", etag)
+                self.end_headers()
+                self.wfile.write(body)
+                server._count(len(body), failed)
+
+            def log_message(self, *args):
+                pass # 不要每个请求都往终端打一行
+
+        return Handler
+
+    def start(self):
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._httpd.daemon_threads = True
+        base = self.base_url.encode("ascii")
+        self.pages = [page.replace(b"{base}", base) for page in self._templates]
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
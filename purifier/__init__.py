@@ -0,0 +1 @@
+"""Text Purifier 的后台核心模块 (不依赖任何界面库)"""
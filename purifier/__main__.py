@@ -0,0 +1,7 @@
+"""python -m purifier：无界面批处理入口"""
+import sys
+
+from purifier.cli import main
+
+if __name__ == "__main__": # 进程池的子进程会重新导入主模块，不能再跑一遍 main
+    sys.exit(main())
@@ -0,0 +1,96 @@
+"""内容寻址图片仓库：同一张图 (公众号 logo、二维码、分割线) 只下载、只存一份"""
+import hashlib
+import os
+import shutil
+import threading
+
+from purifier.atomic import atomic_write
+
+STORE_DIR_NAME = ".asset_store"
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def url_key(url):
+    """链接的指纹 (索引里存指纹而不是原链接，避免链接里的奇怪字符弄坏索引文件)"""
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+class AssetStore:
+    """
+    objects/ab/abcdef... 按图片字节的 sha256 存放，相同内容只存一份；
+    index.tsv 是只追加的 “链接指纹 -> 内容哈希” 索引，下载过的链接不再走网络。
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.index_path = os.path.join(root, "index.tsv")
+        self._lock = threading.Lock()
+        self._index = {}
+        os.makedirs(self.objects_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t")
+                if len(parts) == 2:
+                    self._index[parts[0]] = parts[1]
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def lookup(self, url):
+        """链接以前下载过、文件也还在，就返回仓库里的路径，否则返回 None"""
+        with self._lock:
+            digest = self._index.get(url_key(url))
+        if digest:
+            path = self.object_path(digest)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, url, data):
+        """把图片字节存进仓库并登记索引，返回仓库里的路径"""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # 先写临时文件再改名，多个工人同时写同一张图也不会写出半截文件
+            with atomic_write(path, "wb") as f:
+                f.write(data)
+
+        key = url_key(url)
+        with self._lock:
+            if self._index.get(key) != digest:
+                self._index[key] = digest
+                with open(self.index_path, "a", encoding="utf-8") as f:
+                    f.write(f"{key}\t{digest}\n")
+        return path
+
+    def materialize(self, object_path, dest_path):
+        """把仓库里的图片放到文章的 assets 目录：优先硬链接 (不占额外空间)，不支持就复制"""
+        if os.path.exists(dest_path):
+            if os.path.samefile(object_path, dest_path):
+                return
+            os.remove(dest_path)
+        try:
+            os.link(object_path, dest_path)
+        except OSError:
+            # 跨盘符 / FAT32 等不支持硬链接的情况
+            shutil.copyfile(object_path, dest_path)
+
+
+def get_asset_store(save_root):
+    """每个保存目录一个仓库 (放在 save_root/.asset_store，和文章在同一个盘上才能硬链接)"""
+    root = os.path.join(save_root, STORE_DIR_NAME)
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = AssetStore(root)
+            _stores[root] = store
+        return store
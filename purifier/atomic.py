@@ -0,0 +1,103 @@
+"""安全写文件：先写同目录的临时文件再改名换上去，fsync 攒到检查点统一做
+
+中途崩溃、断电最多留下一个 .tmp 临时文件，正式文件要么是旧的完整内容，要么是新的完整内容，
+不会出现写了一半的 config.json 或 .md。
+"""
+import contextlib
+import filecmp
+import os
+import threading
+import uuid
+
+# 临时文件按 0666 建，由系统套上当前的 umask，权限和 open() 新建的文件一样
+# (mkstemp 建的只有自己能读写；也不去读写进程全局的 umask，多线程下改它不安全)
+_TMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0) | getattr(os, "O_NOINHERIT", 0)
+
+
+def _create_tmp(path):
+    """在 path 同目录建一个新的临时文件，返回 (fd, 临时文件路径)"""
+    directory, name = os.path.split(os.path.abspath(path))
+    while True:
+        tmp_path = os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            return os.open(tmp_path, _TMP_FLAGS, 0o666), tmp_path
+        except FileExistsError:
+            continue
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode="w", encoding=None, fsync=False, only_if_changed=False):
+    """
+    用法和 open(path, mode) 一样 (只支持 "w" / "wb")，with 块正常结束才替换正式文件，出异常则丢掉临时文件。
+    fsync=True 时改名前先把数据刷到磁盘 (配置文件这种小而关键的文件用；批量导出的文章交给 fsync_paths 统一刷)。
+    only_if_changed=True 时新内容和正式文件一模一样就不替换 (修改时间不变，同步盘也不会重新上传)。
+    """
+    fd, tmp_path = _create_tmp(path)
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        if only_if_changed and os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            return
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def fsync_paths(paths):
+    """把已经写好的文件 (和它们所在的目录，改名要刷目录才算落盘) 刷到磁盘，文件已经不在的跳过"""
+    directories = set()
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                os.fsync(f.fileno())
+        except OSError:
+            continue
+        directories.add(os.path.dirname(os.path.abspath(path)))
+    if os.name == "nt":
+        return # Windows 不能打开目录做 fsync，文件本身刷过就行
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class DebouncedSaver:
+    """
+    把短时间内的多次保存合并成一次：每次 request() 都重新计时，安静 delay 秒后才真正调用 save_func。
+    程序退出前调用 flush()，还没写的立刻写掉。
+    """
+
+    def __init__(self, save_func, delay=0.5):
+        self.save_func = save_func
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def request(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is None:
+                return
+            self._timer.cancel()
+            self._timer = None
+            self.save_func()
@@ -0,0 +1,136 @@
+"""并发批处理引擎：有上限的线程池 + 按域名限流"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+# 每篇文章处理完后返回的状态
+STATUS_SAVED = "saved"
+STATUS_SKIPPED = "skipped"
+STATUS_FAILED = "failed"
+STATUS_UNCHANGED = "unchanged" # 重新提取时发现文章没变，什么都没重写
+STATUS_DUPLICATE = "duplicate" # 正文和存档里的某篇几乎一样 (转载)，没有下载图片和导出
+
+
+class HostLimiter:
+    """给每个域名发一组“通行证”，防止同一个站点同时被打太多请求"""
+
+    def __init__(self, per_host_limit):
+        self.per_host_limit = max(1, int(per_host_limit))
+        self._lock = threading.Lock()
+        self._semaphores = {}
+
+    def _get(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            sem = self._semaphores.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.per_host_limit)
+                self._semaphores[host] = sem
+            return sem
+
+    def acquire(self, url):
+        sem = self._get(url)
+        sem.acquire()
+        return sem
+
+
+class BatchFeed:
+    """往正在跑的批次里追加链接 (例如剪贴板监控捕获到的新链接)，它们会排在同一批的末尾"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = []
+        self._closed = False
+
+    def add(self, url):
+        """追加一个链接；批次已经收尾时返回 False，调用方需要自己另起一批"""
+        with self._cond:
+            if self._closed:
+                return False
+            self._pending.append(url)
+            self._cond.notify_all()
+            return True
+
+    def _take(self, idle):
+        """等下一批追加的链接；idle() 为真 (手上的都做完了) 而且没有新链接时关闭，返回 None"""
+        with self._cond:
+            while True:
+                if self._pending:
+                    taken, self._pending = self._pending, []
+                    return taken
+                if idle():
+                    self._closed = True
+                    return None
+                self._cond.wait()
+
+    def _wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+
+def run_batch(urls, handler, max_workers=4, per_host_limit=2, on_progress=None, errors=None, feed=None):
+    """
+    并发处理一批链接。
+    handler(url) 负责处理单篇文章并返回状态 (STATUS_*)；抛出的异常会被记为失败。
+    on_progress(done, total, url, status) 每完成一篇就回调一次 (在工作线程里调用)。
+    传入 errors (字典) 时，失败链接的错误信息会记录在 errors[url] 里。
+    传入 feed (BatchFeed) 时，跑完之前追加进来的链接也一起处理 (已在这批里的链接不会重复加入)，
+    total 随之变大；这时 urls 列表会被原地追加，返回值和它一一对应。
+    返回和 urls 顺序一致的状态列表。
+    """
+    results = [None] * len(urls)
+    if not urls and feed is None:
+        return results
+
+    limiter = HostLimiter(per_host_limit)
+    counter_lock = threading.Lock()
+    done = [0]
+
+    def work(index, url):
+        sem = limiter.acquire(url)
+        try:
+            status = handler(url)
+        except Exception as e:
+            print(f"[{url}] 出错: {e}")
+            status = STATUS_FAILED
+            if errors is not None:
+                errors[url] = str(e) or type(e).__name__
+        finally:
+            sem.release()
+
+        with counter_lock:
+            results[index] = status
+            done[0] += 1
+            finished, total = done[0], len(urls)
+        if on_progress:
+            on_progress(finished, total, url, status)
+        if feed is not None:
+            feed._wake()
+
+    # 线程池按需开线程，有 feed 时不知道最后会有多少篇，上限就按工人数
+    workers = max(1, min(int(max_workers), len(urls) if feed is None else int(max_workers)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="purifier") as pool:
+        for index, url in enumerate(urls):
+            pool.submit(work, index, url)
+        if feed is not None:
+            seen = set(urls)
+
+            def idle():
+                with counter_lock:
+                    return done[0] >= len(urls)
+
+            while True:
+                added = feed._take(idle)
+                if added is None:
+                    break
+                for url in added:
+                    if url in seen:
+                        continue
+                    seen.add(url)
+                    with counter_lock:
+                        index = len(urls)
+                        urls.append(url)
+                        results.append(None)
+                    pool.submit(work, index, url)
+
+    return results
@@ -0,0 +1,89 @@
+"""原始网页缓存：抓过的文章 HTML 存在本地，重新导出时不用再联网"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from purifier.atomic import atomic_write
+
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024 # 默认最多占 500MB
+
+
+class PageCache:
+    """
+    按链接缓存原始 HTML (gzip 压缩后存盘)，总大小超过上限时按 “最久没用” (LRU) 淘汰。
+    使用顺序靠文件修改时间记录，重启软件后也能接着用。
+    """
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # key -> 文件大小，越靠后越是最近用过的
+        self._total = 0
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        files = []
+        for name in os.listdir(self.root):
+            if not name.endswith(".html.gz"):
+                continue
+            stat = os.stat(os.path.join(self.root, name))
+            files.append((stat.st_mtime, name[:-len(".html.gz")], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total += size
+
+    @staticmethod
+    def _key(url):
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.html.gz")
+
+    def get(self, url):
+        """命中返回原始 HTML 字节，没有就返回 None"""
+        key = self._key(url)
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(path, "rb") as f:
+                data = gzip.decompress(f.read())
+            os.utime(path) # 刷新 “最近使用” 时间
+            return data
+        except (OSError, EOFError):
+            # 文件被删了或者写坏了，当作没缓存
+            self._forget(key)
+            return None
+
+    def put(self, url, data):
+        key = self._key(url)
+        path = self._path(key)
+        packed = gzip.compress(data)
+        with atomic_write(path, "wb") as f:
+            f.write(packed)
+
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+            self._entries[key] = len(packed)
+            self._total += len(packed)
+            self._evict()
+
+    def _forget(self, key):
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+
+    def _evict(self):
+        # 调用方已持有锁
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            old_key, size = self._entries.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
@@ -0,0 +1,241 @@
+"""命令行 / 批处理模式：不启动界面，适合无显示器的服务器和定时任务
+
+用法示例:
+    python -m purifier urls.txt -o ./archive -f md,html,mm -w 8
+    cat urls.txt | python -m purifier - -o ./archive --proxy http://127.0.0.1:7890
+    python -m purifier --resume -o ./archive    # 继续上次被中断的任务
+    python -m purifier urls.txt --text-first    # 先把所有文章的文字存下来，图片随后在后台补齐
+    python -m purifier urls.txt -f md,html,mm   # 抓过的文章只补导出缺的格式 (读网页缓存，断网也行)
+    python -m purifier urls.txt --refresh       # 联网检查抓过的文章有没有更新，没变的不重写
+
+运行结束后在标准输出打印一份 JSON 汇总；有文章失败时退出码为 1。
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+
+from purifier import net
+from purifier.batch import STATUS_SAVED, STATUS_SKIPPED, STATUS_FAILED, STATUS_UNCHANGED, STATUS_DUPLICATE
+from purifier.cache import PageCache, DEFAULT_MAX_BYTES
+from purifier.history import HistoryStore
+from purifier.image_queue import ImageQueue
+from purifier.imageopt import PILLOW_AVAILABLE, TARGET_FORMATS, DEFAULT_QUALITY, make_options, supported_targets
+from purifier.journal import JobJournal, find_unfinished
+from purifier.parser import available_backends
+from purifier.paths import get_app_data_dir
+from purifier.exporters import exporter_names, get_exporter
+from purifier.pipeline import ArticlePipeline, NEAR_DUP_LINK, NEAR_DUP_MODES, default_cpu_workers
+
+FORMATS = tuple(exporter_names()) # 所有注册过的导出格式
+
+EXIT_OK = 0
+EXIT_FAILED = 1 # 有文章处理失败
+EXIT_USAGE = 2 # 参数不对 / 没有可处理的链接
+
+# 这些参数记进任务日志，--resume 时沿用当时的设置 (保存目录另外处理，见 main)
+RESUMED_SETTINGS = ("image_format", "image_max_width", "image_quality",
+                    "workers", "per_host", "cpu_workers", "image_workers")
+
+
+def read_urls(source):
+    """从文件或标准输入 ("-") 读取链接，和界面一样只保留包含 http 的行"""
+    if source == "-":
+        text = sys.stdin.read()
+    else:
+        with open(source, "r", encoding="utf-8", errors="ignore") as f:
+            text = f.read()
+    return [line.strip() for line in text.split("\n") if "http" in line]
+
+
+def parse_formats(value):
+    formats = [f.strip().lower() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"不支持的格式: {', '.join(unknown)} (可选: {', '.join(FORMATS)})")
+    return set(formats)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m purifier",
+        description="批量提取微信公众号文章并导出为 Markdown / HTML / Word / 思维导图 (无界面模式)",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="链接列表文件，每行一个；省略或 - 表示从标准输入读取")
+    parser.add_argument("-o", "--output", default=None,
+                        help="保存目录 (默认当前目录)，文章按月份归档在其中；--resume 时沿用当时的目录")
+    parser.add_argument("-f", "--formats", type=parse_formats, default={"md", "html"},
+                        help=f"导出格式，逗号分隔: {','.join(FORMATS)} (默认 md,html)")
+    parser.add_argument("-w", "--workers", type=int, default=4, help="同时处理的文章数 (默认 4)")
+    parser.add_argument("--per-host", type=int, default=2, help="同一网站最多同时发几个请求 (默认 2)")
+    parser.add_argument("--cpu-workers", type=int, default=default_cpu_workers(),
+                        help="解析和格式转换用的进程数 (默认等于 CPU 核数，不会超过 -w)；1 表示不开子进程")
+    parser.add_argument("--image-workers", type=int, default=8, help="每篇文章同时下载的图片数 (默认 8)")
+    parser.add_argument("--image-format", choices=("original",) + TARGET_FORMATS, default="original",
+                        help="图片转成什么格式 (默认 original 保持原格式；需要 Pillow，Word 里显示不了 WebP/AVIF)")
+    parser.add_argument("--image-max-width", type=int, default=0, help="图片超过这个宽度就等比缩小 (默认 0 = 不缩放；需要 Pillow)")
+    parser.add_argument("--image-quality", type=int, default=DEFAULT_QUALITY,
+                        help=f"转码 / 缩放时的压缩质量 1~100 (默认 {DEFAULT_QUALITY})")
+    parser.add_argument("--text-first", action="store_true",
+                        help="文字优先：先用图片原链接导出，文章马上算保存好；图片随后下载，到齐后重新导出 (中断后下次运行接着补)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="抓过的文章也联网重新提取：带条件请求检查是否更新，没变的不解析不导出，变了只重写内容不同的文件 "
+                             "(不加这个参数时，抓过的文章只在缺了某种格式的文件时从网页缓存补导出，不联网)")
+    parser.add_argument("--near-dup", choices=NEAR_DUP_MODES, default=NEAR_DUP_LINK,
+                        help="正文和存档里某篇几乎一样的转载文章怎么处理：link 不下载不导出，历史里记一条指向原文 (默认)；"
+                             "skip 直接跳过；off 不检查")
+    parser.add_argument("--proxy", default="", help="HTTP/SOCKS5 代理，例如 http://127.0.0.1:7890")
+    parser.add_argument("--tags", default="", help="额外的自定义标签，逗号分隔")
+    parser.add_argument("--data-dir", default=get_app_data_dir(),
+                        help="历史数据库、网页缓存和任务日志所在目录 (默认和桌面版共用)")
+    parser.add_argument("--max-page-mb", type=float, default=net.DEFAULT_MAX_PAGE_BYTES / 1024 / 1024,
+                        help="单个网页的大小上限 MB，超过就放弃 (默认 %(default)g；0 表示不限)")
+    parser.add_argument("--parser", choices=available_backends(), default=None,
+                        help="页面解析后端 (默认按 " + " > ".join(available_backends()) + " 选第一个；"
+                             "selectolax 稍快但更占内存)")
+    parser.add_argument("--resume", action="store_true",
+                        help="继续最近一次被中断的任务 (沿用当时的保存目录、格式、标签、图片和并发设置，忽略 input)；"
+                             "上次失败的文章也会重试")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    jobs_dir = os.path.join(args.data_dir, "jobs")
+
+    if args.resume:
+        journals = find_unfinished(jobs_dir)
+        if not journals:
+            print("没有需要继续的任务", file=sys.stderr)
+            return EXIT_USAGE
+        journal = journals[0]
+        for older in journals[1:]:
+            older.close()
+        urls = journal.pending_urls()
+        options = journal.options
+        save_root = options.get("save_root")
+        if save_root and args.output and os.path.abspath(args.output) != save_root:
+            print(f"这个任务当时保存在 {save_root}，和 -o 指定的目录不一致；去掉 -o 即可继续", file=sys.stderr)
+            journal.close()
+            return EXIT_USAGE
+        args.output = save_root or args.output
+        args.formats = {f for f in FORMATS if options.get(f)}
+        args.tags = options.get("tags", "")
+        args.text_first = options.get("text_first", False)
+        refresh_urls = set(options.get("refresh") or ())
+        fresh_urls = set(options.get("fresh") or ())
+        args.near_dup = options.get("near_dup", NEAR_DUP_LINK)
+        for name in RESUMED_SETTINGS:
+            if name in options:
+                setattr(args, name, options[name])
+        print(f"继续任务 {os.path.basename(journal.path)}，剩余 {len(urls)} 篇", file=sys.stderr)
+    else:
+        try:
+            urls = read_urls(args.input)
+        except OSError as e:
+            print(f"无法读取链接列表: {e}", file=sys.stderr)
+            return EXIT_USAGE
+        if not urls:
+            print("没有找到有效的链接", file=sys.stderr)
+            return EXIT_USAGE
+        urls = list(dict.fromkeys(urls)) # 汇总按链接统计，重复的行只算一次
+        refresh_urls = set()
+        fresh_urls = set(urls) if args.refresh else set()
+        args.output = os.path.abspath(args.output or os.getcwd())
+        options = {f: f in args.formats for f in FORMATS}
+        options["save_root"] = args.output
+        options["tags"] = args.tags
+        options["text_first"] = args.text_first
+        options["refresh"] = [] # 桌面版从历史面板 “提取” 的链接 (先读缓存)，命令行没有
+        options["fresh"] = urls if args.refresh else [] # 和桌面版一样记成链接列表
+        options["near_dup"] = args.near_dup
+        for name in RESUMED_SETTINGS:
+            options[name] = getattr(args, name)
+        journal = JobJournal.create(jobs_dir, urls, options)
+
+    for name in args.formats:
+        exporter = get_exporter(name)
+        if not exporter.available:
+            print(f"缺少 {exporter.label} 导出需要的库，跳过 {name} 格式", file=sys.stderr)
+
+    image_format = None if args.image_format == "original" else args.image_format
+    if (image_format or args.image_max_width) and not PILLOW_AVAILABLE:
+        print("缺少 Pillow，图片保持原样 (pip install Pillow)", file=sys.stderr)
+    elif image_format and image_format not in supported_targets():
+        print(f"当前 Pillow 不支持写 {image_format}，图片保持原格式", file=sys.stderr)
+        image_format = None
+    image_options = make_options(image_format, args.image_max_width, args.image_quality)
+
+    args.output = os.path.abspath(args.output or os.getcwd())
+    os.makedirs(args.output, exist_ok=True)
+    os.makedirs(args.data_dir, exist_ok=True)
+    net.configure_proxy(args.proxy)
+    history_store = HistoryStore(os.path.join(args.data_dir, "history.db"))
+    page_cache = PageCache(os.path.join(args.data_dir, "cache", "pages"), max_bytes=DEFAULT_MAX_BYTES)
+    # 文字优先模式留下的图片任务 (包括以前没跑完的)，和文章处理同时在后台进行
+    image_queue = ImageQueue(os.path.join(args.data_dir, "image_queue"))
+    pipeline = ArticlePipeline(args.output, history_store, page_cache,
+                               image_workers=args.image_workers, journal=journal, parser_backend=args.parser,
+                               cpu_workers=args.cpu_workers, max_page_bytes=int(args.max_page_mb * 1024 * 1024),
+                               image_options=image_options, image_queue=image_queue if args.text_first else None,
+                               near_duplicates=args.near_dup)
+    run_image_queue = args.text_first or image_queue.pending_count() > 0
+
+    def on_progress(done, total, url, status):
+        print(f"[{done}/{total}] {status}: {url}", file=sys.stderr)
+
+    errors = {}
+    # 处理过程中的零散输出全部转到 stderr，保证 stdout 只有一份干净的 JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        if run_image_queue:
+            image_queue.start(pipeline.localize_deferred)
+        results = pipeline.run(
+            urls, [f for f in FORMATS if f in args.formats], args.tags,
+            max_workers=args.workers, per_host_limit=args.per_host, on_progress=on_progress, errors=errors,
+            refresh_urls=refresh_urls, fresh_urls=fresh_urls,
+        )
+        journal.finish()
+        if run_image_queue:
+            left = image_queue.pending_count()
+            if left:
+                print(f"文字已全部保存，等待 {left} 篇文章的图片下载完...", file=sys.stderr)
+            image_queue.wait_idle()
+            image_queue.stop()
+
+    articles = []
+    export_seconds = {} # 各格式的导出总耗时
+    image_bytes = {"images": 0, "original_bytes": 0, "optimized_bytes": 0} # 图片下载下来 / 实际保存的总字节数
+    for url, status in zip(urls, results):
+        entry = {"url": url, "status": status}
+        if status == STATUS_FAILED:
+            entry["error"] = errors.get(url, "")
+        if status == STATUS_DUPLICATE:
+            entry["duplicate_of"] = pipeline.duplicates.get(url, "")
+        timings = pipeline.timings.get(url)
+        if timings:
+            entry["export_seconds"] = {name: round(sec, 3) for name, sec in timings.items()}
+            for name, sec in timings.items():
+                export_seconds[name] = export_seconds.get(name, 0) + sec
+        images = pipeline.image_stats.get(url)
+        if images:
+            entry["images"] = images
+            for key, value in images.items():
+                image_bytes[key] += value
+        articles.append(entry)
+
+    summary = {
+        "total": len(urls),
+        "saved": results.count(STATUS_SAVED),
+        "skipped": results.count(STATUS_SKIPPED),
+        "unchanged": results.count(STATUS_UNCHANGED),
+        "duplicate": results.count(STATUS_DUPLICATE),
+        "failed": results.count(STATUS_FAILED),
+        "output": args.output,
+        "export_seconds": {name: round(sec, 3) for name, sec in export_seconds.items()},
+        "images": image_bytes,
+        "articles": articles,
+    }
+    json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+    sys.stdout.write("\n")
+    return EXIT_FAILED if summary["failed"] else EXIT_OK
@@ -0,0 +1,188 @@
+"""剪贴板监控：有系统通知就等通知，没有就越等越久地轮询，不再每 0.5 秒读一次剪贴板
+
+Linux 上 pyperclip.paste() 每次都要起一个 xclip / xsel 子进程，以前开着软件就一直在起进程。
+- X11：用 XFixes 扩展订阅 CLIPBOARD 的 “换主人” 事件，线程平时阻塞在 select() 上不占 CPU，
+  真的有人复制了东西才去读一次剪贴板；
+- Windows：GetClipboardSequenceNumber() 只是一次系统调用，序号没变就不读剪贴板；
+- 其他情况：退避轮询，剪贴板一直没变化就把间隔从 MIN_INTERVAL 翻倍到 MAX_INTERVAL，一有变化马上恢复。
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import threading
+
+MIN_INTERVAL = 0.5 # 轮询间隔 (秒)：刚有变化时
+MAX_INTERVAL = 5.0 # 一直没变化时最多等这么久
+
+
+class _X11ClipboardEvents:
+    """X11 剪贴板变化通知 (XFixesSelectSelectionInput)，打不开显示或没有 XFixes 时构造会抛 OSError"""
+
+    SET_SELECTION_OWNER_NOTIFY_MASK = 1 # XFixesSetSelectionOwnerNotifyMask
+    XEVENT_SIZE = 24 * 8 # XEvent 是 24 个 long 的联合体，这里只需要把事件读掉，不关心内容
+
+    def __init__(self):
+        x11_path = ctypes.util.find_library("X11")
+        xfixes_path = ctypes.util.find_library("Xfixes")
+        if not x11_path or not xfixes_path or not os.environ.get("DISPLAY"):
+            raise OSError("没有 X11 / XFixes")
+        x11 = ctypes.CDLL(x11_path)
+        xfixes = ctypes.CDLL(xfixes_path)
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XInternAtom.restype = ctypes.c_ulong
+        x11.XInternAtom.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_int]
+        for name in ("XConnectionNumber", "XPending", "XFlush", "XCloseDisplay"):
+            getattr(x11, name).argtypes = [ctypes.c_void_p]
+        x11.XNextEvent.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        xfixes.XFixesQueryExtension.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+        xfixes.XFixesSelectSelectionInput.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong, ctypes.c_ulong]
+
+        # 单独开一条到 X 服务器的连接，和 Tk 的互不干扰
+        display = x11.XOpenDisplay(None)
+        if not display:
+            raise OSError("打不开 X 显示")
+        event_base, error_base = ctypes.c_int(), ctypes.c_int()
+        if not xfixes.XFixesQueryExtension(display, ctypes.byref(event_base), ctypes.byref(error_base)):
+            x11.XCloseDisplay(display)
+            raise OSError("X 服务器不支持 XFixes")
+        clipboard = x11.XInternAtom(display, b"CLIPBOARD", 0)
+        xfixes.XFixesSelectSelectionInput(display, x11.XDefaultRootWindow(display), clipboard,
+                                          self.SET_SELECTION_OWNER_NOTIFY_MASK)
+        x11.XFlush(display)
+
+        self._x11 = x11
+        self._display = display
+        self._fd = x11.XConnectionNumber(display)
+        self._event = ctypes.create_string_buffer(self.XEVENT_SIZE)
+        self._wake_r, self._wake_w = os.pipe() # stop() 往这里写一个字节，把阻塞的 select 叫醒
+
+    def _drain(self):
+        # 一次复制可能连着来好几个事件，全部读掉，只算一次变化
+        got = False
+        while self._x11.XPending(self._display) > 0:
+            self._x11.XNextEvent(self._display, self._event)
+            got = True
+        return got
+
+    def wait(self):
+        """阻塞到剪贴板换了内容 (返回 True) 或者被 wake() 叫醒 (返回 False)"""
+        while True:
+            if self._drain():
+                return True
+            readable, _, _ = select.select([self._fd, self._wake_r], [], [])
+            if self._wake_r in readable:
+                os.read(self._wake_r, 64)
+                return False
+
+    def wake(self):
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass # 监控线程已经退出，管道关掉了
+
+    def close(self):
+        self._x11.XCloseDisplay(self._display)
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+
+
+def _windows_sequence_number():
+    """Windows 剪贴板序号 (每次内容变化加一)；拿不到时返回 None"""
+    if sys.platform != "win32":
+        return None
+    try:
+        func = ctypes.windll.user32.GetClipboardSequenceNumber
+    except AttributeError:
+        return None
+    func.restype = ctypes.c_uint32
+    return func
+
+
+class ClipboardWatcher:
+    """
+    后台线程监控剪贴板，内容变了就回调 on_change(text) (在监控线程里调用)。
+    read_text() 负责读剪贴板 (例如 pyperclip.paste)。start() 之前已经在剪贴板里的内容不算新内容。
+    stop() 之后线程会退出，不再有任何定时唤醒；可以再次 start()。
+    """
+
+    def __init__(self, read_text, on_change):
+        self.read_text = read_text
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._stop_event = None
+        self._events = None
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and not self._stop_event.is_set():
+                return
+            self._stop_event = threading.Event()
+            try:
+                self._events = _X11ClipboardEvents()
+            except (OSError, AttributeError):
+                self._events = None # 不是 X11 (或缺库)，退回轮询
+            self._thread = threading.Thread(target=self._run, args=(self._stop_event, self._events),
+                                            name="clipboard-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            if self._stop_event is None:
+                return
+            self._stop_event.set()
+            if self._events is not None:
+                self._events.wake()
+            self._events = None
+
+    def _read(self):
+        try:
+            return (self.read_text() or "").strip()
+        except Exception:
+            return None # 剪贴板访问偶尔会冲突，这次就当没读到
+
+    def _run(self, stop_event, events):
+        last_text = self._read()
+        try:
+            if events is not None:
+                self._run_events(stop_event, events, last_text)
+            else:
+                self._run_polling(stop_event, last_text)
+        finally:
+            if events is not None:
+                events.close()
+
+    def _changed(self, last_text):
+        text = self._read()
+        if text is None or text == last_text:
+            return last_text
+        if text:
+            self.on_change(text)
+        return text
+
+    def _run_events(self, stop_event, events, last_text):
+        while events.wait() and not stop_event.is_set():
+            last_text = self._changed(last_text)
+
+    def _run_polling(self, stop_event, last_text):
+        sequence_number = _windows_sequence_number()
+        last_seq = sequence_number() if sequence_number else None
+        interval = MIN_INTERVAL
+        while not stop_event.wait(interval):
+            if sequence_number:
+                seq = sequence_number()
+                if seq == last_seq:
+                    interval = min(interval * 2, MAX_INTERVAL)
+                    continue
+                last_seq = seq
+            text_before = last_text
+            last_text = self._changed(last_text)
+            if last_text != text_before:
+                interval = MIN_INTERVAL
+            else:
+                interval = min(interval * 2, MAX_INTERVAL)
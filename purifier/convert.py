@@ -0,0 +1,106 @@
+"""CPU 阶段：解析清洗、建立文章的中间表示
+
+这里全是纯 Python 的计算 (BeautifulSoup、html2text)，多线程会被 GIL 卡成串行，
+所以流水线把它们放进进程池跑。进出进程池的只有可以 pickle 的简单数据 (字符串、namedtuple、ArticleIR)，
+BeautifulSoup 对象不跨进程，在每个阶段里从 HTML 字符串重新建树。
+各种格式的导出见 purifier.exporters。
+"""
+from collections import namedtuple
+
+import html2text
+
+from purifier.images import collect_image_urls, apply_image_srcs
+from purifier.parser import parse_article, load_content_fragment
+from purifier.purify import purify_content
+
+# 第一段 CPU 计算的结果：清洗好的正文 HTML，以及需要下载的图片 (按正文顺序)
+ArticleDraft = namedtuple("ArticleDraft", ["title", "author", "content_html", "image_urls"])
+
+# 第二段 CPU 计算的输入：草稿 + 图片下载结果 + 写进 frontmatter 的信息
+ArticleParts = namedtuple("ArticleParts", ["draft", "image_srcs", "url", "save_date", "tags_str"])
+
+
+class ArticleError(Exception):
+    """页面能打开，但不是能处理的文章 (比如找不到正文)"""
+
+
+def prepare_article(raw_html, parser_backend=None):
+    """解析 + 清洗，返回 ArticleDraft；不是正常文章 (找不到正文) 时抛出 ArticleError"""
+    # 只取标题、公众号名和正文这一小块 (装了 lxml / selectolax 时不为整页建 BeautifulSoup 树)
+    title, author_name, content_div = parse_article(raw_html.decode('utf-8', errors='replace'), parser_backend)
+    if content_div is None:
+        raise ArticleError("未找到正文") # 找不到正文就算了，直接抓下一篇！
+
+    # === 核心破解：扒掉微信正文的“隐身衣” ===
+    if content_div.has_attr('style'):
+        del content_div['style']  # 物理删除隐藏样式
+    # ========================================
+
+    # --- 智能广告与冗余信息清洗 (DOM 树裁剪，一次遍历完成) ---
+    # 干掉小程序卡片、视频号名片、语音，以及包含 “长按扫码” 等推广词的短段落
+    purify_content(content_div)
+
+    return ArticleDraft(title, author_name, str(content_div), collect_image_urls(content_div))
+
+
+# 导出 HTML 时给正文 div 补上的可见样式 (微信原本用 style 把正文藏起来，等脚本跑完才显示)
+VISIBLE_STYLE = "visibility: visible; opacity: 1; display: block;"
+
+HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+
+
+class ArticleIR:
+    """
+    清洗好、图片已换成本地路径的文章 (中间表示)，每篇只建一次。
+    正文 HTML 只序列化一次，标题层级也只提取一次；
+    Markdown 等派生内容用到时才生成，并且只生成一次，各导出格式都从这里取。
+    """
+
+    def __init__(self, title, author, url, save_date, tags_str, body_html, headings):
+        self.title = title
+        self.author = author
+        self.url = url
+        self.save_date = save_date
+        self.tags_str = tags_str
+        self.body_html = body_html # 正文 div 的 HTML (已去掉隐藏样式)
+        self.headings = headings # [(层级, 文字), ...]，按正文顺序
+        self._markdown = None
+
+    @classmethod
+    def from_parts(cls, parts):
+        """把图片下载结果写回正文，然后一次性取出导出要用的所有东西"""
+        draft = parts.draft
+        content_div = load_content_fragment(draft.content_html)
+        apply_image_srcs(content_div, parts.image_srcs)
+        headings = [(int(h.name[1]), h.get_text().strip()) for h in content_div.find_all(HEADING_TAGS)]
+        return cls(draft.title, draft.author, parts.url, parts.save_date, parts.tags_str, str(content_div), headings)
+
+    @property
+    def markdown(self):
+        """正文 Markdown (同时写进全文索引，所以几乎每篇都会用到)"""
+        if self._markdown is None:
+            converter = html2text.HTML2Text()
+            converter.ignore_links = False
+            converter.body_width = 0
+            self._markdown = converter.handle(self.body_html)
+        return self._markdown
+
+    @property
+    def frontmatter(self):
+        return f"---\ntitle: \"{self.title}\"\nauthor: \"{self.author}\"\nsource: \"{self.url}\"\ndate_saved: \"{self.save_date}\"\ntags: [{self.tags_str}]\n---\n\n"
+
+    @property
+    def visible_html(self):
+        """强制可见的正文 HTML：在正文 div 的开始标签末尾补上可见样式 (和给 Tag 加 style 属性的效果一样)"""
+        head_end = self.body_html.index(">")
+        return f"{self.body_html[:head_end]} style=\"{VISIBLE_STYLE}\"{self.body_html[head_end:]}"
+
+
+def build_article_ir(parts):
+    """
+    CPU 阶段 2：建好文章的中间表示，顺便把 Markdown 生成好
+    (历史库的全文索引每篇都要用，跟着 IR 一起带回主进程，各个导出器就不用各算一遍)。
+    """
+    ir = ArticleIR.from_parts(parts)
+    ir.markdown # 先算好，存在 ir 里随 pickle 一起带走
+    return ir
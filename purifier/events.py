@@ -0,0 +1,36 @@
+"""界面更新总线：后台线程只登记更新，由界面主线程按固定帧率统一执行
+
+Tkinter 不是线程安全的，后台线程不能直接改控件；每次进度变化都 after(0, ...) 一下，
+并发一高就会把事件队列塞满。这里同一个 key (通常对应一个控件) 只保留最新的一次更新，
+主线程每一帧取一次、按登记顺序执行，处理再多文章界面也只是每秒刷新几十次。
+"""
+import itertools
+import threading
+from collections import OrderedDict
+
+
+class UIEventBus:
+    """线程安全；post 可以在任何线程调用，drain 只在主线程调用"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = OrderedDict() # key -> 更新函数，按最后一次登记的先后排序
+        self._seq = itertools.count()
+
+    def post(self, update, key=None):
+        """
+        登记一个要在主线程执行的更新函数。
+        key 相同的更新只保留最新的 (同一个控件只需要画最后的状态)；key 为空的是一次性事件，每个都会执行。
+        """
+        with self._lock:
+            if key is None:
+                key = ("once", next(self._seq))
+            else:
+                self._pending.pop(key, None) # 重新排到最后，保证和其他更新的先后顺序不乱
+            self._pending[key] = update
+
+    def drain(self):
+        """取走目前积攒的所有更新 (按登记顺序)"""
+        with self._lock:
+            pending, self._pending = self._pending, OrderedDict()
+        return list(pending.values())
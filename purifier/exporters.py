@@ -0,0 +1,131 @@
+"""导出格式插件：每种格式是一个注册过的导出函数，流水线按勾选的格式逐个 (或并发) 调用
+
+新增一种格式 (PDF、EPUB、JSON...) 只要在这里 (或任何会被导入的模块里) 写一个函数：
+
+    @register_exporter("json", ".json", "JSON")
+    def export_json(ir, path, assets_dir):
+        ...
+
+导出函数拿到的是 purifier.convert.ArticleIR，负责把文件写到 path。
+注意导出可能在进程池的子进程里运行，所以注册必须发生在模块导入时，不能运行到一半才注册。
+写文件请用 purifier.atomic.atomic_write，崩溃时不会留下写了一半的文件；
+输出内容固定的格式加上 only_if_changed=True，重新导出时内容没变就不动原文件。
+"""
+import importlib.util
+import time
+from collections import namedtuple
+
+from purifier.atomic import atomic_write
+
+# Word 导出库 (python-docx + htmldocx) 很重，只检查装没装，真正导出时才导入
+DOCX_AVAILABLE = all(importlib.util.find_spec(m) is not None for m in ("docx", "htmldocx"))
+
+# required=True 的格式导出失败算整篇失败；其他格式失败只记一条提示
+Exporter = namedtuple("Exporter", ["name", "suffix", "label", "func", "required", "available"])
+
+_EXPORTERS = {} # 名字 -> Exporter，按注册顺序
+
+
+def register_exporter(name, suffix, label, required=False, available=True):
+    """注册一种导出格式 (装饰器)"""
+    def decorator(func):
+        _EXPORTERS[name] = Exporter(name, suffix, label, func, required, available)
+        return func
+    return decorator
+
+
+def exporter_names():
+    """所有注册过的格式名，按注册顺序"""
+    return list(_EXPORTERS)
+
+
+def get_exporter(name):
+    try:
+        return _EXPORTERS[name]
+    except KeyError:
+        raise ValueError(f"未知的导出格式: {name} (可选: {', '.join(_EXPORTERS)})") from None
+
+
+def run_exporter(name, ir, base_path, assets_dir):
+    """在当前进程里跑一个导出器，文件写到 base_path + 后缀，返回耗时 (秒)"""
+    exporter = get_exporter(name)
+    start = time.perf_counter()
+    exporter.func(ir, base_path + exporter.suffix, assets_dir)
+    return time.perf_counter() - start
+
+
+# 极简 HTML 的排版 CSS
+ULTIMATE_CSS = """
+            <style>
+                body { max-width:800px; margin:40px auto; padding:0 20px; line-height:1.6; color:#333; font-family:sans-serif; }
+                img { max-width:100%; height:auto; display:block; margin:20px auto; border-radius:8px; }
+            </style>
+            """
+
+
+@register_exporter("md", ".md", "Markdown", required=True)
+def export_markdown(ir, path, assets_dir):
+    with atomic_write(path, 'w', encoding='utf-8', only_if_changed=True) as f:
+        f.write(ir.frontmatter)
+        f.write(f"# {ir.title}\n\n")
+        f.write(ir.markdown)
+
+
+@register_exporter("html", ".html", "HTML", required=True)
+def export_html(ir, path, assets_dir):
+    """极简 HTML (物理破解微信隐身衣版)"""
+    with atomic_write(path, 'w', encoding='utf-8', only_if_changed=True) as f:
+        f.write(f"<html><head><meta charset='utf-8'><title>{ir.title}</title>")
+        f.write(f"{ULTIMATE_CSS}</head>")
+        f.write(f"<body><h1>{ir.title}</h1>{ir.visible_html}</body></html>")
+
+
+@register_exporter("docx", ".docx", "Word", available=DOCX_AVAILABLE)
+def export_docx(ir, path, assets_dir):
+    from docx import Document
+    from htmldocx import HtmlToDocx
+
+    doc = Document()
+    new_parser = HtmlToDocx()
+    # 构造 Word 需要的 HTML (处理图片路径为绝对路径，确保 Word 能找到图片)
+    abs_assets_dir = assets_dir.replace("\\", "/")
+    if not abs_assets_dir.endswith("/"): abs_assets_dir += "/"
+    word_html = ir.visible_html.replace('src="./assets/', f'src="{abs_assets_dir}')
+
+    doc.add_heading(ir.title, 0) # 添加大标题
+    new_parser.add_html_to_document(word_html, doc)
+    with atomic_write(path, 'wb') as f:
+        doc.save(f)
+
+
+@register_exporter("mm", ".mm", "MindMap")
+def export_mindmap(ir, path, assets_dir):
+    """按正文里的 h1-h6 生成 FreeMind 思维导图"""
+    import xml.etree.ElementTree as ET
+
+    # 创建根节点
+    root = ET.Element("map", version="1.0.1")
+    main_node = ET.SubElement(root, "node", TEXT=ir.title)
+
+    # 简单的层级堆栈算法
+    # 初始堆栈包含根节点，假设它的层级是 0
+    stack = [{"level": 0, "node": main_node}]
+
+    if not ir.headings:
+        ET.SubElement(main_node, "node", TEXT="（此文章未检测到目录结构）")
+
+    for current_level, text in ir.headings:
+        if not text: continue
+        if len(text) > 50: text = text[:50] + "..." # 限制节点文字长度
+
+        # 回溯堆栈：找到当前标题的“父级”
+        while len(stack) > 1 and stack[-1]["level"] >= current_level:
+            stack.pop()
+
+        parent = stack[-1]["node"]
+        new_node = ET.SubElement(parent, "node", TEXT=text)
+        stack.append({"level": current_level, "node": new_node})
+
+    tree = ET.ElementTree(root)
+    with atomic_write(path, 'wb', only_if_changed=True) as f:
+        tree.write(f, encoding="utf-8", xml_declaration=True)
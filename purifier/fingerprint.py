@@ -0,0 +1,69 @@
+"""转载检测：给清洗后的正文算一个 64 位 SimHash 指纹，内容几乎一样的文章指纹只差几位
+
+同一篇文章被很多公众号转载，链接各不相同，按链接查重拦不住。
+指纹只看正文文字 (去掉标签、标点和空白)，转载时改个开头结尾、加个 “来源：xxx” 只会让指纹差几位。
+查找用 LSH 分段：64 位切成 BANDS 段，每段单独建索引；两个指纹只差不超过 MAX_DISTANCE 位时
+(抽屉原理) 至少有一段完全相同，所以只要按段精确查找候选，再逐个算汉明距离，不用和整个存档一一比较。
+"""
+import hashlib
+import html
+import re
+from collections import Counter
+
+BITS = 64
+BANDS = 4 # 切成 4 段，每段 16 位
+BAND_BITS = BITS // BANDS
+MAX_DISTANCE = 3 # 不超过这么多位不同就算转载 (要小于 BANDS，分段查找才不会漏)
+SHINGLE = 3 # 每 3 个字一组当作一个特征 (中文不用分词)
+MIN_TEXT_CHARS = 200 # 正文太短 (几句话、纯图片文章) 不算指纹，免得误判
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"\W+") # 标点、空白、符号全去掉，只留文字和数字
+
+
+def normalize_text(content_html):
+    """正文 HTML -> 只剩文字和数字的小写字符串"""
+    text = html.unescape(_TAG_RE.sub(" ", content_html))
+    return _NON_WORD_RE.sub("", text).lower()
+
+
+def simhash(text):
+    """
+    文字 -> 64 位 SimHash (无符号整数)，每个特征按出现次数加权。
+    不逐个特征逐位累加 (几千个特征 x 64 位太慢)，而是按字节统计：先数每个字节位置上各个取值出现了多少次，
+    最后每一位的 “1 票” 就是该字节位置上这一位为 1 的取值的次数之和。
+    """
+    tables = [[0] * 256 for _ in range(BITS // 8)]
+    total = 0
+    features = Counter(text[i:i + SHINGLE] for i in range(max(1, len(text) - SHINGLE + 1)))
+    for shingle, count in features.items():
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=BITS // 8).digest()
+        for pos, byte in enumerate(digest):
+            tables[pos][byte] += count
+        total += count
+    value = 0
+    for pos, table in enumerate(tables):
+        for bit in range(8):
+            ones = sum(count for byte, count in enumerate(table) if byte >> bit & 1)
+            if ones * 2 > total:
+                value |= 1 << (pos * 8 + bit) # 和 int.from_bytes(digest, "little") 的位序一致
+    return value
+
+
+def article_fingerprint(content_html):
+    """清洗后的正文 -> 指纹；正文太短时返回 None (不参与转载检测)。纯计算，可以放进进程池"""
+    text = normalize_text(content_html)
+    if len(text) < MIN_TEXT_CHARS:
+        return None
+    return simhash(text)
+
+
+def bands(fingerprint):
+    """指纹切成 BANDS 段，返回每段的值 (用来按段查候选)"""
+    mask = (1 << BAND_BITS) - 1
+    return [fingerprint >> (i * BAND_BITS) & mask for i in range(BANDS)]
+
+
+def distance(a, b):
+    """两个指纹的汉明距离 (不同的位数)"""
+    return bin(a ^ b).count("1")
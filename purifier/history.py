@@ -0,0 +1,281 @@
+"""抓取历史 (SQLite 版)：不限条数，链接唯一索引查重，分页读取，正文全文检索"""
+import re
+import sqlite3
+import threading
+import time
+
+from purifier import fingerprint
+
+# 数据库结构版本 (PRAGMA user_version)：1 = 老记录已经补进了全文索引，以后启动不用再扫整张表
+SCHEMA_VERSION = 1
+
+
+class HistoryStore:
+    """
+    一篇文章一行，url 上有唯一索引，查重是一次索引查找而不是遍历整个列表。
+    新文章只做 INSERT，不会像以前那样每篇都把整份 config.json 重写一遍。
+    articles_fts 是标题+正文的 FTS5 全文索引 (trigram 分词，中文不用分词也能搜)，rowid 对应 articles.id。
+    article_validators 记着每篇文章上次抓取时的 ETag / Last-Modified 和内容哈希，重新提取时用来判断有没有变。
+    article_fingerprints 是正文的 SimHash 指纹 (见 purifier.fingerprint)，每一段都有索引，查转载只走索引查找。
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # 多个工人线程共用一个连接，所有读写都在 self._lock 里排队
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS articles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS article_validators (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    page_hash TEXT,
+                    content_hash TEXT
+                )"""
+            )
+            # SQLite 的整数是有符号 64 位，指纹存进去之前先换成有符号数
+            band_columns = ", ".join(f"band{i} INTEGER NOT NULL" for i in range(fingerprint.BANDS))
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS article_fingerprints (url TEXT PRIMARY KEY, simhash INTEGER NOT NULL, {band_columns})"
+            )
+            for i in range(fingerprint.BANDS):
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_fingerprints_band{i} ON article_fingerprints (band{i})"
+                )
+        self.fts_tokenizer = self._init_fts()
+        self.fts_enabled = self.fts_tokenizer is not None
+
+    def _init_fts(self):
+        """建全文索引表；老版本 sqlite 没有 trigram 就退回 unicode61，连 FTS5 都没有就只用标题搜索"""
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                with self._lock, self._conn:
+                    self._conn.execute(
+                        f"CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, body, tokenize='{tokenizer}')"
+                    )
+                    # 建索引之前就存在的记录 (例如老版本迁移过来的)，至少把标题补进索引；只在升级时做一次
+                    if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                        self._conn.execute(
+                            "INSERT INTO articles_fts (rowid, title, body) "
+                            "SELECT id, title, '' FROM articles WHERE id NOT IN (SELECT rowid FROM articles_fts)"
+                        )
+                        self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                return tokenizer
+            except sqlite3.OperationalError:
+                continue
+        return None
+
+    def contains(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM articles WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def get(self, url):
+        """按链接取一条记录 {title, url, date}，没有返回 None"""
+        with self._lock:
+            row = self._conn.execute("SELECT title, url, date FROM articles WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def add(self, title, url, date, body=""):
+        """记录一篇抓取成功的文章 (body 是正文 Markdown，写进全文索引)，已存在的链接不会重复写入。返回是否新增"""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "INSERT OR IGNORE INTO articles (url, title, date, created_at) VALUES (?, ?, ?, ?)",
+                (url, title, date, time.time()),
+            )
+            if cur.rowcount > 0 and self.fts_enabled:
+                self._conn.execute(
+                    "INSERT INTO articles_fts (rowid, title, body) VALUES (?, ?, ?)", (cur.lastrowid, title, body)
+                )
+        return cur.rowcount > 0
+
+    def update(self, url, title, body=""):
+        """文章重新提取后内容变了：更新标题和全文索引 (日期保持第一次抓取时的)"""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT id FROM articles WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return
+            self._conn.execute("UPDATE articles SET title = ? WHERE id = ?", (title, row["id"]))
+            if self.fts_enabled:
+                self._conn.execute("DELETE FROM articles_fts WHERE rowid = ?", (row["id"],))
+                self._conn.execute(
+                    "INSERT INTO articles_fts (rowid, title, body) VALUES (?, ?, ?)", (row["id"], title, body)
+                )
+
+    def get_validators(self, url):
+        """上次抓取时记下的 {etag, last_modified, page_hash, content_hash}，没有返回 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, page_hash, content_hash FROM article_validators WHERE url = ?", (url,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def set_validators(self, url, etag=None, last_modified=None, page_hash=None, content_hash=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO article_validators (url, etag, last_modified, page_hash, content_hash) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, page_hash, content_hash),
+            )
+
+    def add_fingerprint(self, url, value):
+        """记下一篇文章的正文指纹 (已有的覆盖)"""
+        signed = value - (1 << 64) if value >= 1 << 63 else value
+        columns = "".join(f", band{i}" for i in range(fingerprint.BANDS))
+        marks = ", ?" * fingerprint.BANDS
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO article_fingerprints (url, simhash{columns}) VALUES (?, ?{marks})",
+                [url, signed] + fingerprint.bands(value),
+            )
+
+    def has_fingerprint(self, url):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM article_fingerprints WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def remove_fingerprint(self, url):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM article_fingerprints WHERE url = ?", (url,))
+
+    def find_near_duplicate(self, value, exclude_url=None, max_distance=fingerprint.MAX_DISTANCE):
+        """
+        找正文指纹和 value 最接近 (差不超过 max_distance 位) 的已存文章，返回它的链接，没有返回 None。
+        每一段各查一次索引拿到候选，再算汉明距离，存档再大也只比较少量候选。
+        """
+        query = " UNION ".join(
+            f"SELECT url, simhash FROM article_fingerprints WHERE band{i} = ?" for i in range(fingerprint.BANDS)
+        )
+        with self._lock:
+            rows = self._conn.execute(query, fingerprint.bands(value)).fetchall()
+        best = None
+        for row in rows:
+            if row["url"] == exclude_url:
+                continue
+            dist = fingerprint.distance(value, row["simhash"] & ((1 << 64) - 1))
+            if dist <= max_distance and (best is None or dist < best[0]):
+                best = (dist, row["url"])
+        return best[1] if best else None
+
+    def import_items(self, items):
+        """把老版本 config.json 里的历史列表 (新的在前) 迁移进来"""
+        rows = [
+            (item["url"], item.get("title", ""), item.get("date", ""), time.time())
+            for item in reversed(items) if item.get("url")
+        ]
+        with self._lock, self._conn:
+            for row in rows:
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO articles (url, title, date, created_at) VALUES (?, ?, ?, ?)", row
+                )
+                # 只给这次真正新增的记录补标题索引，不扫整张表
+                if cur.rowcount > 0 and self.fts_enabled:
+                    self._conn.execute(
+                        "INSERT INTO articles_fts (rowid, title, body) VALUES (?, ?, '')", (cur.lastrowid, row[1])
+                    )
+
+    def remove(self, url):
+        with self._lock, self._conn:
+            if self.fts_enabled:
+                self._conn.execute(
+                    "DELETE FROM articles_fts WHERE rowid IN (SELECT id FROM articles WHERE url = ?)", (url,)
+                )
+            self._conn.execute("DELETE FROM articles WHERE url = ?", (url,))
+            self._conn.execute("DELETE FROM article_validators WHERE url = ?", (url,))
+            self._conn.execute("DELETE FROM article_fingerprints WHERE url = ?", (url,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            if self.fts_enabled:
+                self._conn.execute("DELETE FROM articles_fts")
+            self._conn.execute("DELETE FROM articles")
+            self._conn.execute("DELETE FROM article_validators")
+            self._conn.execute("DELETE FROM article_fingerprints")
+
+    def _split_terms(self, query):
+        """搜索词按空格拆开 -> (能走全文索引的词, 太短的词)；trigram 分词下不足 3 个字的词在索引里命中不了"""
+        min_len = 3 if self.fts_tokenizer == "trigram" else 1
+        terms = query.split()
+        return [t for t in terms if len(t) >= min_len], [t for t in terms if len(t) < min_len]
+
+    def _match_expr(self, query):
+        # 每个词都当作一个短语 (用双引号包起来)，多个词之间是 “并且” 的关系
+        terms = [t.replace('"', '""') for t in self._split_terms(query)[0]]
+        return " ".join(f'"{t}"' for t in terms)
+
+    def _fts_where(self, query):
+        """
+        全文检索的条件：长词走 MATCH，太短的词 (例如 “AI”、“芯片”) 不丢掉，
+        在 MATCH 命中的结果里再按标题或正文 LIKE 过滤，结果同样要包含它们。
+        """
+        sql, params = "articles_fts MATCH ?", [self._match_expr(query)]
+        for term in self._split_terms(query)[1]:
+            pattern = "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            sql += " AND (articles_fts.title LIKE ? ESCAPE '\\' OR articles_fts.body LIKE ? ESCAPE '\\')"
+            params += [pattern, pattern]
+        return sql, params
+
+    def uses_full_text(self, query):
+        """这个搜索词会不会走全文检索 (走的话结果带 snippet)"""
+        # 纯日期 (2024-01) 还是按日期字段过滤；每个词都太短、没法全文检索时退回标题模糊匹配
+        if not self.fts_enabled or re.fullmatch(r"[\d\-/.]+", query):
+            return False
+        return bool(self._match_expr(query))
+
+    @staticmethod
+    def _where(query):
+        if not query:
+            return "", ()
+        pattern = f"%{query}%"
+        return " WHERE title LIKE ? OR date LIKE ?", (pattern, pattern)
+
+    def count(self, query=""):
+        if self.uses_full_text(query):
+            with self._lock:
+                where, params = self._fts_where(query)
+                return self._conn.execute(f"SELECT COUNT(*) FROM articles_fts WHERE {where}", params).fetchone()[0]
+        where, params = self._where(query)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM articles{where}", params).fetchone()[0]
+
+    def search(self, query, offset=0, limit=50):
+        """全文检索：按相关度 (bm25) 排序取一页，每条带一段命中位置的正文摘要 snippet"""
+        where, params = self._fts_where(query)
+        with self._lock:
+            rows = self._conn.execute(
+                f"""SELECT a.title, a.url, a.date,
+                          snippet(articles_fts, 1, '【', '】', '…', 24) AS snippet
+                   FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid
+                   WHERE {where}
+                   ORDER BY articles_fts.rank LIMIT ? OFFSET ?""",
+                params + [limit, offset],
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def page(self, offset=0, limit=50, query=""):
+        """
+        取一页记录。没有 query 时按时间倒序 (新的在前)；
+        query 够长时走全文检索 (结果带 snippet)，否则按标题或日期模糊匹配。
+        """
+        if self.uses_full_text(query):
+            return self.search(query, offset, limit)
+        where, params = self._where(query)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT title, url, date FROM articles{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                params + (limit, offset),
+            ).fetchall()
+        return [dict(row) for row in rows]
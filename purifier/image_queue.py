@@ -0,0 +1,136 @@
+"""延后的图片本地化队列：先导出文字版 (图片还是原链接)，图片在后台慢慢下载，到齐后重新导出
+
+每篇文章一个任务文件 (gzip 压缩的 JSON，里面是重新导出需要的全部信息)，处理完才删除，
+软件中途关掉也不会丢，下次启动接着处理。
+"""
+import collections
+import gzip
+import json
+import os
+import threading
+import time
+import uuid
+
+from purifier.atomic import atomic_write
+
+JOB_SUFFIX = ".json.gz"
+MAX_ATTEMPTS = 3 # 同一个任务连续失败这么多次就放弃 (文字版已经在了，只是图片还是原链接)
+
+
+class ImageQueue:
+    """
+    add(job) 把任务写进 queue_dir 并排队；start(handler) 开后台线程逐个调用 handler(job)，
+    成功就删掉任务文件，失败的记一次失败次数，下次启动再试。
+    没有任务时线程阻塞等待，不会定时醒来。
+    """
+
+    def __init__(self, queue_dir):
+        self.queue_dir = queue_dir
+        os.makedirs(queue_dir, exist_ok=True)
+        self._cond = threading.Condition()
+        # 文件名以时间开头，按名字排序就是加入顺序
+        self._pending = collections.deque(sorted(
+            os.path.join(queue_dir, name) for name in os.listdir(queue_dir) if name.endswith(JOB_SUFFIX)
+        ))
+        self._active = 0
+        self._threads = []
+        self._stopping = False
+
+    def add(self, job):
+        """任务先落盘再排队，返回任务文件路径"""
+        name = f"{time.time_ns()}-{uuid.uuid4().hex[:6]}{JOB_SUFFIX}"
+        path = os.path.join(self.queue_dir, name)
+        self._save(path, dict(job, attempts=job.get("attempts", 0)))
+        with self._cond:
+            self._pending.append(path)
+            self._cond.notify()
+        return path
+
+    def pending_count(self):
+        """还没处理完的任务数 (含正在处理的)"""
+        with self._cond:
+            return len(self._pending) + self._active
+
+    @staticmethod
+    def _save(path, job):
+        with atomic_write(path, "wb", fsync=True) as f:
+            f.write(gzip.compress(json.dumps(job, ensure_ascii=False).encode("utf-8")))
+
+    @staticmethod
+    def _load(path):
+        with open(path, "rb") as f:
+            return json.loads(gzip.decompress(f.read()).decode("utf-8"))
+
+    def start(self, handler, workers=1, on_change=None):
+        """
+        开 workers 个后台线程处理任务。on_change(剩余任务数) 在每个任务处理完 (或失败) 后调用。
+        """
+        with self._cond:
+            self._stopping = False
+        for _ in range(max(1, int(workers))):
+            thread = threading.Thread(target=self._work, args=(handler, on_change), name="image-queue", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self, handler, on_change):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                path = self._pending.popleft()
+                self._active += 1
+            try:
+                self._run_job(path, handler)
+            finally:
+                with self._cond:
+                    self._active -= 1
+                    remaining = len(self._pending) + self._active
+                    self._cond.notify_all()
+                if on_change is not None:
+                    on_change(remaining)
+
+    def _run_job(self, path, handler):
+        try:
+            job = self._load(path)
+        except (OSError, ValueError) as e:
+            print(f"图片任务文件读不了，已丢弃 ({os.path.basename(path)}): {e}")
+            self._remove(path)
+            return
+        try:
+            handler(job)
+        except Exception as e:
+            attempts = job.get("attempts", 0) + 1
+            if attempts >= MAX_ATTEMPTS:
+                print(f"[{job.get('url')}] 图片本地化多次失败，放弃 (文字版已保存): {e}")
+                self._remove(path)
+            else:
+                print(f"[{job.get('url')}] 图片本地化失败，下次启动再试: {e}")
+                job["attempts"] = attempts
+                self._save(path, job)
+            return
+        self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def wait_idle(self):
+        """等到队列里的任务都处理完 (要先 start)"""
+        with self._cond:
+            while self._pending or self._active:
+                self._cond.wait()
+
+    def stop(self):
+        """让后台线程处理完手上的任务后退出 (没处理的任务还在磁盘上)"""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        threads, self._threads = self._threads, []
+        for thread in threads:
+            if thread is not threading.current_thread():
+                thread.join()
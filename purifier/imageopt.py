@@ -0,0 +1,131 @@
+"""图片优化：按文件头认出真实格式，可选转成 WebP / AVIF、缩到最大宽度 (需要 Pillow)
+
+识别格式不需要 Pillow，保存时按真实格式起扩展名 (PNG 不再叫 .jpg)；
+转码和缩放要装了 Pillow 才会做，没装就原样保存。
+optimize_image 是纯函数 (字节进、字节出)，可以放进线程池或进程池里跑。
+"""
+import importlib.util
+import io
+from collections import namedtuple
+
+# Pillow 很重，只检查装没装，真正要转码时才导入
+PILLOW_AVAILABLE = importlib.util.find_spec("PIL") is not None
+
+# 真实格式 -> 扩展名；认不出来的图片沿用以前的 .jpg
+EXTENSIONS = {"jpeg": ".jpg", "png": ".png", "gif": ".gif", "webp": ".webp", "avif": ".avif", "bmp": ".bmp", "svg": ".svg"}
+DEFAULT_EXTENSION = ".jpg"
+
+# 可以转成的格式 (None 表示保持原格式)
+TARGET_FORMATS = ("webp", "avif")
+
+# target_format: None / "webp" / "avif"；max_width: 超过这个宽度就等比缩小，0 表示不缩放；quality: 有损压缩质量 1~100
+ImageOptions = namedtuple("ImageOptions", ["target_format", "max_width", "quality"])
+DEFAULT_QUALITY = 80
+
+# Pillow 保存时用的格式名
+_PIL_FORMATS = {"jpeg": "JPEG", "png": "PNG", "gif": "GIF", "webp": "WEBP", "avif": "AVIF", "bmp": "BMP"}
+
+
+def sniff_format(data):
+    """看文件头判断图片的真实格式 (jpeg / png / gif / webp / avif / bmp / svg)，认不出来返回 None"""
+    if data[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if data[:8] == b"\x89PNG\r\n\x1a\n":
+        return "png"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    if data[4:8] == b"ftyp" and data[8:12] in (b"avif", b"avis"):
+        return "avif"
+    if data[:2] == b"BM":
+        return "bmp"
+    head = data[:1024].lstrip().lower()
+    if head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head):
+        return "svg"
+    return None
+
+
+def extension_for(data):
+    return EXTENSIONS.get(sniff_format(data), DEFAULT_EXTENSION)
+
+
+def make_options(target_format=None, max_width=0, quality=DEFAULT_QUALITY):
+    """整理优化选项；什么都不用做 (保持原格式、不缩放) 或者没装 Pillow 时返回 None"""
+    target_format = (target_format or "").lower() or None
+    if target_format not in (None,) + TARGET_FORMATS:
+        raise ValueError(f"不支持的图片格式: {target_format} (可选: {', '.join(TARGET_FORMATS)})")
+    if not PILLOW_AVAILABLE or (target_format is None and not max_width):
+        return None
+    return ImageOptions(target_format, max(0, int(max_width or 0)), int(quality))
+
+
+def supported_targets():
+    """当前 Pillow 能写出的目标格式 (AVIF 要 Pillow 11.2+ 或装 pillow-avif-plugin)"""
+    if not PILLOW_AVAILABLE:
+        return []
+    from PIL import features
+
+    supported = []
+    for name in TARGET_FORMATS:
+        try:
+            if features.check(name):
+                supported.append(name)
+                continue
+        except ValueError:
+            pass # 老版本 Pillow 不认识这个特性名
+        if name == "avif" and importlib.util.find_spec("pillow_avif") is not None:
+            supported.append(name)
+    return supported
+
+
+def options_tag(options):
+    """优化选项的简短标记，用来区分同一张图不同设置下的优化结果"""
+    return f"{options.target_format or 'orig'}-w{options.max_width}-q{options.quality}"
+
+
+def optimize_image(data, options):
+    """
+    按 options 转码 / 缩放一张图片，返回新的字节；不需要处理、处理失败或者处理完反而更大时返回原字节。
+    动图 (多帧 GIF / WebP) 和 SVG 原样返回，免得把动画弄丢。
+    """
+    fmt = sniff_format(data)
+    if options is None or fmt is None or fmt == "svg" or not PILLOW_AVAILABLE:
+        return data
+    if options.target_format == "avif":
+        try:
+            importlib.import_module("pillow_avif") # 导入时注册插件 (老版本 Pillow 要靠它才能写 AVIF)
+        except ImportError:
+            pass
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            if getattr(img, "n_frames", 1) > 1:
+                return data
+            resize_to = None
+            if options.max_width and img.width > options.max_width:
+                resize_to = (options.max_width, max(1, round(img.height * options.max_width / img.width)))
+            out_format = options.target_format or fmt
+            if resize_to is None and out_format == fmt:
+                return data
+
+            img.load()
+            result = img.resize(resize_to, Image.LANCZOS) if resize_to else img
+            save_kwargs = {}
+            if out_format == "jpeg":
+                if result.mode not in ("RGB", "L"):
+                    result = result.convert("RGB")
+                save_kwargs = {"quality": options.quality, "optimize": True}
+            elif out_format == "png":
+                save_kwargs = {"optimize": True}
+            elif out_format in ("webp", "avif"):
+                if result.mode not in ("RGB", "RGBA", "L"):
+                    result = result.convert("RGBA" if "A" in result.mode or "transparency" in result.info else "RGB")
+                save_kwargs = {"quality": options.quality}
+            out = io.BytesIO()
+            result.save(out, format=_PIL_FORMATS[out_format], **save_kwargs)
+    except Exception:
+        return data # 图片损坏、编码器不支持之类的，保留原图
+    optimized = out.getvalue()
+    return optimized if len(optimized) < len(data) else data
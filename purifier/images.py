@@ -0,0 +1,150 @@
+"""正文图片本地化：并发下载 (可选转码缩放)，按正文顺序确定文件名"""
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from purifier.imageopt import extension_for, optimize_image, options_tag
+from purifier.net import fetch
+
+
+def collect_image_urls(content_div):
+    """按正文顺序列出每个 <img> 的真实地址 (微信懒加载的图片地址在 data-src 里)，没有地址的跳过"""
+    urls = []
+    for img in content_div.find_all('img'):
+        real_url = img.get('data-src') or img.get('src')
+        if real_url:
+            urls.append(real_url)
+    return urls
+
+
+def apply_image_srcs(content_div, srcs):
+    """把 download_images 的结果按顺序写回 <img> 的 src (和 collect_image_urls 的顺序一一对应)"""
+    srcs = iter(srcs)
+    for img in content_div.find_all('img'):
+        if img.get('data-src') or img.get('src'):
+            src = next(srcs, None)
+            if src is None:
+                break
+            img['src'] = src
+
+
+# 一张 (去重后的) 图片的处理结果：data 是图片字节或仓库里的路径，original_size 是下载下来的原始大小，
+# final 表示已经是最终版本 (不用优化，或者已经优化过)
+_Image = namedtuple("_Image", ["data", "original_size", "final"])
+
+
+def _size(data):
+    return len(data) if isinstance(data, bytes) else os.path.getsize(data)
+
+
+def _read(data, limit=-1):
+    if isinstance(data, bytes):
+        return data if limit < 0 else data[:limit]
+    with open(data, "rb") as f:
+        return f.read(limit)
+
+
+def download_images(image_urls, assets_dir, safe_title, max_in_flight=8, store=None, on_progress=None,
+                    optimize=None, optimize_pool=None, stats=None):
+    """
+    并发下载 image_urls 里的图片 (按正文顺序，可以有重复)，保存到 assets_dir。
+    无论哪张图先下完，编号都严格按图片在正文中出现的顺序分配；扩展名按图片的真实格式定。
+    传入 store (AssetStore) 时，仓库里已有的图片不再下载，直接硬链接到 assets 目录。
+    传入 optimize (purifier.imageopt.ImageOptions) 时，每张图下完就交给 optimize_pool 转码 / 缩放
+    (没有 optimize_pool 就在下载线程里做)，不占着下载的名额；优化结果也存进仓库，下次直接用。
+    on_progress(已完成, 总数) 在每张 (去重后的) 图片处理完或失败时调用，可能来自不同的线程。
+    传入 stats (字典) 时累加 images / original_bytes / optimized_bytes (每张不同的图片算一次)。
+    返回和 image_urls 一一对应的新 src：成功的是 ./assets/ 下的本地路径，失败的保留原链接。
+    """
+    if not image_urls:
+        return []
+
+    def optimized_key(url):
+        return f"{url}#{options_tag(optimize)}"
+
+    def download(url):
+        if store is not None:
+            if optimize is not None:
+                done_path = store.lookup(optimized_key(url))
+                if done_path:
+                    raw_path = store.lookup(url)
+                    return _Image(done_path, _size(raw_path or done_path), True)
+            raw = store.lookup(url) or store.put(url, fetch(url, timeout=10, check_anti_crawl=False).content)
+        else:
+            raw = fetch(url, timeout=10, check_anti_crawl=False).content
+        return _Image(raw, _size(raw), optimize is None)
+
+    def then_optimize(download_future):
+        """下载完的图片接着做优化，返回代表最终结果的 Future"""
+        final = Future()
+
+        def after_optimize(future, image):
+            try:
+                final.set_result(_Image(future.result(), image.original_size, True))
+            except Exception as e:
+                final.set_exception(e)
+
+        def after_download(future):
+            try:
+                image = future.result()
+                if image.final:
+                    final.set_result(image)
+                elif optimize_pool is None:
+                    final.set_result(_Image(optimize_image(_read(image.data), optimize), image.original_size, True))
+                else:
+                    optimize_pool.submit(optimize_image, _read(image.data), optimize).add_done_callback(
+                        lambda f: after_optimize(f, image))
+            except Exception as e:
+                final.set_exception(e)
+
+        download_future.add_done_callback(after_download)
+        return final
+
+    # 同一篇文章里重复出现的图片只下载一次；同时在路上的请求数不超过 max_in_flight
+    unique_urls = list(dict.fromkeys(image_urls))
+    progress = {"done": 0}
+    progress_lock = threading.Lock()
+
+    def report(future):
+        with progress_lock:
+            progress["done"] += 1
+            done = progress["done"]
+        on_progress(done, len(unique_urls))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_in_flight), len(unique_urls)))) as pool:
+        futures = {url: pool.submit(download, url) for url in unique_urls}
+        if optimize is not None:
+            futures = {url: then_optimize(future) for url, future in futures.items()}
+        if on_progress is not None:
+            for future in futures.values():
+                future.add_done_callback(report)
+
+    srcs = []
+    img_counter = 1
+    saved = {} # url -> 最终版本 (仓库路径或字节)，重复出现的图片不用再处理一遍
+    for real_url in image_urls:
+        try:
+            data = saved.get(real_url)
+            if data is None:
+                image = futures[real_url].result()
+                data = image.data
+                if store is not None and isinstance(data, bytes):
+                    data = store.put(optimized_key(real_url), data) # 优化后的版本也进仓库
+                saved[real_url] = data
+                if stats is not None:
+                    stats["images"] = stats.get("images", 0) + 1
+                    stats["original_bytes"] = stats.get("original_bytes", 0) + image.original_size
+                    stats["optimized_bytes"] = stats.get("optimized_bytes", 0) + _size(data)
+            img_filename = f"{safe_title}_img{img_counter}{extension_for(_read(data, 1024))}"
+            img_full_path = os.path.join(assets_dir, img_filename)
+            if store is not None:
+                store.materialize(data, img_full_path)
+            else:
+                with open(img_full_path, 'wb') as img_file:
+                    img_file.write(data)
+            srcs.append(f"./assets/{img_filename}")
+            img_counter += 1
+        except Exception:
+            srcs.append(real_url)
+    return srcs
@@ -0,0 +1,139 @@
+"""批量任务日志：每个链接的进度实时追加到磁盘，软件中途关掉后可以从断点继续"""
+import datetime
+import glob
+import json
+import os
+import threading
+import uuid
+
+# 单个链接的状态
+STATE_QUEUED = "queued" # 排队中
+STATE_FETCHED = "fetched" # 网页已拿到 (原文在网页缓存里)
+STATE_EXPORTED = "exported" # 全部格式已导出
+STATE_FAILED = "failed"
+STATE_SKIPPED = "skipped" # 以前抓过，跳过
+
+# 这些状态说明这个链接已经有结果了，继续任务时不用再处理。
+# 失败不算：中断的任务里失败的多半是网络抖动、被限流这类临时问题，继续任务时重试一次
+# (任务正常跑完日志就删掉了，不会无限重试)
+FINAL_STATES = (STATE_EXPORTED, STATE_SKIPPED)
+
+
+class JobJournal:
+    """
+    一个批量任务一个 .jsonl 文件，每行一条记录，只追加不改写：
+    第一行是任务信息 (导出选项)，之后每个链接的状态变化各占一行，最后一行标记任务结束。
+    即使进程被强制关掉，已经写下的行也都在，重启后按每个链接的最后状态继续。
+    """
+
+    def __init__(self, path, options, states):
+        self.path = path
+        self.options = options
+        self.states = states # url -> 最后状态 (保持加入顺序)
+        self.finished = False
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def create(cls, jobs_dir, urls, options):
+        """新建一个任务日志，所有链接先记为 queued"""
+        os.makedirs(jobs_dir, exist_ok=True)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(jobs_dir, f"{stamp}-{uuid.uuid4().hex[:6]}.jsonl")
+        journal = cls(path, options, {})
+        journal._write({"event": "job", "options": options})
+        for url in urls:
+            journal.record(url, STATE_QUEUED)
+        return journal
+
+    @classmethod
+    def load(cls, path):
+        """读回一个已有的任务日志 (最后一行可能只写了一半，忽略即可)"""
+        options, states, finished = {}, {}, False
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                event = entry.get("event")
+                if event == "job":
+                    options = entry.get("options", {})
+                elif event == "finished":
+                    finished = True
+                elif "url" in entry:
+                    states[entry["url"]] = entry.get("state", STATE_QUEUED)
+        journal = cls(path, options, states)
+        journal.finished = finished
+        return journal
+
+    def _write(self, entry):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush() # 每条都立刻落盘，不攒在内存里
+
+    def record(self, url, state, error=None):
+        entry = {"url": url, "state": state}
+        if error:
+            entry["error"] = error
+        with self._lock:
+            self.states[url] = state
+        self._write(entry)
+
+    def add_url(self, url):
+        """批次进行中追加的链接：日志里还没有就记为 queued 并返回 True，已经有了 (不管什么状态) 不动它"""
+        with self._lock:
+            if url in self.states:
+                return False
+            self.states[url] = STATE_QUEUED
+        self._write({"url": url, "state": STATE_QUEUED})
+        return True
+
+    def sync(self):
+        """检查点：把已经写下的记录刷到磁盘 (平时每条只 flush 到系统，不等磁盘)"""
+        with self._lock:
+            if not self._file.closed:
+                os.fsync(self._file.fileno())
+
+    def pending_urls(self):
+        """还没有结果或者失败了的链接 (queued / fetched / failed)，按原来的顺序"""
+        with self._lock:
+            return [url for url, state in self.states.items() if state not in FINAL_STATES]
+
+    def finish(self):
+        """任务正常结束：标记完成并删除日志文件"""
+        self._write({"event": "finished"})
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def discard(self):
+        """不打算继续这个任务了：直接删除日志"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+
+def find_unfinished(jobs_dir):
+    """找出所有没跑完的任务日志，最新的在前"""
+    journals = []
+    for path in glob.glob(os.path.join(jobs_dir, "*.jsonl")):
+        try:
+            journal = JobJournal.load(path)
+        except OSError:
+            continue
+        if journal.finished or not journal.pending_urls():
+            journal.finish() # 其实已经跑完了，顺手清理掉
+            continue
+        journals.append(journal)
+    journals.sort(key=lambda j: os.path.getmtime(j.path), reverse=True)
+    return journals
@@ -0,0 +1,268 @@
+"""全 App 共用的 HTTP 会话：连接池 + keep-alive + 失败重试 + 反爬冷却
+
+requests 导入要一百多毫秒，等第一次真正发请求 (或后台预热) 时才导入，不拖慢界面启动。
+"""
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlparse
+
+# 连接池大小：文章工人 x 图片并发，留足余量，避免连接被反复丢弃重建
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 64
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+}
+
+# 传输层重试：连不上、读超时、5xx、429 都按指数退避自动重来 (0.5s, 1s, 2s...)
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 微信反爬：命中验证页/频率限制时，整个域名先冷却一会儿再试
+ANTI_CRAWL_MARKERS = ("wappoc_appmsgcaptcha", "环境异常", "访问过于频繁", "操作频繁")
+ANTI_CRAWL_RETRIES = 2
+COOLDOWN_BASE = 30 # 第一次冷却 30 秒，之后每次翻倍
+COOLDOWN_MAX = 300
+
+# 流式抓取文章页：读到开头这么多字节就先判断页面类型，不是正常文章就不往下读了
+CLASSIFY_BYTES = 32 * 1024
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_PAGE_BYTES = 10 * 1024 * 1024 # 正常文章页 1~3MB，超过 10MB 多半不是文章
+
+# 页面类型 (classify_page 的结果)
+PAGE_ARTICLE = "article" # 像是正常文章，值得解析
+PAGE_CAPTCHA = "captcha" # 验证页 / 频率限制
+PAGE_DELETED = "deleted" # 文章已被删除 / 违规无法查看
+PAGE_UNSUPPORTED = "unsupported" # 不是微信文章页 (别的网站、图片、PDF...)
+
+DELETED_MARKERS = ("该内容已被发布者删除", "此内容因违规无法查看", "此内容被投诉且经审核涉嫌侵权", "此内容因涉嫌违反相关法律法规和政策")
+# 微信文章页开头 (head 里的资源链接、脚本变量) 一定会出现其中之一
+WECHAT_MARKERS = ("js_content", "rich_media", "appmsg", "mp.weixin.qq.com", "wx.qq.com")
+
+
+class FetchError(Exception):
+    """重试用完之后仍然拿不到内容"""
+
+
+class AntiCrawlError(FetchError):
+    """被微信的验证页/频率限制拦下来了"""
+
+
+class PageRejectedError(FetchError):
+    """看页面开头就知道不是能解析的文章 (已删除、不支持的网站、太大)，剩下的部分没有下载"""
+
+    def __init__(self, kind, message):
+        super().__init__(message)
+        self.kind = kind
+
+
+# fetch_page_validated 的结果：body 为 None 表示服务器回了 304 (和上次一样)；etag / last_modified 留着下次带上
+FetchedPage = namedtuple("FetchedPage", ["body", "etag", "last_modified"])
+
+
+_session = None
+_session_lock = threading.Lock()
+_proxies = {} # configure_proxy 设置的代理，会话创建时才真正装上
+
+# 每个域名的冷却截止时间和连续被拦次数
+_cooldown_lock = threading.Lock()
+_cooldown_until = {}
+_cooldown_strikes = {}
+
+
+def get_session():
+    """获取全局共享的 requests.Session (第一次调用时创建)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=RETRY_TOTAL, connect=RETRY_TOTAL, read=RETRY_TOTAL, status=RETRY_TOTAL,
+                backoff_factor=RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUS,
+                allowed_methods=frozenset(["GET", "HEAD"]),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.proxies = dict(_proxies)
+            _session = session
+        return _session
+
+
+def configure_proxy(proxy_url):
+    """设置 (或清除) 全局代理，之后所有请求都会复用它 (会话还没创建时先记下来)"""
+    global _proxies
+    proxy_url = (proxy_url or "").strip()
+    with _session_lock:
+        _proxies = {"http": proxy_url, "https": proxy_url} if proxy_url else {}
+        if _session is not None:
+            _session.proxies = dict(_proxies)
+
+
+def is_anti_crawl_response(response):
+    """判断是不是微信的验证页 / 频率限制页"""
+    if "wappoc_appmsgcaptcha" in response.url:
+        return True
+    if "text/html" not in response.headers.get("Content-Type", ""):
+        return False
+    head = response.content[:4096].decode("utf-8", errors="ignore")
+    return any(marker in head for marker in ANTI_CRAWL_MARKERS)
+
+
+def classify_page(head, content_type=""):
+    """根据页面开头几 KB (bytes) 和 Content-Type 判断页面类型 (PAGE_*)"""
+    if content_type and "html" not in content_type.lower():
+        return PAGE_UNSUPPORTED
+    text = head.decode("utf-8", errors="ignore")
+    if "js_content" in text:
+        return PAGE_ARTICLE # 正文都出现了，后面的提示文字可能是正文里的，不再往下判断
+    if any(marker in text for marker in ANTI_CRAWL_MARKERS):
+        return PAGE_CAPTCHA
+    if any(marker in text for marker in DELETED_MARKERS):
+        return PAGE_DELETED
+    if not any(marker in text for marker in WECHAT_MARKERS):
+        return PAGE_UNSUPPORTED
+    return PAGE_ARTICLE
+
+
+def _host(url):
+    return urlparse(url).netloc.lower()
+
+
+def _wait_for_cooldown(host):
+    with _cooldown_lock:
+        remaining = _cooldown_until.get(host, 0) - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
+
+
+def _start_cooldown(host):
+    with _cooldown_lock:
+        strikes = _cooldown_strikes.get(host, 0) + 1
+        _cooldown_strikes[host] = strikes
+        delay = min(COOLDOWN_BASE * (2 ** (strikes - 1)), COOLDOWN_MAX)
+        _cooldown_until[host] = max(_cooldown_until.get(host, 0), time.monotonic() + delay)
+    print(f"[{host}] 触发反爬限制，冷却 {delay} 秒")
+
+
+def _clear_cooldown(host):
+    with _cooldown_lock:
+        _cooldown_strikes.pop(host, None)
+
+
+def fetch(url, timeout=15, check_anti_crawl=True):
+    """
+    通过共享会话 GET 一个链接，返回 requests.Response。
+    5xx / 超时由连接池自动退避重试；命中反爬页时整个域名冷却后再试。
+    最终失败会抛出 FetchError (或其子类 AntiCrawlError)。
+    """
+    import requests # get_session 之后 requests 已经导入过了，这里只是取个名字
+
+    session = get_session()
+    host = _host(url)
+
+    for attempt in range(ANTI_CRAWL_RETRIES + 1):
+        _wait_for_cooldown(host)
+        try:
+            response = session.get(url, timeout=timeout)
+        except requests.RequestException as e:
+            raise FetchError(f"请求失败: {e}") from e
+
+        # 429 (连接池已经按 Retry-After 重试过了) 和微信验证页都算被限流
+        if response.status_code == 429 or (check_anti_crawl and is_anti_crawl_response(response)):
+            _start_cooldown(host)
+            continue
+
+        if response.status_code >= 400:
+            raise FetchError(f"HTTP {response.status_code}")
+
+        _clear_cooldown(host)
+        return response
+
+    raise AntiCrawlError("多次触发微信反爬验证，请稍后再试或更换代理")
+
+
+def _read_page(response, max_bytes):
+    """分块读取网页，读够 CLASSIFY_BYTES 先判断一次类型，返回 (页面类型, 原文)；不是文章时原文为 None"""
+    content_type = response.headers.get("Content-Type", "")
+    chunks = []
+    size = 0
+    kind = None
+    for chunk in response.iter_content(CHUNK_SIZE):
+        chunks.append(chunk)
+        size += len(chunk)
+        if max_bytes and size > max_bytes:
+            raise PageRejectedError(PAGE_UNSUPPORTED, f"网页超过 {max_bytes / 1024 / 1024:g}MB 上限，已放弃")
+        if kind is None and size >= CLASSIFY_BYTES:
+            kind = classify_page(b"".join(chunks)[:CLASSIFY_BYTES], content_type)
+            if kind != PAGE_ARTICLE:
+                return kind, None
+    body = b"".join(chunks)
+    if kind is None:
+        kind = classify_page(body, content_type) # 整页都不到 CLASSIFY_BYTES
+    return kind, (body if kind == PAGE_ARTICLE else None)
+
+
+def fetch_page_validated(url, timeout=15, max_bytes=DEFAULT_MAX_PAGE_BYTES, etag=None, last_modified=None):
+    """
+    流式抓取文章页，返回 FetchedPage (body 是网页原文 bytes)。
+    边下载边看开头：验证页和 fetch 一样冷却后重试；已删除 / 不是微信文章 / 超过 max_bytes (0 表示不限) 的页面
+    直接放弃并抛出 PageRejectedError，剩下的内容不再下载，也不用等完整解析一遍才发现没有正文。
+    可以带上次的 ETag / Last-Modified 发条件请求，服务器回 304 时 body 是 None，网页一个字节都不用下载。
+    """
+    import requests
+
+    session = get_session()
+    host = _host(url)
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
+    for attempt in range(ANTI_CRAWL_RETRIES + 1):
+        _wait_for_cooldown(host)
+        try:
+            response = session.get(url, timeout=timeout, stream=True, headers=headers or None)
+        except requests.RequestException as e:
+            raise FetchError(f"请求失败: {e}") from e
+
+        with response: # 提前放弃时关掉连接，不把剩下的内容读完
+            if response.status_code == 429 or "wappoc_appmsgcaptcha" in response.url:
+                _start_cooldown(host)
+                continue
+            validators = (response.headers.get("ETag") or etag, response.headers.get("Last-Modified") or last_modified)
+            if response.status_code == 304:
+                _clear_cooldown(host)
+                return FetchedPage(None, *validators)
+            if response.status_code >= 400:
+                raise FetchError(f"HTTP {response.status_code}")
+            declared = response.headers.get("Content-Length", "")
+            if max_bytes and declared.isdigit() and int(declared) > max_bytes:
+                raise PageRejectedError(PAGE_UNSUPPORTED, f"网页超过 {max_bytes / 1024 / 1024:g}MB 上限，已放弃")
+            try:
+                kind, body = _read_page(response, max_bytes)
+            except requests.RequestException as e:
+                raise FetchError(f"请求失败: {e}") from e
+
+        if kind == PAGE_CAPTCHA:
+            _start_cooldown(host)
+            continue
+        if kind == PAGE_DELETED:
+            raise PageRejectedError(kind, "文章已被删除或无法查看")
+        if kind == PAGE_UNSUPPORTED:
+            raise PageRejectedError(kind, "不是微信公众号文章页面")
+        _clear_cooldown(host)
+        return FetchedPage(body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    raise AntiCrawlError("多次触发微信反爬验证，请稍后再试或更换代理")
@@ -0,0 +1,17 @@
+"""跨平台的应用数据目录 (配置、历史数据库、缓存都放在这里)"""
+import os
+import sys
+
+
+def get_app_data_dir():
+    """获取跨平台的应用数据目录，用于存放配置文件"""
+    app_name = "TextPurifier"
+    if sys.platform == "win32":
+        # Windows: %APPDATA%\TextPurifier
+        return os.path.join(os.environ["APPDATA"], app_name)
+    elif sys.platform == "darwin":
+        # macOS: ~/Library/Application Support/TextPurifier
+        return os.path.join(os.path.expanduser("~"), "Library", "Application Support", app_name)
+    else:
+        # Linux: ~/.config/TextPurifier
+        return os.path.join(os.path.expanduser("~"), ".config", app_name)
@@ -0,0 +1,478 @@
+"""文章处理流水线：抓取 -> 清洗 -> 图片本地化 -> 导出 (界面和命令行共用，不依赖任何界面库)
+
+联网的活 (抓网页、下图片) 在线程里做；解析清洗和格式转换是纯 CPU 计算，交给进程池 (见 purifier.convert)。
+"""
+import datetime
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from purifier import net
+from purifier.asset_store import get_asset_store
+from purifier.atomic import fsync_paths
+from purifier.batch import run_batch, STATUS_SAVED, STATUS_SKIPPED, STATUS_UNCHANGED, STATUS_DUPLICATE
+from purifier.convert import ArticleDraft, ArticleParts, build_article_ir, prepare_article
+from purifier.fingerprint import article_fingerprint
+from purifier.exporters import get_exporter, run_exporter
+from purifier.imageopt import ImageOptions
+from purifier.images import download_images
+from purifier.journal import STATE_FETCHED, STATE_EXPORTED, STATE_FAILED, STATE_SKIPPED
+
+# 单篇文章的处理阶段，通过 on_event(url, 阶段, 详情) 通知界面
+STAGE_FETCHING = "fetching" # 抓网页 (或读缓存)
+STAGE_IMAGES = "images" # 下载图片，详情是 (已完成, 总数)
+STAGE_EXPORTING = "exporting" # 导出各种格式
+STAGE_DONE = "done"
+STAGE_FAILED = "failed" # 详情是错误信息
+STAGE_SKIPPED = "skipped"
+STAGE_UNCHANGED = "unchanged" # 重新提取时文章没变
+STAGE_DUPLICATE = "duplicate" # 是存档里某篇文章的转载，详情是那篇的链接
+
+# 转载 (正文和存档里某篇几乎一样) 怎么处理
+NEAR_DUP_LINK = "link" # 不下载图片、不导出，历史记录里记一条指向原文文件的记录，以后也不会再抓
+NEAR_DUP_SKIP = "skip" # 直接跳过，什么都不记
+NEAR_DUP_OFF = "off" # 不检查
+NEAR_DUP_MODES = (NEAR_DUP_LINK, NEAR_DUP_SKIP, NEAR_DUP_OFF)
+
+# 每导出这么多篇做一次检查点 (导出的文件和任务日志一起刷盘)，批次结束时也会做一次
+CHECKPOINT_EVERY = 20
+
+
+def _sha256(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _content_hash(draft):
+    """清洗后文章的哈希：标题、作者也算在内 (只改了标题也要重新导出)"""
+    return _sha256("\n".join((draft.title, draft.author or "", draft.content_html)))
+
+
+def default_cpu_workers():
+    """CPU 阶段默认的进程数：有几个核就开几个"""
+    return os.cpu_count() or 1
+
+
+class ArticlePipeline:
+    """
+    一次批处理用到的共享资源：保存目录、历史数据库、网页缓存、任务日志 (可选)。
+    process_article 处理单篇文章，run 负责查重并把一批链接交给并发引擎。
+    cpu_workers 是 CPU 阶段的进程数，0 或 1 表示就在当前线程里算 (不开进程池)。
+    formats 是要导出的格式名列表 (见 purifier.exporters)；每篇文章各格式的导出耗时记在 timings 里。
+    on_event(url, 阶段, 详情) 报告每篇文章走到了哪一步 (STAGE_*)，会从多个工人线程调用。
+    max_page_bytes 是单个网页的大小上限 (0 表示不限)，超过的页面边下载边放弃。
+    image_options (purifier.imageopt.make_options 的结果) 不为空时，图片下载后转码 / 缩放，
+    在进程池 (有的话) 或单独的线程池里做，不占下载线程；每篇的图片字节数记在 image_stats 里。
+    传入 image_queue (purifier.image_queue.ImageQueue) 时是 “文字优先” 模式：先用图片原链接导出，
+    文章就算保存好了；图片交给队列在后台下载，到齐后由 localize_deferred 重新导出。
+    refresh_article 用于重新导出 / 重新提取已经抓过的文章：默认从网页缓存重建 (断网也行)，
+    要最新版时带上次的 ETag / Last-Modified 发条件请求；网页或清洗后的正文哈希没变就不解析 / 不导出，
+    变了也只重写内容真的不一样的文件。
+    near_duplicates (NEAR_DUP_*) 决定转载怎么处理：清洗完、下载图片之前先拿正文指纹查一遍存档，
+    是转载就不再下载图片和导出；查到的原文链接记在 duplicates 里。
+    """
+
+    def __init__(self, save_root, history_store, page_cache=None, image_workers=8, journal=None, parser_backend=None,
+                 cpu_workers=0, on_event=None, max_page_bytes=net.DEFAULT_MAX_PAGE_BYTES, image_options=None,
+                 image_queue=None, near_duplicates=NEAR_DUP_LINK):
+        self.save_root = save_root
+        self.history_store = history_store
+        self.page_cache = page_cache
+        self.image_workers = image_workers
+        self.journal = journal
+        self.parser_backend = parser_backend # 为空时用默认的解析器 (见 purifier.parser)
+        self.cpu_workers = cpu_workers
+        self.on_event = on_event
+        self.max_page_bytes = max_page_bytes
+        self.image_options = image_options
+        self.image_queue = image_queue
+        if near_duplicates not in NEAR_DUP_MODES:
+            raise ValueError(f"不支持的转载处理方式: {near_duplicates} (可选: {', '.join(NEAR_DUP_MODES)})")
+        self.near_duplicates = near_duplicates
+        self._cpu_pool = None # 只在 run 期间存在
+        self._image_pool = None # 图片优化用的线程池 (没有进程池、又开了图片优化时才有)，只在 run 期间存在
+        self.timings = {} # url -> {格式: 导出耗时 (秒)}
+        self.image_stats = {} # url -> {images, original_bytes, optimized_bytes}
+        self.duplicates = {} # url -> 存档里那篇原文的链接
+        # 查转载和登记指纹要一起做，同一批里两篇互相转载的文章同时处理时，只有一篇会被当成原文
+        self._fingerprint_lock = threading.Lock()
+        # 导出的文件都是原子写入 (不会写一半)，但不逐个 fsync，攒到检查点一起刷
+        self._sync_lock = threading.Lock()
+        self._unsynced_paths = []
+        self._exported_since_checkpoint = 0
+        # 多个工人共用的查重锁 (登记 “这篇我来处理” 时要先拿到它)
+        self._claim_lock = threading.Lock()
+        self._claimed_urls = set()
+
+    def _run_cpu(self, func, *args):
+        """把一段 CPU 计算交给进程池，没有进程池时直接在当前线程里算"""
+        if self._cpu_pool is None:
+            return func(*args)
+        return self._cpu_pool.submit(func, *args).result()
+
+    def _export(self, ir, formats, base_path, assets_dir, pooled=True):
+        """
+        跑所有勾选的导出器，返回各格式的耗时。
+        有进程池时每种格式单独一个任务并发执行，Word 这种慢格式不会拖住其他格式；pooled=False 时总在当前线程里跑。
+        """
+        exporters = [e for e in map(get_exporter, formats) if e.available]
+        if pooled and self._cpu_pool is not None:
+            futures = [(e, self._cpu_pool.submit(run_exporter, e.name, ir, base_path, assets_dir)) for e in exporters]
+        else:
+            futures = [(e, None) for e in exporters]
+
+        timings = {}
+        error = None
+        for exporter, future in futures:
+            try:
+                if future is None:
+                    timings[exporter.name] = run_exporter(exporter.name, ir, base_path, assets_dir)
+                else:
+                    timings[exporter.name] = future.result()
+            except Exception as e:
+                if exporter.required:
+                    error = error or e # 先等其他格式导完，再让整篇失败
+                else:
+                    print(f"{exporter.label} 导出失败: {e}")
+        if error is not None:
+            raise error
+        return timings
+
+    def process_article(self, url, formats, user_tags):
+        """处理单篇文章：抓取 -> 清洗 -> 下载图片 -> 导出各种格式，返回处理状态 (失败时抛出异常)"""
+        self._emit(url, STAGE_FETCHING)
+        # --- 先查本地网页缓存，命中就完全不用联网 ---
+        raw_html = self.page_cache.get(url) if self.page_cache else None
+        from_cache = raw_html is not None
+        page = None
+        if not from_cache:
+            # --- 核心抓取代码 (共享会话：自动重试、反爬冷却，失败会抛出 FetchError) ---
+            # 流式读取：已删除、非微信页面看开头几 KB 就放弃，不用下载完整页再解析一遍
+            page = net.fetch_page_validated(url, timeout=15, max_bytes=self.max_page_bytes)
+            raw_html = page.body
+
+        # CPU 阶段 1：解析 + 清洗 (找不到正文会抛出 ArticleError)
+        draft = self._run_cpu(prepare_article, raw_html, self.parser_backend)
+        save_date = datetime.datetime.now().strftime("%Y-%m-%d")
+
+        # 确认是正常文章后才存进缓存 (验证页、已删除提示就不存了)
+        if self.page_cache and not from_cache:
+            self.page_cache.put(url, raw_html)
+        self._record(url, STATE_FETCHED)
+
+        # 下载图片之前先查是不是转载 (不是的话指纹已经登记上了)
+        original = self._find_original(url, draft)
+        if original is not None:
+            return self._link_duplicate(url, original)
+        try:
+            ir, image_job = self._write_article(url, draft, save_date, formats, user_tags)
+        except Exception:
+            self.history_store.remove_fingerprint(url) # 没存成，别让后面的转载把它当原文
+            raise
+
+        # === 新增：往历史数据库里追加一条记录 (只插入一行，不再重写整个配置文件) ===
+        # 正文 Markdown 同时写进全文索引，历史面板可以直接搜文章内容
+        self.history_store.add(draft.title, url, save_date, body=ir.markdown)
+        # ==================================
+        # 记下验证信息，以后重新提取时判断文章变没变 (从缓存读的没有响应头，只记哈希)
+        self.history_store.set_validators(url, page.etag if page else None, page.last_modified if page else None,
+                                          _sha256(raw_html), _content_hash(draft))
+
+        if image_job is not None:
+            self.image_queue.add(image_job)
+        return STATUS_SAVED
+
+    def refresh_article(self, url, formats, user_tags, fresh=False):
+        """
+        重新导出 / 重新提取一篇已经抓过的文章 (历史里没有就当新文章处理)，返回 STATUS_UNCHANGED (没变，什么都没写)、
+        STATUS_SAVED，或者 STATUS_DUPLICATE (改完之后是别的文章的转载，不写文件)。
+        默认先读网页缓存，命中就完全不联网 (图片也从去重仓库拿)，换格式、补文件断网也能做；缓存里没有才去抓。
+        fresh=True 表示用户要最新版：带上次的 ETag / Last-Modified 发条件请求，联网失败 (断网、文章被删) 时退回缓存；
+        上次导出的文件缺了 (被删了、这次多勾了格式) 时照样先读缓存，完整再导出一遍。
+        服务器回 304、网页哈希或清洗后的正文哈希和上次一样时，后面的阶段都省掉。
+        文件仍然放在第一次抓取时的月份目录下，文件名也还用记录里的标题 (文章改了标题，文件里显示新标题，
+        历史面板和指向它的转载记录照样按原来的文件名找得到)；内容没变的格式不会重写 (修改时间不变)。
+        还没有正文指纹的文章 (转载检测上线前存的) 不发条件请求，内容没变也解析一遍，把指纹补上。
+        """
+        record = self.history_store.get(url)
+        if record is None:
+            return self.process_article(url, formats, user_tags)
+        self._emit(url, STAGE_FETCHING)
+        complete = self._outputs_complete(record, formats)
+        stored = self.history_store.get_validators(url) or {}
+        validators = stored if complete else {}
+        need_fingerprint = self.near_duplicates != NEAR_DUP_OFF and not self.history_store.has_fingerprint(url)
+
+        cache_first = not fresh or not complete
+        raw_html = self.page_cache.get(url) if self.page_cache and cache_first else None
+        page = None
+        if raw_html is None:
+            conditional = {} if need_fingerprint else validators
+            try:
+                page = net.fetch_page_validated(url, timeout=15, max_bytes=self.max_page_bytes, etag=conditional.get("etag"),
+                                                last_modified=conditional.get("last_modified"))
+            except net.FetchError:
+                # 要最新版但联网失败：缓存里有就从缓存重建 (存档不会因为断网或原文被删而出错)
+                raw_html = self.page_cache.get(url) if self.page_cache and not cache_first else None
+                if raw_html is None:
+                    raise
+            else:
+                if page.body is None:
+                    self._record(url, STATE_FETCHED)
+                    return STATUS_UNCHANGED
+                raw_html = page.body
+        # 从缓存重建的没有新的响应头，沿用上次记下的
+        etag, last_modified = (page.etag, page.last_modified) if page else (stored.get("etag"), stored.get("last_modified"))
+        page_hash = _sha256(raw_html)
+        if page_hash == validators.get("page_hash") and not need_fingerprint:
+            self.history_store.set_validators(url, etag, last_modified, page_hash, validators["content_hash"])
+            self._record(url, STATE_FETCHED)
+            return STATUS_UNCHANGED
+
+        draft = self._run_cpu(prepare_article, raw_html, self.parser_backend)
+        if self.page_cache and page is not None:
+            self.page_cache.put(url, raw_html)
+        self._record(url, STATE_FETCHED)
+        content_hash = _content_hash(draft)
+        changed = content_hash != validators.get("content_hash")
+        image_job = None
+        if changed and self._find_original(url, draft) is not None:
+            # 改完之后成了别的文章的转载 (或者本来就是记成转载的链接)，不往原文的文件里写
+            self.history_store.set_validators(url, etag, last_modified, page_hash, content_hash)
+            return STATUS_DUPLICATE
+        if changed:
+            ir, image_job = self._write_article(url, draft, record["date"], formats, user_tags, file_title=record["title"])
+            self.history_store.update(url, record["title"], body=ir.markdown)
+        elif need_fingerprint:
+            self._register_fingerprint(url, draft)
+        self.history_store.set_validators(url, etag, last_modified, page_hash, content_hash)
+        if image_job is not None:
+            self.image_queue.add(image_job)
+        return STATUS_SAVED if changed else STATUS_UNCHANGED
+
+    def _find_original(self, url, draft):
+        """
+        正文是存档里某篇文章的转载时返回那篇的链接 (记进 duplicates)；
+        不是的话把这篇的指纹登记进去，返回 None。正文太短或者关掉了检查时也返回 None。
+        """
+        if self.near_duplicates == NEAR_DUP_OFF:
+            return None
+        value = self._run_cpu(article_fingerprint, draft.content_html)
+        if value is None:
+            return None
+        with self._fingerprint_lock:
+            original = self.history_store.find_near_duplicate(value, exclude_url=url)
+            if original is None:
+                self.history_store.add_fingerprint(url, value)
+                return None
+        self.duplicates[url] = original
+        return original
+
+    def _register_fingerprint(self, url, draft):
+        """登记 (或更新) 一篇已存文章的正文指纹，不查转载；记成转载的链接也登记，以后重新提取就能走条件请求"""
+        value = self._run_cpu(article_fingerprint, draft.content_html)
+        if value is not None:
+            with self._fingerprint_lock:
+                self.history_store.add_fingerprint(url, value)
+
+    def _link_duplicate(self, url, original):
+        """
+        转载的处理：NEAR_DUP_LINK 时在历史记录里记一条，标题和日期用原文的，
+        历史面板里预览 / 打开的就是原文导出的文件，以后再遇到这个链接也直接跳过。
+        原文是同一批里刚登记指纹、还没写进历史的 (文件可能还没写完，也可能写失败) 就先不记，
+        这次只跳过；下次再遇到时原文已经存好，再记成指向它的链接。
+        """
+        if self.near_duplicates == NEAR_DUP_LINK:
+            record = self.history_store.get(original)
+            if record is not None:
+                self.history_store.add(record["title"], url, record["date"])
+        return STATUS_DUPLICATE
+
+    def _outputs_complete(self, record, formats):
+        """历史记录里这篇文章勾选的各格式文件是不是都在 (这次多勾了格式、文件被删了就不全)"""
+        _, _, base_path, _ = self._article_paths(record["title"], record["date"])
+        return all(os.path.exists(base_path + e.suffix) for e in map(get_exporter, formats) if e.available)
+
+    def _article_paths(self, title, save_date):
+        """文章的保存位置：(月份目录, 图片目录, 不带后缀的文件路径, 安全标题)，月份取自保存日期"""
+        safe_title = title.replace('/', '_').replace('\\', '_').replace('|', '_')
+        final_save_dir = os.path.join(self.save_root, save_date[:7])
+        assets_dir = os.path.join(final_save_dir, "assets")
+        base_path = os.path.join(final_save_dir, safe_title) # 各格式的文件名 = 标题 + 后缀
+        return final_save_dir, assets_dir, base_path, safe_title
+
+    def _write_article(self, url, draft, save_date, formats, user_tags, file_title=None):
+        """
+        下载图片 (或者文字优先时留到后台) 并导出各格式，返回 (中间表示, 图片任务)。
+        file_title 是文件名用的标题 (重新提取时用记录里的)，为空时用文章标题。
+        图片任务不为空时，调用方写完历史记录后再交给 image_queue。
+        """
+        final_save_dir, assets_dir, base_path, safe_title = self._article_paths(file_title or draft.title, save_date)
+        os.makedirs(final_save_dir, exist_ok=True) 
+        os.makedirs(assets_dir, exist_ok=True) 
+
+        # 文字优先：图片先用原链接，导出完再交给后台队列
+        deferred = self.image_queue is not None and bool(draft.image_urls)
+        if deferred:
+            image_srcs = list(draft.image_urls)
+        else:
+            image_srcs = self._download_images(url, draft.image_urls, assets_dir, safe_title, self.image_options)
+
+        # --- 处理标签 ---
+        tags_list = ["微信摘录", "待阅读"]
+        if user_tags:
+            # 支持中文逗号和英文逗号，自动去空格
+            extras = [t.strip() for t in user_tags.replace("，", ",").split(",") if t.strip()]
+            tags_list.extend(extras)
+        tags_str = ", ".join(tags_list)
+
+        # CPU 阶段 2：建好文章的中间表示，再导出勾选的格式
+        self._emit(url, STAGE_EXPORTING)
+        ir = self._run_cpu(build_article_ir, ArticleParts(draft, image_srcs, url, save_date, tags_str))
+        self.timings[url] = self._export(ir, formats, base_path, assets_dir)
+        with self._sync_lock:
+            self._unsynced_paths.extend(base_path + get_exporter(name).suffix for name in self.timings[url])
+
+        if not deferred:
+            return ir, None
+        return ir, {
+            "url": url, "save_root": self.save_root, "draft": draft._asdict(), "save_date": save_date,
+            "tags_str": tags_str, "formats": list(self.timings[url]), "base_path": base_path,
+            "assets_dir": assets_dir, "safe_title": safe_title,
+            # 队列可能到下次启动才处理，那时设置也许改了，按存这篇时的图片选项来
+            "image_options": None if self.image_options is None else self.image_options._asdict(),
+        }
+
+    def _download_images(self, url, image_urls, assets_dir, safe_title, image_options, save_root=None, pooled=True):
+        """
+        并发下载图片 (共享连接池，编号按正文顺序，结果稳定)，返回每张图的新 src。
+        下载过的图片 (logo、二维码等) 直接从去重仓库硬链接过来，不再重复下载。
+        pooled=False 时图片优化不用 run 期间的进程池 / 线程池 (在下载线程里做)。
+        image_options 是图片优化选项 (None 表示不优化)。
+        """
+        if image_urls:
+            self._emit(url, STAGE_IMAGES, (0, len(set(image_urls))))
+        image_stats = {}
+        image_srcs = download_images(image_urls, assets_dir, safe_title, max_in_flight=self.image_workers,
+                                     store=get_asset_store(save_root or self.save_root),
+                                     on_progress=lambda done, total: self._emit(url, STAGE_IMAGES, (done, total)),
+                                     optimize=image_options,
+                                     optimize_pool=(self._cpu_pool or self._image_pool) if pooled else None,
+                                     stats=image_stats)
+        if image_stats:
+            self.image_stats[url] = image_stats
+        return image_srcs
+
+    def localize_deferred(self, job):
+        """
+        处理文字优先模式留下的图片任务 (ImageQueue 的 handler)：下载图片，用本地路径把各格式重新导出一遍。
+        导出的文件刷盘后才返回，返回之后队列才删掉任务文件。
+        队列线程和 run 的生命周期无关，这里不用 run 期间才有的进程池 / 线程池，全在当前线程里算。
+        """
+        draft = ArticleDraft(**job["draft"])
+        if "image_options" in job:
+            image_options = job["image_options"] and ImageOptions(**job["image_options"])
+        else:
+            image_options = self.image_options # 旧版本留下的任务没记选项
+        image_srcs = self._download_images(job["url"], draft.image_urls, job["assets_dir"], job["safe_title"],
+                                           image_options, save_root=job["save_root"], pooled=False)
+        ir = build_article_ir(ArticleParts(draft, image_srcs, job["url"], job["save_date"], job["tags_str"]))
+        timings = self._export(ir, job["formats"], job["base_path"], job["assets_dir"], pooled=False)
+        fsync_paths([job["base_path"] + get_exporter(name).suffix for name in timings])
+
+    def checkpoint(self):
+        """把上次检查点以来导出的文件刷到磁盘，再刷任务日志 (日志记的 “已导出” 不会跑到文件前面)"""
+        with self._sync_lock:
+            paths, self._unsynced_paths = self._unsynced_paths, []
+            self._exported_since_checkpoint = 0
+        fsync_paths(paths)
+        if self.journal is not None:
+            self.journal.sync()
+
+    def _emit(self, url, stage, detail=None):
+        if self.on_event is not None:
+            self.on_event(url, stage, detail)
+
+    def _record(self, url, state, error=None):
+        if self.journal is not None:
+            self.journal.record(url, state, error)
+
+    def _claim(self, url, formats, refresh=False):
+        """
+        同一批里重复粘贴的链接只处理一次；已经在历史记录里、勾选的格式文件也都在的跳过 (要求重新提取的除外)，
+        文件不全的 (这次多勾了格式、文件被删了) 要补导出。
+        """
+        with self._claim_lock:
+            if url in self._claimed_urls:
+                return False
+            if not refresh:
+                record = self.history_store.get(url)
+                if record is not None and self._outputs_complete(record, formats):
+                    return False
+            self._claimed_urls.add(url)
+            return True
+
+    def run(self, urls, formats, user_tags,
+            max_workers=4, per_host_limit=2, on_progress=None, errors=None, feed=None, refresh_urls=None,
+            fresh_urls=None):
+        """
+        并发处理一批链接，返回和 (去掉空行后的) urls 一一对应的状态列表。
+        on_progress / errors / feed 的含义见 purifier.batch.run_batch (追加的链接排在列表末尾)。
+        refresh_urls 里的链接 (可以是之后才往里加的 set) 即使在历史记录里也不跳过，走 refresh_article (有缓存就不联网)；
+        fresh_urls 里的也一样，只是不读缓存，联网检查文章有没有更新。
+        """
+        def handle(url):
+            url = url.strip()
+            fresh = fresh_urls is not None and url in fresh_urls
+            refresh = fresh or (refresh_urls is not None and url in refresh_urls)
+            # --- 防重复检测 (如果历史记录里已经有了、文件也都在，就跳过) ---
+            if not self._claim(url, formats, refresh):
+                self._record(url, STATE_SKIPPED)
+                self._emit(url, STAGE_SKIPPED)
+                return STATUS_SKIPPED
+            try:
+                # 新链接直接抓；历史里已有的 (要求重新提取，或者文件不全) 由 refresh_article 处理
+                status = self.refresh_article(url, formats, user_tags, fresh=fresh)
+            except Exception as e:
+                self._record(url, STATE_FAILED, str(e) or type(e).__name__)
+                self._emit(url, STAGE_FAILED, str(e) or type(e).__name__)
+                raise
+            if status == STATUS_DUPLICATE:
+                self._record(url, STATE_SKIPPED)
+                self._emit(url, STAGE_DUPLICATE, self.duplicates.get(url))
+                return status
+            self._record(url, STATE_EXPORTED)
+            if status == STATUS_UNCHANGED:
+                self._emit(url, STAGE_UNCHANGED)
+                return status
+            self._emit(url, STAGE_DONE)
+            with self._sync_lock:
+                self._exported_since_checkpoint += 1
+                due = self._exported_since_checkpoint >= CHECKPOINT_EVERY
+            if due:
+                self.checkpoint()
+            return status
+
+        formats = list(formats)
+        for name in formats:
+            get_exporter(name) # 格式名写错了就在开始前报错，不要等到每篇都失败
+        urls = [u for u in urls if u.strip()] # 空行直接丢掉
+        # 同时在算的文章不会超过工人数，多开进程也是闲着
+        processes = min(int(self.cpu_workers or 0), int(max_workers), len(urls) if feed is None else int(max_workers))
+        if processes > 1:
+            self._cpu_pool = ProcessPoolExecutor(max_workers=processes)
+        elif self.image_options is not None:
+            self._image_pool = ThreadPoolExecutor(max_workers=default_cpu_workers(), thread_name_prefix="imageopt")
+        try:
+            return run_batch(urls, handle, max_workers=max_workers, per_host_limit=per_host_limit,
+                             on_progress=on_progress, errors=errors, feed=feed)
+        finally:
+            self.checkpoint()
+            if self._cpu_pool is not None:
+                self._cpu_pool.shutdown()
+                self._cpu_pool = None
+            if self._image_pool is not None:
+                self._image_pool.shutdown()
+                self._image_pool = None
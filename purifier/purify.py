@@ -0,0 +1,95 @@
+"""正文清洗引擎：只遍历一次 DOM 树，去掉小程序卡片、推广段落等干扰内容"""
+import re
+
+from bs4 import CData, NavigableString, Tag
+
+# 1. 直接整块删掉的微信组件：小程序卡片、视频号名片、语音
+WIDGET_TAGS = frozenset(['mp-miniprogram', 'mp-common-profile', 'mpvoice'])
+
+# 2. 推广文本的 “垃圾词黑名单”，所有词编译成一个正则，一次扫描同时匹配
+TRASH_KEYWORDS = ["阅读原文", "喜欢此内容的人还喜欢", "长按扫码", "关注公众号", "点击上方卡片", "扫码关注"]
+TRASH_PATTERN = re.compile("|".join(re.escape(kw) for kw in TRASH_KEYWORDS))
+
+# 只检查 <p> 和 <section>；文字 (去掉空格换行后) 不短于这个长度的视为正常正文，防止误杀长篇大论
+TEXT_TAGS = frozenset(['p', 'section'])
+SHORT_TEXT_LIMIT = 30
+
+# 子树文字摘要 (lead, inner, trail)：inner 是去掉首尾空白后的文字，lead/trail 是首尾的空白。
+# inner 为 None 表示文字已经不短于 SHORT_TEXT_LIMIT (只会越拼越长，不用再拼字符串了)；
+# 纯空白的子树记为 (空白, "", "")。空白最多保留 SHORT_TEXT_LIMIT 个字符，够判断长短就行。
+EMPTY = ("", "", "")
+TOO_LONG = ("", None, "")
+
+
+def _summarize_string(s):
+    core = s.replace(" ", "").replace("\n", "")
+    inner = core.strip()
+    if not inner:
+        return (core[:SHORT_TEXT_LIMIT], "", "")
+    if len(inner) >= SHORT_TEXT_LIMIT:
+        return TOO_LONG
+    lead = core[:len(core) - len(core.lstrip())]
+    trail = core[len(core.rstrip()):]
+    return (lead[:SHORT_TEXT_LIMIT], inner, trail[:SHORT_TEXT_LIMIT])
+
+
+def _concat(a, b):
+    """把两个相邻子树的文字摘要拼起来"""
+    if a[1] is None or b[1] is None:
+        return TOO_LONG
+    if not a[1]:
+        if not b[1]:
+            return ((a[0] + b[0])[:SHORT_TEXT_LIMIT], "", "")
+        return ((a[0] + b[0])[:SHORT_TEXT_LIMIT], b[1], b[2])
+    if not b[1]:
+        return (a[0], a[1], (a[2] + b[0])[:SHORT_TEXT_LIMIT])
+    inner = a[1] + a[2] + b[0] + b[1]
+    if len(inner) >= SHORT_TEXT_LIMIT:
+        return TOO_LONG
+    return (a[0], inner, b[2])
+
+
+def purify_content(content_div):
+    """
+    清洗正文 (原地修改 content_div)。
+    效果和 “先删组件，再对每个 p/section 调 get_text() 逐个比对黑名单” 完全一样，
+    但微信的 <section> 层层嵌套，旧做法同一段文字会在每一层被重新提取一遍；
+    这里自底向上汇总每个子树的文字 (只为短文字拼字符串)，整棵树只走一遍。
+    返回删掉的节点数。
+    """
+    widgets = []
+    trash = []
+
+    # 用显式栈做后序遍历 (嵌套太深时递归会爆栈)：[节点, 子节点迭代器, 已汇总的文字摘要]
+    stack = [[content_div, iter(content_div.contents), EMPTY]]
+    while stack:
+        frame = stack[-1]
+        child = next(frame[1], None)
+        if child is not None:
+            if isinstance(child, Tag):
+                if child.name in WIDGET_TAGS:
+                    widgets.append(child) # 组件整块删除，它的文字也不计入上层
+                else:
+                    stack.append([child, iter(child.contents), EMPTY])
+            elif type(child) in (NavigableString, CData): # 和 get_text() 一样，不算注释、脚本等
+                frame[2] = _concat(frame[2], _summarize_string(child))
+            continue
+
+        # 这个节点的子节点都处理完了
+        stack.pop()
+        tag, summary = frame[0], frame[2]
+        if not stack:
+            break # 根节点 content_div 本身不参与判断
+        if tag.name in TEXT_TAGS and summary[1] is not None and TRASH_PATTERN.search(summary[1]):
+            trash.append(tag)
+        stack[-1][2] = _concat(stack[-1][2], summary)
+
+    for tag in widgets:
+        tag.decompose()
+    removed = len(widgets)
+    # 后序遍历里父节点排在子节点后面，倒着删：外层删掉后，里层已经跟着没了
+    for tag in reversed(trash):
+        if not tag.decomposed:
+            tag.decompose()
+            removed += 1
+    return removed
@@ -0,0 +1,21 @@
+"""后台预热：界面先出来，处理文章才用得到的重模块在后台线程里慢慢导入"""
+import importlib
+
+# 按处理文章时用到的顺序排列；purifier.pipeline 会把剩下的解析、导出模块一并带进来
+HEAVY_MODULES = ("requests", "bs4", "lxml.html", "selectolax.lexbor", "html2text", "purifier.pipeline")
+
+
+def warm_up(modules=HEAVY_MODULES, on_step=None):
+    """
+    依次导入 modules (没装的可选库跳过)，再建好共享的 HTTP 会话。
+    on_step(已完成数, 总数, 模块名) 可以用来显示进度。
+    """
+    for i, name in enumerate(modules, 1):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+        if on_step:
+            on_step(i, len(modules), name)
+    from purifier import net
+    net.get_session()
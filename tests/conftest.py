@@ -0,0 +1,5 @@
+"""测试直接从源码目录导入 purifier (和 benchmarks 一样不需要先安装)"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,93 @@
+"""内容寻址图片仓库：同样的图只存一份、下载过的链接不再联网、硬链接不行就复制"""
+import hashlib
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from purifier import images
+from purifier.asset_store import AssetStore, get_asset_store
+from purifier.net import FetchError
+
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00" + b"jpeg" * 10
+PNG = b"\x89PNG\r\n\x1a\n" + b"png" * 10
+
+
+def test_same_bytes_stored_once(tmp_path):
+    store = AssetStore(str(tmp_path / "store"))
+    a = store.put("https://a.com/logo.jpg", JPEG)
+    b = store.put("https://b.com/logo-copy.jpg", JPEG)
+    assert a == b == store.object_path(hashlib.sha256(JPEG).hexdigest())
+    assert store.put("https://a.com/qr.png", PNG) != a
+    objects = [name for _, _, names in os.walk(store.objects_dir) for name in names]
+    assert len(objects) == 2
+
+
+def test_index_survives_restart(tmp_path):
+    root = str(tmp_path / "store")
+    path = AssetStore(root).put("https://a.com/logo.jpg", JPEG)
+    store = AssetStore(root)
+    assert store.lookup("https://a.com/logo.jpg") == path
+    assert store.lookup("https://a.com/other.jpg") is None
+    os.remove(path) # 仓库文件被删了就当没下载过
+    assert store.lookup("https://a.com/logo.jpg") is None
+
+
+def test_materialize_hardlinks_or_copies(tmp_path, monkeypatch):
+    store = AssetStore(str(tmp_path / "store"))
+    obj = store.put("https://a.com/logo.jpg", JPEG)
+    linked = tmp_path / "linked.jpg"
+    store.materialize(obj, str(linked))
+    assert os.path.samefile(obj, linked)
+    store.materialize(obj, str(linked)) # 已经是同一个文件，什么都不做
+
+    def no_link(src, dst):
+        raise OSError("不支持硬链接")
+
+    monkeypatch.setattr(os, "link", no_link)
+    copied = tmp_path / "copied.jpg"
+    copied.write_bytes(b"old")
+    store.materialize(obj, str(copied))
+    assert copied.read_bytes() == JPEG and not os.path.samefile(obj, copied)
+
+
+def test_get_asset_store_one_per_save_root(tmp_path):
+    store = get_asset_store(str(tmp_path))
+    assert get_asset_store(str(tmp_path)) is store
+    assert store.root == os.path.join(str(tmp_path), ".asset_store")
+
+
+@pytest.fixture
+def fake_fetch(monkeypatch):
+    """假的网络：记下每个被请求的链接；没有登记的链接回 404"""
+    served = {"https://a.com/1": JPEG, "https://a.com/2": PNG}
+    calls = []
+
+    def fetch(url, timeout=10, check_anti_crawl=True):
+        calls.append(url)
+        if url not in served:
+            raise FetchError("HTTP 404")
+        return SimpleNamespace(content=served[url])
+
+    monkeypatch.setattr(images, "fetch", fetch)
+    return calls
+
+
+def test_download_images_dedupes_and_reuses_store(tmp_path, fake_fetch):
+    store = AssetStore(str(tmp_path / "store"))
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    urls = ["https://a.com/1", "https://a.com/2", "https://a.com/1", "https://bad.com/x"]
+    srcs = images.download_images(urls, str(assets), "文章", store=store)
+    # 按正文顺序编号，扩展名按真实格式；重复的图也各占一个编号；失败的保留原链接
+    assert srcs == ["./assets/文章_img1.jpg", "./assets/文章_img2.png", "./assets/文章_img3.jpg", "https://bad.com/x"]
+    assert sorted(fake_fetch) == ["https://a.com/1", "https://a.com/2", "https://bad.com/x"] # 同一篇里重复的只下载一次
+    assert os.path.samefile(assets / "文章_img1.jpg", assets / "文章_img3.jpg")
+
+    # 另一篇文章用到同样的图：不再联网，直接从仓库硬链接过来
+    fake_fetch.clear()
+    other = tmp_path / "other"
+    other.mkdir()
+    assert images.download_images(["https://a.com/2"], str(other), "另一篇", store=store) == ["./assets/另一篇_img1.png"]
+    assert fake_fetch == []
+    assert os.path.samefile(other / "另一篇_img1.png", assets / "文章_img2.png")
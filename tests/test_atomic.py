@@ -0,0 +1,64 @@
+"""安全写文件：内容没变不替换、出异常不碰正式文件"""
+import os
+
+import pytest
+
+from purifier.atomic import atomic_write
+
+
+def leftover_tmp_files(directory):
+    return [name for name in os.listdir(directory) if name.endswith(".tmp")]
+
+
+def test_unchanged_content_keeps_file(tmp_path):
+    path = tmp_path / "a.md"
+    path.write_text("同样的内容", encoding="utf-8")
+    os.utime(path, (1000, 1000))
+    before = os.stat(path)
+    with atomic_write(str(path), encoding="utf-8", only_if_changed=True) as f:
+        f.write("同样的内容")
+    after = os.stat(path)
+    assert (after.st_ino, after.st_mtime) == (before.st_ino, before.st_mtime)
+    assert leftover_tmp_files(tmp_path) == []
+
+
+def test_changed_content_replaces_file(tmp_path):
+    path = tmp_path / "a.md"
+    path.write_text("旧内容", encoding="utf-8")
+    with atomic_write(str(path), encoding="utf-8", only_if_changed=True) as f:
+        f.write("新内容")
+    assert path.read_text(encoding="utf-8") == "新内容"
+    assert leftover_tmp_files(tmp_path) == []
+
+
+def test_new_file_is_written(tmp_path):
+    path = tmp_path / "a.bin"
+    with atomic_write(str(path), "wb", only_if_changed=True) as f:
+        f.write(b"\x00\x01")
+    assert path.read_bytes() == b"\x00\x01"
+
+
+def test_exception_keeps_original(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text("{}", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path), encoding="utf-8", fsync=True) as f:
+            f.write('{"half": ')
+            raise RuntimeError("boom")
+    assert path.read_text(encoding="utf-8") == "{}"
+    assert leftover_tmp_files(tmp_path) == []
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Windows 没有 umask 权限位")
+def test_new_file_mode_follows_umask(tmp_path):
+    old = os.umask(0o027)
+    try:
+        with atomic_write(str(tmp_path / "a.md")) as f:
+            f.write("x")
+        with open(tmp_path / "b.md", "w") as f:
+            f.write("x")
+        assert os.umask(0o027) == 0o027 # 写文件没有动过 umask
+    finally:
+        os.umask(old)
+    mode = os.stat(tmp_path / "a.md").st_mode & 0o777
+    assert mode == os.stat(tmp_path / "b.md").st_mode & 0o777 == 0o640
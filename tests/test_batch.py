@@ -0,0 +1,86 @@
+"""并发批处理引擎：单站点限流、状态列表、异常记为失败、批次进行中追加链接"""
+import threading
+import time
+
+from purifier.batch import BatchFeed, HostLimiter, run_batch, STATUS_SAVED, STATUS_FAILED
+
+
+def test_host_limiter_caps_concurrency_per_host():
+    limiter = HostLimiter(2)
+    lock = threading.Lock()
+    active = {"a.com": 0, "b.com": 0}
+    peak = {"a.com": 0, "b.com": 0}
+
+    def work(host):
+        sem = limiter.acquire(f"https://{host}/x")
+        try:
+            with lock:
+                active[host] += 1
+                peak[host] = max(peak[host], active[host])
+            time.sleep(0.02)
+            with lock:
+                active[host] -= 1
+        finally:
+            sem.release()
+
+    threads = [threading.Thread(target=work, args=(host,)) for host in ("a.com", "b.com") for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak == {"a.com": 2, "b.com": 2}
+
+
+def test_host_limiter_is_case_insensitive():
+    limiter = HostLimiter(1)
+    assert limiter.acquire("https://A.com/1") is limiter._get("https://a.COM/2")
+
+
+def test_run_batch_keeps_order_and_records_errors():
+    def handler(url):
+        if url.endswith("bad"):
+            raise ValueError("坏链接")
+        time.sleep(0.01 if url.endswith("1") else 0)
+        return STATUS_SAVED
+
+    progress = []
+    errors = {}
+    urls = ["https://a.com/1", "https://a.com/bad", "https://b.com/2"]
+    results = run_batch(urls, handler, max_workers=3, per_host_limit=1,
+                        on_progress=lambda done, total, url, status: progress.append((done, total)), errors=errors)
+    assert results == [STATUS_SAVED, STATUS_FAILED, STATUS_SAVED]
+    assert errors == {"https://a.com/bad": "坏链接"}
+    assert sorted(progress) == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_run_batch_empty():
+    assert run_batch([], lambda url: STATUS_SAVED) == []
+
+
+def test_batch_feed_appends_and_dedupes_while_running():
+    feed = BatchFeed()
+    release = threading.Event()
+    seen = []
+
+    def handler(url):
+        seen.append(url)
+        if url.endswith("/1"):
+            # 第一篇还在跑的时候追加链接 (重复的那个不应该再处理一次)
+            assert feed.add("https://a.com/2")
+            assert feed.add("https://a.com/1")
+            assert feed.add("https://a.com/2")
+            release.set()
+        return STATUS_SAVED
+
+    urls = ["https://a.com/1"]
+    results = run_batch(urls, handler, max_workers=2, per_host_limit=2, feed=feed)
+    assert release.is_set()
+    assert urls == ["https://a.com/1", "https://a.com/2"] # 原地追加
+    assert results == [STATUS_SAVED, STATUS_SAVED]
+    assert sorted(seen) == urls
+
+
+def test_batch_feed_rejects_after_close():
+    feed = BatchFeed()
+    assert run_batch([], lambda url: STATUS_SAVED, feed=feed) == []
+    assert feed.add("https://a.com/late") is False # 调用方要自己另起一批
@@ -0,0 +1,43 @@
+"""文章中间表示：每篇只建一次，各导出格式都从它取内容"""
+import html2text
+
+from purifier.convert import ArticleDraft, ArticleParts, VISIBLE_STYLE, build_article_ir
+from purifier.exporters import run_exporter
+
+CONTENT = ('<div id="js_content"><h2>第一部分</h2><p>正文<img data-src="https://a.com/1"></p>'
+           '<h3>  小节  </h3><p><img data-src="https://a.com/2"></p></div>')
+
+
+def make_ir(image_srcs=("./assets/t_img1.jpg", "https://a.com/2")):
+    draft = ArticleDraft("标题", "公众号", CONTENT, ["https://a.com/1", "https://a.com/2"])
+    return build_article_ir(ArticleParts(draft, list(image_srcs), "https://mp.weixin.qq.com/s/x", "2024-01-02", "微信摘录"))
+
+
+def test_ir_applies_image_srcs_and_headings():
+    ir = make_ir()
+    # 下载成功的换成本地路径，失败的保留原链接
+    assert 'src="./assets/t_img1.jpg"' in ir.body_html and 'src="https://a.com/2"' in ir.body_html
+    assert ir.headings == [(2, "第一部分"), (3, "小节")]
+    assert ir.visible_html.startswith(f'<div id="js_content" style="{VISIBLE_STYLE}">')
+    assert 'source: "https://mp.weixin.qq.com/s/x"' in ir.frontmatter and "tags: [微信摘录]" in ir.frontmatter
+
+
+def test_markdown_is_built_once(monkeypatch):
+    ir = make_ir() # build_article_ir 已经顺手生成好了
+    markdown = ir.markdown
+    assert "![](./assets/t_img1.jpg)" in markdown
+
+    def fail(self, html):
+        raise AssertionError("Markdown 只应该生成一次")
+
+    monkeypatch.setattr(html2text.HTML2Text, "handle", fail)
+    assert ir.markdown is markdown
+
+
+def test_only_selected_format_is_written(tmp_path):
+    ir = make_ir()
+    base_path = str(tmp_path / "标题")
+    run_exporter("md", ir, base_path, str(tmp_path / "assets"))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["标题.md"]
+    text = (tmp_path / "标题.md").read_text(encoding="utf-8")
+    assert text.startswith(ir.frontmatter + "# 标题\n\n") and text.endswith(ir.markdown)
@@ -0,0 +1,70 @@
+"""导出格式插件：注册、按勾选导出、各格式计时，可选格式失败不拖累整篇"""
+import pytest
+
+from purifier import exporters
+from purifier.convert import ArticleIR
+from purifier.exporters import exporter_names, get_exporter, register_exporter
+from purifier.pipeline import ArticlePipeline
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """测试里注册的格式不留到别的测试"""
+    monkeypatch.setattr(exporters, "_EXPORTERS", dict(exporters._EXPORTERS))
+    return exporters._EXPORTERS
+
+
+def make_ir():
+    return ArticleIR("标题", "公众号", "https://a.com/s", "2024-01-02", "微信摘录",
+                     '<div id="js_content"><h2>小节</h2><p>正文</p></div>', [(2, "小节")])
+
+
+def export(tmp_path, formats):
+    pipeline = ArticlePipeline(str(tmp_path), history_store=None)
+    return pipeline._export(make_ir(), formats, str(tmp_path / "标题"), str(tmp_path / "assets"))
+
+
+def test_builtin_formats():
+    assert exporter_names()[:4] == ["md", "html", "docx", "mm"]
+    assert get_exporter("md").required and not get_exporter("mm").required
+    with pytest.raises(ValueError):
+        get_exporter("pdf")
+
+
+def test_new_format_plugs_in(tmp_path, registry):
+    @register_exporter("txt", ".txt", "纯文本")
+    def export_txt(ir, path, assets_dir):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(ir.title)
+
+    timings = export(tmp_path, ["txt", "md"])
+    assert list(timings) == ["txt", "md"] and all(sec >= 0 for sec in timings.values())
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["标题.md", "标题.txt"] # 没勾的格式不写
+    assert (tmp_path / "标题.txt").read_text(encoding="utf-8") == "标题"
+
+
+def test_unavailable_format_is_skipped(tmp_path, registry):
+    @register_exporter("pdf", ".pdf", "PDF", available=False)
+    def export_pdf(ir, path, assets_dir):
+        raise AssertionError("缺库的格式不应该被调用")
+
+    assert list(export(tmp_path, ["pdf", "html"])) == ["html"]
+
+
+def test_optional_failure_only_logged(tmp_path, registry, capsys):
+    @register_exporter("broken", ".x", "坏格式")
+    def export_broken(ir, path, assets_dir):
+        raise RuntimeError("写不了")
+
+    assert list(export(tmp_path, ["broken", "md"])) == ["md"]
+    assert "坏格式 导出失败" in capsys.readouterr().out
+
+
+def test_required_failure_fails_after_others(tmp_path, registry):
+    @register_exporter("must", ".x", "必需格式", required=True)
+    def export_must(ir, path, assets_dir):
+        raise RuntimeError("写不了")
+
+    with pytest.raises(RuntimeError):
+        export(tmp_path, ["must", "mm"])
+    assert (tmp_path / "标题.mm").exists() # 其他格式照样导完
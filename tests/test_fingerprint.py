@@ -0,0 +1,59 @@
+"""转载检测：SimHash 指纹和按段索引查找"""
+import random
+
+from purifier import fingerprint
+from purifier.history import HistoryStore
+
+ARTICLE = "".join(f"<p>第{i}段：芯片设计离不开晶体管，工艺每进一步，同样面积能放下的晶体管就更多。</p>" for i in range(20))
+
+
+def random_text(seed, length=2000):
+    rng = random.Random(seed)
+    return "".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(length))
+
+
+def test_repost_with_small_edits_is_close():
+    original = fingerprint.article_fingerprint(ARTICLE)
+    repost = fingerprint.article_fingerprint("<p>来源：某某公众号</p>" + ARTICLE + "<p>（完）</p>")
+    assert original == fingerprint.article_fingerprint(ARTICLE)
+    assert 0 <= original < 1 << fingerprint.BITS
+    assert fingerprint.distance(original, repost) <= fingerprint.MAX_DISTANCE
+
+
+def test_markup_and_punctuation_are_ignored():
+    plain = ARTICLE.replace("<p>", "").replace("</p>", "").replace("，", "").replace("。", "")
+    assert fingerprint.normalize_text(ARTICLE) == fingerprint.normalize_text(plain)
+
+
+def test_unrelated_texts_are_far_apart():
+    a = fingerprint.simhash(random_text(1))
+    b = fingerprint.simhash(random_text(2))
+    assert fingerprint.distance(a, b) > 10
+
+
+def test_short_text_has_no_fingerprint():
+    assert fingerprint.article_fingerprint("<p>只有一句话。</p><img src='a.png'>") is None
+
+
+def test_close_fingerprints_share_a_band():
+    value = fingerprint.simhash(random_text(3))
+    rng = random.Random(4)
+    for _ in range(50):
+        other = value
+        for bit in rng.sample(range(fingerprint.BITS), fingerprint.MAX_DISTANCE):
+            other ^= 1 << bit
+        assert any(a == b for a, b in zip(fingerprint.bands(value), fingerprint.bands(other)))
+
+
+def test_find_near_duplicate(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    high = (1 << 63) | 0x0123_4567_89AB_CDEF # 超过有符号 64 位，存进 sqlite 要换算
+    store.add_fingerprint("orig", high)
+    store.add_fingerprint("other", 0x0F0F_0F0F_0F0F_0F0F)
+    assert store.has_fingerprint("orig")
+    near = high ^ (1 << 0) ^ (1 << 20) ^ (1 << 40)
+    assert store.find_near_duplicate(near) == "orig"
+    assert store.find_near_duplicate(high, exclude_url="orig") is None
+    assert store.find_near_duplicate(near ^ (1 << 60)) is None # 差 4 位就不算转载
+    store.remove_fingerprint("orig")
+    assert store.find_near_duplicate(high) is None
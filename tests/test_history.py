@@ -0,0 +1,128 @@
+"""抓取历史：查重、全文检索 (长词走索引，短词不丢)、老数据迁移"""
+import sqlite3
+
+import pytest
+
+from purifier.history import HistoryStore, SCHEMA_VERSION
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    if store.fts_tokenizer != "trigram":
+        pytest.skip("sqlite 不支持 trigram 分词")
+    store.add("AI 芯片设计入门", "u1", "2024-01-02", "讲 AI 芯片设计的基本流程")
+    store.add("晶体管的故事", "u2", "2024-02-03", "芯片设计离不开晶体管，100%_国产")
+    store.add("今日菜谱", "u3", "2024-03-04", "红烧肉的做法")
+    return store
+
+
+def urls(rows):
+    return sorted(row["url"] for row in rows)
+
+
+def test_add_contains_remove(store):
+    assert store.contains("u1")
+    assert not store.add("重复", "u1", "2024-05-06") # 同一链接不重复写入
+    store.remove("u1")
+    assert not store.contains("u1")
+    assert urls(store.page(query="芯片设计")) == ["u2"]
+
+
+def test_long_terms_use_full_text(store):
+    assert store.uses_full_text("芯片设计")
+    rows = store.page(query="芯片设计")
+    assert urls(rows) == ["u1", "u2"]
+    assert all("【" in row["snippet"] for row in rows)
+    assert store.count("芯片设计 晶体管") == 1
+
+
+def test_short_terms_still_filter(store):
+    # “AI”、“晶体” 太短进不了 trigram 索引，但结果必须包含它们
+    assert urls(store.page(query="AI 芯片设计")) == ["u1"]
+    assert urls(store.page(query="芯片设计 晶体")) == ["u2"]
+    assert store.count("芯片设计 晶体") == 1
+
+
+def test_short_term_wildcards_are_literal(store):
+    assert urls(store.page(query="芯片设计 %_")) == ["u2"]
+    assert urls(store.page(query="芯片设计 _")) == ["u2"]
+
+
+def test_only_short_terms_fall_back_to_title(store):
+    assert not store.uses_full_text("菜谱")
+    assert not store.uses_full_text("2024-01")
+    assert urls(store.page(query="菜谱")) == ["u3"]
+    assert urls(store.page(query="2024-01")) == ["u1"]
+
+
+def test_imported_titles_are_searchable(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = HistoryStore(path)
+    if not store.fts_enabled:
+        pytest.skip("sqlite 没有 FTS5")
+    store.import_items([{"title": "迁移过来的老文章标题", "url": "old1", "date": "2023-01-01"}, {"url": ""}])
+    assert urls(store.page(query="老文章标题")) == ["old1"]
+    store._conn.close()
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    conn.close()
+
+
+def test_import_old_config_history(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    # 老版本 config.json 里的列表：新的在前
+    items = [
+        {"title": "第三篇", "url": "c", "date": "2024-03-01"},
+        {"title": "第二篇", "url": "b", "date": "2024-02-01"},
+        {"title": "没有链接的坏记录"},
+        {"title": "第一篇", "url": "a", "date": "2024-01-01"},
+    ]
+    store.import_items(items)
+    store.import_items(items) # 再导一次也不会重复
+    assert store.count() == 3
+    assert [row["url"] for row in store.page()] == ["c", "b", "a"] # 还是新的在前
+    assert [row["url"] for row in store.page(offset=1, limit=1)] == ["b"]
+    assert store.get("a") == {"title": "第一篇", "url": "a", "date": "2024-01-01"}
+    assert store.get("missing") is None
+
+
+def test_add_is_unique_and_remove_clears_everything(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    assert store.add("标题", "u1", "2024-01-02", "正文")
+    assert not store.add("别的标题", "u1", "2024-05-06")
+    store.set_validators("u1", '"etag"', None, "page", "content")
+    store.add_fingerprint("u1", 12345)
+    assert store.get_validators("u1") == {"etag": '"etag"', "last_modified": None, "page_hash": "page",
+                                          "content_hash": "content"}
+    store.remove("u1")
+    assert not store.contains("u1")
+    assert store.get_validators("u1") is None and not store.has_fingerprint("u1")
+    assert store.count() == 0
+
+
+def test_title_and_date_search_without_full_text(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.db"))
+    store.add("周报 第一期", "u1", "2024-01-02")
+    store.add("月报", "u2", "2024-02-03")
+    assert [row["url"] for row in store.page(query="2024-02")] == ["u2"]
+    assert store.count("周报") == 1 # 太短，走标题模糊匹配
+
+
+def test_backfill_existing_rows_once(tmp_path):
+    path = str(tmp_path / "history.db")
+    # 全文索引上线之前的数据库：只有 articles 表
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE articles (id INTEGER PRIMARY KEY AUTOINCREMENT, url TEXT NOT NULL UNIQUE,
+                    title TEXT NOT NULL, date TEXT NOT NULL, created_at REAL NOT NULL)""")
+    conn.execute("INSERT INTO articles (url, title, date, created_at) VALUES ('old', '升级之前存的文章', '2023-05-06', 0)")
+    conn.commit()
+    conn.close()
+
+    store = HistoryStore(path)
+    if not store.fts_enabled:
+        pytest.skip("sqlite 没有 FTS5")
+    assert [row["url"] for row in store.page(query="升级之前存的")] == ["old"]
+    store._conn.close()
+    store = HistoryStore(path) # 再次打开不会再补一遍
+    assert store._conn.execute("SELECT COUNT(*) FROM articles_fts").fetchone()[0] == 1
@@ -0,0 +1,75 @@
+"""延后的图片队列：任务落盘，软件重启后接着处理，失败的记次数，坏文件直接丢"""
+import gzip
+import json
+import os
+
+from purifier import image_queue
+from purifier.image_queue import ImageQueue, JOB_SUFFIX
+
+
+def job_files(queue_dir):
+    return sorted(name for name in os.listdir(queue_dir) if name.endswith(JOB_SUFFIX))
+
+
+def load(queue_dir):
+    path = os.path.join(queue_dir, job_files(queue_dir)[0])
+    with open(path, "rb") as f:
+        return json.loads(gzip.decompress(f.read()).decode("utf-8"))
+
+
+def run_all(queue_dir, handler):
+    """模拟一次启动：新建队列、处理完已有的任务再退出"""
+    queue = ImageQueue(queue_dir)
+    queue.start(handler)
+    queue.wait_idle()
+    queue.stop()
+    return queue
+
+
+def test_jobs_survive_restart_in_order(tmp_path):
+    queue_dir = str(tmp_path / "queue")
+    queue = ImageQueue(queue_dir) # 没 start 就关掉了
+    for i in range(3):
+        queue.add({"url": f"https://a.com/{i}", "formats": ["md"]})
+    assert queue.pending_count() == 3 and len(job_files(queue_dir)) == 3
+
+    done = []
+    restarted = run_all(queue_dir, done.append)
+    assert [job["url"] for job in done] == ["https://a.com/0", "https://a.com/1", "https://a.com/2"]
+    assert done[0] == {"url": "https://a.com/0", "formats": ["md"], "attempts": 0}
+    assert restarted.pending_count() == 0 and job_files(queue_dir) == []
+
+
+def test_failed_job_retried_then_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(image_queue, "MAX_ATTEMPTS", 2)
+    queue_dir = str(tmp_path / "queue")
+    ImageQueue(queue_dir).add({"url": "https://a.com/x"})
+    calls = []
+
+    def fail(job):
+        calls.append(job["attempts"])
+        raise OSError("网络断了")
+
+    run_all(queue_dir, fail)
+    assert load(queue_dir)["attempts"] == 1 # 留在磁盘上等下次启动
+    run_all(queue_dir, fail)
+    assert calls == [0, 1] and job_files(queue_dir) == []
+
+
+def test_unreadable_job_discarded(tmp_path):
+    queue_dir = tmp_path / "queue"
+    queue_dir.mkdir()
+    (queue_dir / f"0-bad{JOB_SUFFIX}").write_bytes(b"not gzip")
+    done = []
+    run_all(str(queue_dir), done.append)
+    assert done == [] and job_files(str(queue_dir)) == []
+
+
+def test_on_change_reports_remaining(tmp_path):
+    queue = ImageQueue(str(tmp_path / "queue"))
+    remaining = []
+    queue.start(lambda job: None, on_change=remaining.append)
+    queue.add({"url": "https://a.com/1"})
+    queue.wait_idle()
+    queue.stop()
+    assert remaining == [0]
@@ -0,0 +1,62 @@
+"""批量任务日志：断点续传只处理没有结果 (或失败) 的链接"""
+import os
+
+from purifier.journal import (
+    JobJournal, find_unfinished, STATE_EXPORTED, STATE_FAILED, STATE_FETCHED, STATE_QUEUED, STATE_SKIPPED,
+)
+
+URLS = ["https://a.com/1", "https://a.com/2", "https://a.com/3", "https://a.com/4", "https://a.com/5"]
+
+
+def make_journal(jobs_dir):
+    journal = JobJournal.create(str(jobs_dir), URLS, {"md": True, "save_root": "/archive", "image_format": "webp"})
+    journal.record(URLS[0], STATE_EXPORTED)
+    journal.record(URLS[1], STATE_SKIPPED)
+    journal.record(URLS[2], STATE_FAILED, "HTTP 503")
+    journal.record(URLS[3], STATE_FETCHED)
+    return journal
+
+
+def test_resume_keeps_options_and_pending_order(tmp_path):
+    make_journal(tmp_path).close()
+    (journal,) = find_unfinished(str(tmp_path))
+    assert journal.options == {"md": True, "save_root": "/archive", "image_format": "webp"}
+    # 失败的也要重试；顺序和原来一样
+    assert journal.pending_urls() == [URLS[2], URLS[3], URLS[4]]
+    journal.close()
+
+
+def test_half_written_last_line_is_ignored(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.close()
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"url": "https://a.com/5", "sta')
+    loaded = JobJournal.load(journal.path)
+    assert loaded.states[URLS[4]] == STATE_QUEUED
+    loaded.close()
+
+
+def test_finish_removes_journal(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.finish()
+    assert not os.path.exists(journal.path)
+    assert find_unfinished(str(tmp_path)) == []
+
+
+def test_finished_journals_are_cleaned_up(tmp_path):
+    journal = JobJournal.create(str(tmp_path), URLS[:1], {})
+    journal.record(URLS[0], STATE_EXPORTED)
+    journal.close()
+    assert find_unfinished(str(tmp_path)) == []
+    assert not os.path.exists(journal.path)
+
+
+def test_add_url_does_not_reset_known_urls(tmp_path):
+    journal = make_journal(tmp_path)
+    assert journal.add_url(URLS[0]) is False # 已导出的不能被改回排队
+    assert journal.add_url("https://a.com/new") is True
+    journal.close()
+    loaded = JobJournal.load(journal.path)
+    assert loaded.states[URLS[0]] == STATE_EXPORTED
+    assert loaded.states["https://a.com/new"] == STATE_QUEUED
+    loaded.close()
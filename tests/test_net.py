@@ -0,0 +1,70 @@
+"""文章页流式抓取：看开头判断页面类型、超过上限就放弃"""
+import pytest
+
+from purifier.net import (
+    _read_page, classify_page, CLASSIFY_BYTES, PageRejectedError,
+    PAGE_ARTICLE, PAGE_CAPTCHA, PAGE_DELETED, PAGE_UNSUPPORTED,
+)
+
+
+class FakeResponse:
+    """只有 _read_page 用到的 headers 和 iter_content；记下读了多少块"""
+
+    def __init__(self, body, content_type="text/html; charset=utf-8", chunk=8 * 1024):
+        self.headers = {"Content-Type": content_type}
+        self.body = body
+        self.chunk = chunk
+        self.chunks_read = 0
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), self.chunk):
+            self.chunks_read += 1
+            yield self.body[i:i + self.chunk]
+
+
+def page(marker, size):
+    head = f"<html><body>{marker}".encode("utf-8")
+    return head + b" " * (size - len(head))
+
+
+def test_classify_page():
+    assert classify_page(b'<div id="js_content">...</div>') == PAGE_ARTICLE
+    assert classify_page("环境异常，请完成验证".encode("utf-8")) == PAGE_CAPTCHA
+    assert classify_page("该内容已被发布者删除 rich_media".encode("utf-8")) == PAGE_DELETED
+    assert classify_page(b"<html>some blog</html>") == PAGE_UNSUPPORTED
+    assert classify_page(b"%PDF-1.7", "application/pdf") == PAGE_UNSUPPORTED
+
+
+def test_classify_page_prefers_article_body():
+    # 正文里引用了 “已被删除” 的提示，也还是文章
+    head = '<div id="js_content">该内容已被发布者删除</div>'.encode("utf-8")
+    assert classify_page(head) == PAGE_ARTICLE
+
+
+def test_small_article_returns_body():
+    body = page('<div id="js_content">hello</div>', 10 * 1024)
+    assert _read_page(FakeResponse(body), 1024 * 1024) == (PAGE_ARTICLE, body)
+
+
+def test_large_article_is_read_fully():
+    body = page('<div id="js_content">hello</div>', 5 * CLASSIFY_BYTES)
+    assert _read_page(FakeResponse(body), 1024 * 1024) == (PAGE_ARTICLE, body)
+
+
+def test_deleted_page_stops_after_classify_bytes():
+    response = FakeResponse(page("该内容已被发布者删除 rich_media", 10 * CLASSIFY_BYTES))
+    assert _read_page(response, 1024 * 1024) == (PAGE_DELETED, None)
+    assert response.chunks_read * response.chunk == CLASSIFY_BYTES
+
+
+def test_unsupported_content_type_has_no_body():
+    response = FakeResponse(b"\x89PNG" + b"\0" * 100, content_type="image/png")
+    assert _read_page(response, 1024 * 1024) == (PAGE_UNSUPPORTED, None)
+
+
+def test_oversized_page_is_rejected():
+    response = FakeResponse(page('<div id="js_content">', 4 * CLASSIFY_BYTES))
+    with pytest.raises(PageRejectedError) as info:
+        _read_page(response, 2 * CLASSIFY_BYTES)
+    assert info.value.kind == PAGE_UNSUPPORTED
+    assert response.chunks_read * response.chunk <= 2 * CLASSIFY_BYTES + response.chunk
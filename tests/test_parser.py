@@ -0,0 +1,41 @@
+"""文章解析：每个装了的解析后端取出的标题、公众号名和正文都要一样"""
+import pytest
+
+from benchmarks.fixtures import make_article_html
+from purifier.parser import available_backends, default_backend, parse_article, BACKEND_HTML_PARSER
+
+PAGES = {
+    "generated": make_article_html(paragraphs=40, script_kb=2, seed=1, title="如何整理阅读收藏 & 笔记"),
+    # 标题里有实体和标签、class 有多个、正文在页面中间、后面还有脚本
+    "entities": ('<html><head><script>var a = "<div id=\'js_content\'>假的</div>";</script></head><body>'
+                 '<h1 class="rich_media_title  js_title">\n  AT&amp;T <em>财报</em> 解读\n</h1>'
+                 '<a id="js_name" href="#">\n 某&nbsp;公众号 </a>'
+                 '<div id="js_content" style="visibility: hidden;"><p>第一段<br>换行</p>'
+                 '<img data-src="https://mmbiz.qpic.cn/a/640"><p>&lt;代码&gt; &amp; 符号</p></div>'
+                 "<script>var b = 1;</script></body></html>"),
+    "no_content": '<html><body><h1 class="rich_media_title">只有标题</h1></body></html>',
+}
+
+
+def parsed(name, backend):
+    title, author, content_div = parse_article(PAGES[name], backend)
+    return title, author, None if content_div is None else str(content_div)
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("name", sorted(PAGES))
+def test_backends_agree(name, backend):
+    assert parsed(name, backend) == parsed(name, BACKEND_HTML_PARSER)
+
+
+def test_fields():
+    title, author, content = parsed("entities", default_backend())
+    assert title == "AT&T 财报 解读"
+    assert author == "某\xa0公众号"
+    assert content.startswith('<div id="js_content"') and "假的" not in content
+    assert parsed("no_content", default_backend()) == ("只有标题", "未知公众号", None)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        parse_article(PAGES["generated"], "no-such-parser")
@@ -0,0 +1,171 @@
+"""文章流水线：对着本地替身服务器跑完整流程 (抓取、缓存、重新导出)"""
+import os
+
+import pytest
+
+from benchmarks.standin import StandInServer
+from purifier import pipeline as pipeline_module
+from purifier.batch import STATUS_DUPLICATE, STATUS_SAVED, STATUS_SKIPPED, STATUS_UNCHANGED
+from purifier.cache import PageCache
+from purifier.convert import prepare_article
+from purifier.fingerprint import article_fingerprint
+from purifier.history import HistoryStore
+from purifier.image_queue import ImageQueue
+from purifier.imageopt import ImageOptions
+from purifier.pipeline import ArticlePipeline, NEAR_DUP_LINK, NEAR_DUP_OFF
+
+
+@pytest.fixture
+def server():
+    server = StandInServer.generated(2, paragraphs=20, script_kb=1, image_kb=1).start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def stores(tmp_path):
+    return HistoryStore(str(tmp_path / "history.db")), PageCache(str(tmp_path / "pages"))
+
+
+def make_pipeline(tmp_path, stores, **kwargs):
+    history_store, page_cache = stores
+    # 生成的样本文章正文几乎一样，不关掉转载检测的话第二篇会被当成转载
+    kwargs.setdefault("near_duplicates", NEAR_DUP_OFF)
+    return ArticlePipeline(str(tmp_path / "out"), history_store, page_cache, **kwargs)
+
+
+def month_dir(tmp_path):
+    """文章都是今天存的，只有一个月份目录 (.asset_store 是图片仓库)"""
+    (month,) = [d for d in os.listdir(tmp_path / "out") if not d.startswith(".")]
+    return tmp_path / "out" / month
+
+
+def saved_files(tmp_path):
+    return sorted(name for name in os.listdir(month_dir(tmp_path)) if name != "assets")
+
+
+def read_md(tmp_path, title):
+    return (month_dir(tmp_path) / f"{title}.md").read_text(encoding="utf-8")
+
+
+def test_reexport_works_offline(tmp_path, server, stores):
+    urls = server.article_urls()
+    assert make_pipeline(tmp_path, stores).run(urls, ["md"], "") == [STATUS_SAVED, STATUS_SAVED]
+    server.stop() # 断网：下面的重新导出只能靠网页缓存和图片仓库
+
+    # 多勾了格式：抓过的文章不跳过，从缓存补导出
+    assert make_pipeline(tmp_path, stores).run(urls, ["md", "html", "mm"], "") == [STATUS_SAVED, STATUS_SAVED]
+    assert len(saved_files(tmp_path)) == 6
+    md = read_md(tmp_path, "基准测试文章 0")
+    assert "./assets/" in md and "/img/" not in md # 图片还是本地的，没有退回原链接
+
+    # 文件被删了也一样补回来
+    os.remove(month_dir(tmp_path) / "基准测试文章 1.html")
+    assert make_pipeline(tmp_path, stores).run(urls, ["md", "html"], "") == [STATUS_SKIPPED, STATUS_SAVED]
+
+    # 从历史面板 “提取”：缓存里的网页没变，什么都不写
+    result = make_pipeline(tmp_path, stores).run(urls, ["md", "html"], "", refresh_urls=set(urls))
+    assert result == [STATUS_UNCHANGED, STATUS_UNCHANGED]
+
+
+@pytest.fixture
+def saved(tmp_path, server, stores):
+    """先存好第一篇文章，把各文件的修改时间拨回去，重写过的文件一看就知道"""
+    url = server.article_urls()[0]
+    assert make_pipeline(tmp_path, stores).run([url], ["md", "html"], "") == [STATUS_SAVED]
+    for name in saved_files(tmp_path):
+        os.utime(month_dir(tmp_path) / name, (1000, 1000))
+    return url
+
+
+def rewritten(tmp_path):
+    return [name for name in saved_files(tmp_path) if os.stat(month_dir(tmp_path) / name).st_mtime != 1000]
+
+
+def refresh(tmp_path, stores, url, formats=("md", "html")):
+    return make_pipeline(tmp_path, stores).run([url], list(formats), "", fresh_urls={url})
+
+
+def test_refresh_not_modified(tmp_path, server, stores, saved):
+    sent = server.stats()["bytes"]
+    assert refresh(tmp_path, stores, saved) == [STATUS_UNCHANGED]
+    assert server.stats()["bytes"] == sent # 304 没有响应体
+    assert rewritten(tmp_path) == []
+
+
+def test_refresh_same_page_without_etag(tmp_path, server, stores, saved):
+    history_store = stores[0]
+    old = history_store.get_validators(saved)
+    history_store.set_validators(saved, None, None, old["page_hash"], old["content_hash"]) # 当作服务器不支持条件请求
+    assert refresh(tmp_path, stores, saved) == [STATUS_UNCHANGED]
+    assert rewritten(tmp_path) == []
+    assert history_store.get_validators(saved)["etag"] # 这次的 ETag 记下了，下次能发条件请求
+
+
+def test_refresh_page_changed_but_content_same(tmp_path, server, stores, saved):
+    server.pages[0] = server.pages[0].replace(b"var msg_data", b"var msg_data_v2") # 只改了正文外面的脚本
+    old_page_hash = stores[0].get_validators(saved)["page_hash"]
+    assert refresh(tmp_path, stores, saved) == [STATUS_UNCHANGED]
+    assert rewritten(tmp_path) == []
+    assert stores[0].get_validators(saved)["page_hash"] != old_page_hash
+
+
+def test_refresh_missing_outputs_uses_cache(tmp_path, server, stores, saved):
+    os.remove(month_dir(tmp_path) / "基准测试文章 0.html")
+    server.stop()
+    assert refresh(tmp_path, stores, saved, ("md", "html", "mm")) == [STATUS_SAVED]
+    assert saved_files(tmp_path) == ["基准测试文章 0.html", "基准测试文章 0.md", "基准测试文章 0.mm"]
+    assert rewritten(tmp_path) == ["基准测试文章 0.html", "基准测试文章 0.mm"] # md 内容没变，不重写
+
+
+def test_refresh_falls_back_to_cache_when_offline(tmp_path, server, stores, saved):
+    server.stop()
+    assert refresh(tmp_path, stores, saved) == [STATUS_UNCHANGED]
+    assert rewritten(tmp_path) == []
+
+
+def test_refresh_changed_title_keeps_file_names(tmp_path, server, stores, saved):
+    server.pages[0] = server.pages[0].replace("基准测试文章 0".encode("utf-8"), "改过的标题".encode("utf-8"))
+    assert refresh(tmp_path, stores, saved) == [STATUS_SAVED]
+    # 没有多出一份新标题的文件，原来的文件里换成了新标题；历史记录还指向原来的文件
+    assert saved_files(tmp_path) == ["基准测试文章 0.html", "基准测试文章 0.md"]
+    assert "# 改过的标题" in read_md(tmp_path, "基准测试文章 0")
+    assert stores[0].get(saved)["title"] == "基准测试文章 0"
+
+
+def test_repost_links_only_to_saved_originals(tmp_path, server, stores):
+    history_store = stores[0]
+    url = server.article_urls()[0]
+    original = "https://mp.weixin.qq.com/s/original"
+    # 原文的指纹已经登记 (同一批里正在处理)，但还没写进历史，可能最后写失败
+    history_store.add_fingerprint(original, article_fingerprint(prepare_article(server.pages[0]).content_html))
+    pipeline = make_pipeline(tmp_path, stores, near_duplicates=NEAR_DUP_LINK)
+    assert pipeline.run([url], ["md"], "") == [STATUS_DUPLICATE]
+    assert pipeline.duplicates == {url: original}
+    assert not history_store.contains(url) # 不留一条指向不存在文件的记录
+
+    # 原文存好之后再遇到，才记成指向原文的链接
+    history_store.add("原文", original, "2024-01-01")
+    assert make_pipeline(tmp_path, stores, near_duplicates=NEAR_DUP_LINK).run([url], ["md"], "") == [STATUS_DUPLICATE]
+    assert history_store.get(url) == {"title": "原文", "url": url, "date": "2024-01-01"}
+
+
+def test_deferred_images_use_options_from_save_time(tmp_path, server, stores, monkeypatch):
+    queue = ImageQueue(str(tmp_path / "queue"))
+    jobs = []
+    monkeypatch.setattr(queue, "add", jobs.append)
+    webp = ImageOptions("webp", 800, 70)
+    assert make_pipeline(tmp_path, stores, image_queue=queue, image_options=webp).run(server.article_urls()[:1], ["md"], "") == [STATUS_SAVED]
+
+    used = []
+
+    def download_images(image_urls, assets_dir, safe_title, optimize=None, **kwargs):
+        used.append(optimize)
+        return list(image_urls)
+
+    monkeypatch.setattr(pipeline_module, "download_images", download_images)
+    # 图片任务到下次启动才处理，中间设置改成了不优化，还是按存的时候的选项来
+    make_pipeline(tmp_path, stores).localize_deferred(jobs[0])
+    del jobs[0]["image_options"] # 旧版本留下的任务没记选项，用当前设置
+    make_pipeline(tmp_path, stores, image_options=ImageOptions("avif", 0, 50)).localize_deferred(jobs[0])
+    assert used == [webp, ImageOptions("avif", 0, 50)]
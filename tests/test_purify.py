@@ -0,0 +1,71 @@
+"""正文清洗：一次遍历的 purify_content 和旧的逐个 get_text() 写法结果必须一模一样"""
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmarks.bench_purify import legacy_purify
+from benchmarks.fixtures import make_article_html
+from purifier.convert import prepare_article
+from purifier.purify import purify_content
+
+SPAN = '<span style="font-size: 15px; color: rgb(62, 62, 62);">{}</span>'
+
+# 微信正文里常见的结构：层层嵌套 (有的是空的) 的 section、行内样式、懒加载图片、各种推广块
+FRAGMENTS = {
+    "nested_empty": "<section><section><section></section><section> \n </section></section></section><p></p>",
+    "nested_promo": "<section><section><p>" + SPAN.format("长按扫码") + "</p></section><p>正文第一段</p></section>",
+    "promo_split_by_tags": "<p><span>长按</span>\n<strong>扫码</strong> 关注</p>",
+    "long_paragraph_kept": "<p>" + SPAN.format("这一段很长很长，" * 5 + "最后提到了阅读原文，但它是正文，不能删") + "</p>",
+    "short_parent_of_long": "<section><p>阅读原文</p><p>" + "正文" * 20 + "</p></section>",
+    "widgets": '<mp-miniprogram data-miniprogram-title="小程序"></mp-miniprogram><p>正文</p>'
+               '<section><mpvoice name="语音"></mpvoice>点击上方卡片</section><mp-common-profile></mp-common-profile>',
+    "images": '<p style="text-align: center;"><img data-src="https://mmbiz.qpic.cn/a/640" style="width: 100%;"></p>'
+              '<section><img src="https://mmbiz.qpic.cn/b/640"><img></section><p>扫码关注<img data-src="https://x/qr"></p>',
+    "comment_and_cdata": "<p><!-- 长按扫码 -->正文</p><p>关注公众号<![CDATA[x]]></p>",
+    "whitespace_and_nbsp": "<p>  阅读\n原文&nbsp;</p><section>\n\n</section><p>&nbsp;</p>",
+}
+
+
+def content_div(fragment):
+    html = f'<div id="js_content" style="visibility: hidden;">{fragment}</div>'
+    return BeautifulSoup(html, "html.parser").find("div", id="js_content")
+
+
+def both_ways(fragment):
+    new, old = content_div(fragment), content_div(fragment)
+    purify_content(new)
+    legacy_purify(old)
+    return str(new), str(old)
+
+
+@pytest.mark.parametrize("name", sorted(FRAGMENTS))
+def test_same_as_legacy_on_fragments(name):
+    new, old = both_ways(FRAGMENTS[name])
+    assert new == old
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_same_as_legacy_on_generated_pages(seed):
+    page = make_article_html(paragraphs=60, script_kb=1, seed=seed)
+    fragment = page.split('style="visibility: hidden;">', 1)[1].rsplit("</div></div>", 1)[0]
+    new, old = both_ways(fragment)
+    assert new == old
+    assert "mp-miniprogram" not in new and "长按扫码" not in new
+
+
+def test_returns_removed_count():
+    div = content_div(FRAGMENTS["widgets"])
+    assert purify_content(div) == 4 # 3 个组件 + 1 个推广段落
+
+
+def test_prepare_article_strips_hidden_style_and_collects_images():
+    page = ("<html><head><title>x</title></head><body>"
+            '<h1 id="activity-name"> 标题 </h1><a id="js_name"> 某公众号 </a>'
+            f'<div id="js_content" style="visibility: hidden;">{FRAGMENTS["images"]}<p>正文第一段</p></div>'
+            "</body></html>")
+    draft = prepare_article(page.encode("utf-8"))
+    head = draft.content_html[:draft.content_html.index(">") + 1]
+    assert "visibility" not in head # 正文的隐藏样式去掉了
+    assert 'style="width: 100%;"' in draft.content_html # 里面的样式原样保留
+    # 懒加载的 data-src 优先，没有地址的 <img> 跳过；推广段落里的二维码跟着段落一起删掉
+    assert draft.image_urls == ["https://mmbiz.qpic.cn/a/640", "https://mmbiz.qpic.cn/b/640"]
+    assert "扫码关注" not in draft.content_html and "正文第一段" in draft.content_html